@@ -0,0 +1,110 @@
+# coding=utf-8
+# asynchronous variant of the server (see main.py) for ASGI servers, e.g.:
+#   hypercorn asgi:app --bind 0.0.0.0:5000
+import json
+
+from quart import Quart, jsonify, request, abort
+from quart.utils import run_sync
+from quart_cors import cors
+
+from src.blueprints.asyncuserblueprint import user_blueprint
+from src.blueprints.asynctaskblueprint import task_blueprint
+from src.blueprints.asynctodoblueprint import todo_blueprint
+
+from src.util.controllers import getAsyncUserController, getAsyncTaskController
+from src.util.mongo import closeClients, pingDatabaseAsync
+from src.util.seeding import seedDatabase, loadDataModel, getSeedArgs, DUMMY_DATA
+from src.util.initdb import initDatabase
+from src.util.cache import getCache
+from src.util.metrics import getMetrics
+from src.util.settings import getSettings
+
+
+app = Quart('todoapp')
+
+# configure CORS for cross-origin resource sharing (between the frontend and backend)
+app = cors(app)
+
+# register blueprints
+app.register_blueprint(user_blueprint, url_prefix='/users')
+app.register_blueprint(task_blueprint, url_prefix='/tasks')
+app.register_blueprint(todo_blueprint, url_prefix='/todos')
+
+# set up the collections, validators and indexes before the first request is served (see src/util/initdb.py)
+@app.before_serving
+async def startup():
+    for step, error in initDatabase().items():
+        print(f'Error: could not set up {step}: {error}')
+
+# release the connection pools of this process
+@app.after_serving
+async def shutdown():
+    closeClients()
+
+# simple heartbeat method to check if the server is running. It does not depend on the database, so its body is serialized once
+HEARTBEAT = app.json.dumps({'version': getSettings().version})
+
+@app.route('/')
+async def ping():
+    return app.response_class(HEARTBEAT, mimetype='application/json')
+
+# readiness probe, which checks that the database can be reached via the connection pool of this process
+@app.route('/ready', methods=['GET'])
+async def ready():
+    try:
+        await pingDatabaseAsync()
+        return jsonify({'ready': True}), 200
+    except Exception as e:
+        print(f'{e.__class__.__name__}: {e}')
+        return jsonify({'ready': False}), 503
+
+# usage statistics (hits and misses) of the cache of this process
+@app.route('/cache', methods=['GET'])
+async def cache_stats():
+    return jsonify(getCache().stats()), 200
+
+# metrics of this process (see main.py), where only the MongoDB commands, the connection pool and the cache are measured
+@app.route('/metrics', methods=['GET'])
+async def metrics():
+    return app.response_class(getMetrics().render(getCache()), mimetype='text/plain; version=0.0.4')
+
+# populate the database like main.py, where the synthetic data is generated by seedDatabase in a thread, which does not block the event loop
+@app.route('/populate', methods=['POST'])
+async def populate():
+    values = await request.values
+    if 'users' in values:
+        try:
+            arguments = getSeedArgs(values, loadDataModel())
+        except ValueError as e:
+            abort(400, str(e))
+        return jsonify(await run_sync(seedDatabase)(**arguments)), 200
+
+    usercontroller = getAsyncUserController()
+    taskcontroller = getAsyncTaskController()
+
+    response = {'users': []}
+    with open(DUMMY_DATA, 'r') as f:
+        dummydata = json.load(f)
+
+    for userdata in dummydata:
+        user = await usercontroller.create({
+            'firstName': userdata['firstName'],
+            'lastName': userdata['lastName'],
+            'email': userdata['email']
+        })
+
+        await taskcontroller.create_many([{
+            'userid': user['_id']['$oid'],
+            'title': taskdata['title'],
+            'description': taskdata['description'],
+            'url': taskdata['url'],
+            'todos': taskdata['todos']
+        } for taskdata in userdata['tasks']])
+
+        response['users'].append(user['_id']['$oid'])
+
+    return jsonify(response), 200
+
+if __name__ == '__main__':
+    settings = getSettings()
+    app.run(settings.flask_bind_ip, settings.port)
@@ -0,0 +1,47 @@
+# Compare the single-pass BSON to JSON converter with the previous round trip through a json string.
+# Does not require a database; run from the backend folder with
+#   python -m benchmarks.bench_converters [--documents 500] [--todos 10] [--repeat 30]
+import argparse
+import json
+from datetime import datetime
+
+from bson import json_util
+from bson.objectid import ObjectId
+
+from src.util.converters import to_json_many
+from benchmarks.common import measure
+
+def populated_task(todos: int):
+    """Create a task document shaped like the ones returned by TaskController.get_tasks_of_user."""
+    return {
+        '_id': ObjectId(),
+        'title': 'Improve Devtools',
+        'description': 'Upgrade the tools used for web development. In order to keep web development effective, the right choice of tools is critical.',
+        'startdate': datetime.today(),
+        'categories': ['web', 'tools'],
+        'video': {'_id': ObjectId(), 'url': 'U_gANjtv28g'},
+        'todos': [{'_id': ObjectId(), 'description': f'Todo number {i}', 'done': i % 2 == 0} for i in range(todos)]
+    }
+
+def round_trip(documents):
+    return [json.loads(json_util.dumps(document)) for document in documents]
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the BSON to JSON conversion')
+    parser.add_argument('--documents', type=int, default=500)
+    parser.add_argument('--todos', type=int, default=10, help='todos per task document')
+    parser.add_argument('--repeat', type=int, default=30)
+    args = parser.parse_args()
+
+    documents = [populated_task(args.todos) for _ in range(args.documents)]
+    assert round_trip(documents) == to_json_many(documents)
+
+    print(f'{"converter":>12} {"p50 ms":>10} {"p95 ms":>10} {"us/doc":>10}')
+    results = {}
+    for name, fn in [('round trip', lambda: round_trip(documents)), ('single pass', lambda: to_json_many(documents))]:
+        results[name] = measure(fn, repeat=args.repeat)
+        print(f'{name:>12} {results[name]["p50"]:>10.2f} {results[name]["p95"]:>10.2f} {results[name]["p50"] * 1000 / args.documents:>10.2f}')
+    print(f'speedup: {results["round trip"]["p50"] / results["single pass"]["p50"]:.1f}x')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+# Compare the latency of reading the populated tasks of a user with the aggregation pipeline
+# against the previous one-query-per-reference population, for a growing number of tasks.
+# Requires a running MongoDB as configured in .env; run from the backend folder with
+#   python -m benchmarks.bench_population [--sizes 1 10 100 500] [--repeat 30]
+import argparse
+import uuid
+
+from src.util.daos import getDao
+from src.controllers.usercontroller import UserController
+from src.controllers.taskcontroller import TaskController
+from benchmarks.common import measure
+
+def legacy_get_tasks_of_user(taskcontroller: TaskController, id: str):
+    """The population strategy used before the aggregation pipeline: 2 + 2N round trips."""
+    user = taskcontroller.users_dao.findOne(id)
+    tasks = taskcontroller.dao.find(filter={'_id': user['tasks']}, toid=['_id'])
+    for task in tasks:
+        taskcontroller.populate_task(task)
+    return tasks
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark task population strategies')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 10, 100, 500])
+    parser.add_argument('--todos', type=int, default=5, help='todos per task')
+    parser.add_argument('--repeat', type=int, default=30)
+    args = parser.parse_args()
+
+    usercontroller = UserController(getDao(collection_name='user'))
+    taskcontroller = TaskController(tasks_dao=getDao(collection_name='task'), videos_dao=getDao(collection_name='video'), todos_dao=getDao(collection_name='todo'), users_dao=getDao(collection_name='user'))
+
+    print(f'{"tasks":>6} {"strategy":>12} {"p50 ms":>10} {"p95 ms":>10} {"p99 ms":>10}')
+    for size in args.sizes:
+        user = usercontroller.create({'firstName': 'Bench', 'lastName': 'Mark', 'email': f'bench-{uuid.uuid4().hex}@edutask.test'})
+        uid = user['_id']['$oid']
+        try:
+            for i in range(size):
+                taskcontroller.create({
+                    'userid': uid,
+                    'title': f'Benchmark task {i}',
+                    'description': 'Task created by the population benchmark',
+                    'url': 'dQw4w9WgXcQ',
+                    'todos': [f'Todo {j}' for j in range(args.todos)]
+                })
+
+            for name, fn in [('aggregate', lambda: taskcontroller.get_tasks_of_user(uid)), ('legacy', lambda: legacy_get_tasks_of_user(taskcontroller, uid))]:
+                result = measure(fn, repeat=args.repeat)
+                print(f'{size:>6} {name:>12} {result["p50"]:>10.2f} {result["p95"]:>10.2f} {result["p99"]:>10.2f}')
+        finally:
+            taskcontroller.delete_of_user(uid)
+            usercontroller.delete(uid)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+# Measure the cold start of the server: the time of `import main` in a fresh interpreter, and of its first request
+# (the heartbeat, which does not access the database). Does not require a database; run from the backend folder with
+#   python -m benchmarks.bench_startup [--repeat 10]
+import argparse
+import json
+import subprocess
+import sys
+
+from benchmarks.common import summarize
+
+PROBE = '''
+import json, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+main.app.test_client().get('/')
+print(json.dumps({'import': imported - start, 'first request': time.perf_counter() - imported}))
+'''
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the cold start of the server')
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    samples = {'import': [], 'first request': []}
+    for _ in range(args.repeat):
+        output = subprocess.run([sys.executable, '-c', PROBE], capture_output=True, text=True, check=True).stdout
+        for name, seconds in json.loads(output.splitlines()[-1]).items():
+            samples[name].append(seconds)
+
+    print(f'{"phase":>14} {"p50 ms":>10} {"p95 ms":>10} {"max ms":>10}')
+    for name, values in samples.items():
+        summary = summarize(values)
+        print(f'{name:>14} {summary["p50"]:>10.1f} {summary["p95"]:>10.1f} {summary["max"]:>10.1f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+# Compare the referenced and the embedded storage layout of the tasks (see TASK_STORAGE): the latency of reading tasks
+# and todos and of creating, toggling and deleting todos, and the size of the data. Seeds its own database, converts it
+# with src.util.storage and drops it afterwards. Requires a running MongoDB as configured in .env; run from the backend folder with
+#   python -m benchmarks.bench_storage [--users 200] [--tasks 10] [--todos 5] [--repeat 100]
+import argparse
+import itertools
+import os
+import random
+
+from benchmarks.common import measure
+
+def cases(embedded: bool, rng: random.Random):
+    """Yield the name and the function without arguments of every measured operation on the seeded data in the given layout."""
+    from src.util.daos import getDao
+    from src.controllers.taskcontroller import TaskController
+    from src.controllers.todocontroller import TodoController
+
+    daos = {name: getDao(collection_name=name) for name in ['user', 'task', 'video', 'todo']}
+    taskcontroller = TaskController(tasks_dao=daos['task'], videos_dao=daos['video'], todos_dao=daos['todo'], users_dao=daos['user'], embedded=embedded)
+    todocontroller = TodoController(todo_dao=daos['todo'], tasks_dao=daos['task'], users_dao=daos['user'], embedded=embedded)
+
+    users = [user['_id'] for user in daos['user'].collection.find({}, {'_id': 1})]
+    tasks = [task['_id'] for task in daos['task'].collection.find({}, {'_id': 1})]
+    todos = [todo['_id'] for task in daos['task'].collection.aggregate(taskcontroller.population_stages() + [{'$project': {'todos._id': 1}}]) for todo in task['todos']]
+    cycle = lambda ids: itertools.cycle([str(id) for id in rng.sample(ids, len(ids))])
+    users, tasks, todos = cycle(users), cycle(tasks), cycle(todos)
+    created = []
+
+    def create():
+        created.append(todocontroller.create({'taskid': next(tasks), 'description': 'Benchmark todo'})['_id']['$oid'])
+
+    yield 'get task', lambda: taskcontroller.get(next(tasks))
+    yield 'tasks of user', lambda: taskcontroller.get_tasks_of_user(next(users))
+    yield 'get todo', lambda: todocontroller.get(next(todos))
+    yield 'create todo', create
+    yield 'toggle todo', lambda: todocontroller.update(next(todos), {'$set': {'done': True}})
+    yield 'delete todo', lambda: todocontroller.delete(created.pop())
+
+def size(database):
+    """Return the total size of the documents of the collections in bytes."""
+    return sum(database.command('collStats', name)['size'] for name in ['user', 'task', 'video', 'todo'])
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the storage layouts of the tasks')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--tasks', type=float, default=10, help='mean number of tasks per user')
+    parser.add_argument('--todos', type=float, default=5, help='mean number of todos per task')
+    parser.add_argument('--repeat', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database', default='edutask_storage', help='database which is dropped and seeded (never use the one of the application)')
+    args = parser.parse_args()
+
+    # the settings are read on first use, so the database has to be chosen before anything accesses it
+    os.environ['MONGO_DATABASE'] = args.database
+    from src.util.mongo import getClient, getDatabase
+    from src.util.initdb import initDatabase
+    from src.util.seeding import seedDatabase
+    from src.util.storage import embedTasks
+
+    getClient().drop_database(args.database)
+    try:
+        for step, error in initDatabase().items():
+            print(f'Error: could not set up {step}: {error}')
+        print(seedDatabase(users=args.users, tasks_per_user=args.tasks, todos_per_task=args.todos, seed=args.seed))
+
+        results = {}
+        sizes = {}
+        for layout in ['referenced', 'embedded']:
+            if layout == 'embedded':
+                print(embedTasks())
+            sizes[layout] = size(getDatabase())
+            for name, fn in cases(layout == 'embedded', random.Random(args.seed)):
+                results[(name, layout)] = measure(fn, repeat=args.repeat, warmup=0 if 'delete' in name else 3)
+
+        print(f'{"operation":>14} {"layout":>11} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9}')
+        for (name, layout), result in results.items():
+            print(f'{name:>14} {layout:>11} {result["p50"]:>9.2f} {result["p95"]:>9.2f} {result["p99"]:>9.2f}')
+        for layout, bytes in sizes.items():
+            print(f'{layout} data: {bytes / 2 ** 20:.1f} MiB')
+    finally:
+        getClient().drop_database(args.database)
+
+if __name__ == '__main__':
+    main()
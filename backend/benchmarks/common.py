@@ -0,0 +1,59 @@
+import time
+import statistics
+
+def percentile(samples: list, p: float):
+    """Return the p-th percentile (0 <= p <= 100) of a list of samples using linear interpolation.
+
+    parameters:
+        samples -- list of numeric samples
+        p -- the requested percentile
+
+    returns:
+        value -- the percentile value (None for an empty list)
+    """
+    if len(samples) == 0:
+        return None
+    ordered = sorted(samples)
+    k = (len(ordered) - 1) * p / 100
+    lower = int(k)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (k - lower)
+
+def summarize(samples: list):
+    """Summarize a list of latency samples (in seconds) into a dict of milliseconds.
+
+    parameters:
+        samples -- list of latencies in seconds
+
+    returns:
+        summary -- dict containing the number of samples, mean, p50, p95, p99 and max in milliseconds
+    """
+    ms = [s * 1000 for s in samples]
+    return {
+        'n': len(ms),
+        'mean': statistics.fmean(ms) if ms else None,
+        'p50': percentile(ms, 50),
+        'p95': percentile(ms, 95),
+        'p99': percentile(ms, 99),
+        'max': max(ms) if ms else None
+    }
+
+def measure(fn, repeat: int = 50, warmup: int = 3):
+    """Call fn repeatedly and return the summarized latencies.
+
+    parameters:
+        fn -- function without arguments to be measured
+        repeat -- number of measured calls
+        warmup -- number of unmeasured calls before the measurement
+
+    returns:
+        summary -- see summarize
+    """
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
@@ -0,0 +1,306 @@
+# Generate load like the frontend does: every virtual user logs in (GET /users/bymail) or signs up, lists its tasks
+# (GET /tasks/ofuser) and then opens tasks, adds, toggles and removes todos and edits or creates tasks, each followed by
+# the same requests the frontend sends to refresh its views (see frontend/src/Components/TaskDetail.js). Reports the
+# throughput, the latency percentiles and the error rate per route. Runs against the application in-process (which needs
+# MongoDB as configured in .env) or against a running server over HTTP, and needs seeded users
+# (e.g., python -m src.util.seeding --users 1000). Run from the backend folder with
+#   python -m benchmarks.loadgen [--url http://localhost:5000] [--concurrency 16] [--duration 60] [--think 1]
+#                                [--mix reader=0.7,editor=0.25,newcomer=0.05] [--output load.json]
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+import uuid
+from urllib.parse import urlencode, urlsplit
+
+from benchmarks.common import summarize
+
+# the behavior of the kinds of users: whether they sign up first, and the relative frequency of their actions
+PROFILES = {
+    'reader': {'signup': False, 'weights': {'view': 6, 'toggle': 2, 'add': 1, 'remove': 1, 'edit': 0, 'create': 0}},
+    'editor': {'signup': False, 'weights': {'view': 3, 'toggle': 3, 'add': 3, 'remove': 2, 'edit': 1, 'create': 1}},
+    'newcomer': {'signup': True, 'weights': {'view': 2, 'toggle': 2, 'add': 3, 'remove': 1, 'edit': 1, 'create': 3}}
+}
+
+def parseMix(text: str):
+    """Parse a user mix like reader=0.7,editor=0.3 into a dict mapping profiles to their (relative) shares.
+
+    raises:
+        ValueError -- in case a profile is unknown or a share is not a non-negative number
+    """
+    mix = {}
+    for part in text.split(','):
+        name, _, share = part.partition('=')
+        if name.strip() not in PROFILES:
+            raise ValueError(f'Error: unknown profile {name.strip()}, choose from {", ".join(PROFILES)}')
+        mix[name.strip()] = float(share)
+        if mix[name.strip()] < 0:
+            raise ValueError(f'Error: the share of {name.strip()} must not be negative')
+    if sum(mix.values()) <= 0:
+        raise ValueError('Error: the shares must not all be zero')
+    return mix
+
+class InProcessClient:
+    def __init__(self, app):
+        """Send the requests of one virtual user directly to the Flask application, without the network and the server."""
+        self.client = app.test_client()
+
+    def request(self, method: str, path: str, data: dict = None):
+        response = self.client.open(path, method=method, data=data, headers={'Cache-Control': 'no-cache'})
+        return response.status_code, response.get_data()
+
+class HttpClient:
+    def __init__(self, url: str, timeout: float = 30):
+        """Send the requests of one virtual user to a running server over one persistent HTTP connection, like a browser tab."""
+        parts = urlsplit(url)
+        self.host, self.port, self.timeout = parts.hostname, parts.port or 80, timeout
+        self.connection = None
+
+    def request(self, method: str, path: str, data: dict = None):
+        body = urlencode(data, doseq=True) if data is not None else None
+        headers = {'Cache-Control': 'no-cache'}
+        if body is not None:
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        try:
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            return response.status, response.read()
+        except (OSError, http.client.HTTPException):
+            # reconnect for the next request
+            self.connection.close()
+            self.connection = None
+            raise
+
+class Stats:
+    def __init__(self):
+        """Latencies and errors of the requests per route, shared by all virtual users."""
+        self.latencies = {}
+        self.errors = {}
+        self.sessions = 0
+        self.lock = threading.Lock()
+
+    def record(self, route: str, seconds: float, error: bool):
+        with self.lock:
+            self.latencies.setdefault(route, []).append(seconds)
+            self.errors[route] = self.errors.get(route, 0) + int(error)
+
+    def report(self, duration: float):
+        """Summarize the requests sent within the given number of seconds.
+
+        returns:
+            report -- dict of the overall throughput (requests per second) and error rate, and the summary (see benchmarks.common.summarize) and the error rate per route
+        """
+        with self.lock:
+            requests = sum(len(latencies) for latencies in self.latencies.values())
+            errors = sum(self.errors.values())
+            routes = {}
+            for route, latencies in sorted(self.latencies.items()):
+                routes[route] = summarize(latencies)
+                routes[route]['throughput'] = len(latencies) / duration
+                routes[route]['errors'] = self.errors[route]
+                routes[route]['error_rate'] = self.errors[route] / len(latencies)
+            return {
+                'duration': duration,
+                'sessions': self.sessions,
+                'requests': requests,
+                'throughput': requests / duration if duration > 0 else None,
+                'errors': errors,
+                'error_rate': errors / requests if requests > 0 else 0,
+                'routes': routes
+            }
+
+class Session:
+    def __init__(self, client, stats: Stats, rng: random.Random, profile: dict, think: float, deadline: float):
+        """One visit of a virtual user, which sends the requests of the frontend for each of its actions.
+
+        parameters:
+            client -- InProcessClient or HttpClient
+            stats -- the Stats to record the requests in
+            rng -- random number generator choosing the actions
+            profile -- one of the PROFILES
+            think -- mean time in seconds between two actions (exponentially distributed, 0 for none)
+            deadline -- time (see time.monotonic) at which the session ends at the latest
+        """
+        self.client = client
+        self.stats = stats
+        self.rng = rng
+        self.profile = profile
+        self.think = think
+        self.deadline = deadline
+        self.user = None
+        self.tasks = []
+        self.task = None
+        self.added = []
+
+    def call(self, route: str, method: str, path: str, data: dict = None):
+        """Send a request and record it under the route, returning the parsed response (None if it failed)."""
+        start = time.perf_counter()
+        try:
+            status, body = self.client.request(method, path, data)
+        except Exception as e:
+            self.stats.record(route, time.perf_counter() - start, True)
+            return None
+        self.stats.record(route, time.perf_counter() - start, status >= 400)
+        if status >= 400:
+            return None
+        try:
+            return json.loads(body)
+        except ValueError:
+            return None
+
+    def run(self, email: str, actions: int):
+        """Log in with the email (or sign up, depending on the profile) and perform the given number of actions."""
+        if self.profile['signup']:
+            self.user = self.call('POST /users/create', 'POST', '/users/create', {'email': f'load.{uuid.uuid4().hex}@edutask.test', 'firstName': 'Load', 'lastName': 'Test'})
+        else:
+            self.user = self.call('GET /users/bymail/<email>', 'GET', f'/users/bymail/{email}')
+        if not self.user:
+            return
+        self.refreshTasks()
+
+        names = list(self.profile['weights'])
+        weights = [self.profile['weights'][name] for name in names]
+        for _ in range(actions):
+            if self.think > 0:
+                time.sleep(min(self.rng.expovariate(1 / self.think), max(self.deadline - time.monotonic(), 0)))
+            if time.monotonic() >= self.deadline:
+                return
+            action = self.rng.choices(names, weights)[0]
+            # all actions but creating a task need a task, which a new user has yet to create
+            if len(self.tasks) == 0:
+                action = 'create'
+            getattr(self, action)()
+
+    def refreshTasks(self):
+        self.tasks = self.call('GET /tasks/ofuser/<id>', 'GET', f'/tasks/ofuser/{self.user["_id"]["$oid"]}') or []
+
+    def refreshTask(self):
+        self.task = self.call('GET /tasks/byid/<id>', 'GET', f'/tasks/byid/{self.task["_id"]["$oid"]}') or self.task
+
+    def view(self):
+        self.task = self.rng.choice(self.tasks)
+        self.refreshTask()
+
+    def current(self):
+        if self.task is None:
+            self.view()
+        return self.task
+
+    def add(self):
+        todo = self.call('POST /todos/create', 'POST', '/todos/create', {'taskid': self.current()['_id']['$oid'], 'description': f'Load test todo {self.rng.randrange(10 ** 6)}'})
+        if todo:
+            self.added.append(todo['_id']['$oid'])
+        self.refreshTask()
+        self.refreshTasks()
+
+    def toggle(self):
+        todos = self.current().get('todos', [])
+        if len(todos) == 0:
+            return self.add()
+        todo = self.rng.choice(todos)
+        self.call('PUT /todos/byid/<id>', 'PUT', f'/todos/byid/{todo["_id"]["$oid"]}', {'data': f"{{'$set': {{'done': {str(not todo.get('done', False)).lower()}}}}}"})
+        self.refreshTask()
+        self.refreshTasks()
+
+    def remove(self):
+        # only the todos added within this session are removed, such that the seeded data is retained
+        if len(self.added) == 0:
+            return self.add()
+        self.call('DELETE /todos/byid/<id>', 'DELETE', f'/todos/byid/{self.added.pop()}')
+        self.refreshTask()
+        self.refreshTasks()
+
+    def edit(self):
+        self.call('PUT /tasks/byid/<id>', 'PUT', f'/tasks/byid/{self.current()["_id"]["$oid"]}', {'data': f"{{'$set': {{'title': 'Load test task {self.rng.randrange(10 ** 6)}'}}}}"})
+        self.refreshTasks()
+
+    def create(self):
+        tasks = self.call('POST /tasks/create', 'POST', '/tasks/create', {
+            'title': f'Load test task {self.rng.randrange(10 ** 6)}',
+            'description': '(add a description here)',
+            'userid': self.user['_id']['$oid'],
+            'url': 'dQw4w9WgXcQ',
+            'todos': ['Watch video']
+        })
+        if tasks is not None:
+            self.tasks = tasks
+
+def generateLoad(makeClient, emails: list, mix: dict, concurrency: int, duration: float, actions: int, think: float, seed: int = None):
+    """Run virtual users concurrently, each performing one session after the other, until the duration has elapsed.
+
+    parameters:
+        makeClient -- function without arguments returning a new client for a virtual user
+        emails -- email addresses of existing users to log in with
+        mix -- dict mapping profiles to their shares of the sessions (see parseMix)
+        concurrency -- number of virtual users
+        duration -- seconds to generate load
+        actions -- mean number of actions per session
+        think -- mean time in seconds between two actions of a user
+        seed -- seed of the random number generators (None for a random seed)
+
+    returns:
+        report -- see Stats.report
+    """
+    stats = Stats()
+    profiles = list(mix)
+    shares = [mix[profile] for profile in profiles]
+    start = time.monotonic()
+    deadline = start + duration
+
+    def virtualUser(index: int):
+        rng = random.Random(None if seed is None else seed + index)
+        client = makeClient()
+        while time.monotonic() < deadline:
+            profile = PROFILES[rng.choices(profiles, shares)[0]]
+            Session(client, stats, rng, profile, think, deadline).run(rng.choice(emails) if emails else None, max(1, round(rng.expovariate(1 / actions))))
+            with stats.lock:
+                stats.sessions += 1
+
+    threads = [threading.Thread(target=virtualUser, args=(index,), daemon=True) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats.report(time.monotonic() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate load modeled on the sessions of the frontend')
+    parser.add_argument('--url', help='URL of a running server (by default, the application is run in-process)')
+    parser.add_argument('--concurrency', type=int, default=16, help='number of concurrent virtual users')
+    parser.add_argument('--duration', type=float, default=60, help='seconds to generate load')
+    parser.add_argument('--think', type=float, default=1, help='mean seconds between two actions of a user')
+    parser.add_argument('--actions', type=float, default=10, help='mean number of actions per session')
+    parser.add_argument('--mix', type=parseMix, default='reader=0.7,editor=0.25,newcomer=0.05', help='shares of the profiles ' + ', '.join(PROFILES))
+    parser.add_argument('--population', type=int, default=1000, help='number of existing users to log in with')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--output', help='json file for the report')
+    args = parser.parse_args()
+
+    if args.url:
+        makeClient = lambda: HttpClient(args.url)
+    else:
+        from main import app
+        makeClient = lambda: InProcessClient(app)
+
+    status, body = makeClient().request('GET', f'/users/all?limit={args.population}&fields=email')
+    emails = [user['email'] for user in json.loads(body)['items']] if status == 200 else []
+    if len(emails) == 0 and any(not PROFILES[profile]['signup'] for profile, share in args.mix.items() if share > 0):
+        raise SystemExit('Error: there are no users to log in with, seed the database first (python -m src.util.seeding --users 1000)')
+
+    report = generateLoad(makeClient, emails, args.mix, args.concurrency, args.duration, args.actions, args.think, args.seed)
+
+    print(f'{report["sessions"]} sessions, {report["requests"]} requests in {report["duration"]:.1f} s: {report["throughput"]:.1f} requests/s, {report["error_rate"]:.2%} errors')
+    print(f'{"route":>28} {"requests":>9} {"req/s":>8} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"errors":>8}')
+    for route, summary in report['routes'].items():
+        print(f'{route:>28} {summary["n"]:>9} {summary["throughput"]:>8.1f} {summary["p50"]:>9.2f} {summary["p95"]:>9.2f} {summary["p99"]:>9.2f} {summary["error_rate"]:>8.2%}')
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'parameters': {key: value for key, value in vars(args).items() if key != 'output'}, **report}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+# Measure the latency (p50/p95/p99) and sequential throughput of every route of the blueprints and of the core controller
+# methods on seeded data of one or more sizes, write the results as json and optionally compare them to the results of
+# another commit. Requires a running MongoDB as configured in .env; the suite works on its own database, which it drops
+# and seeds for every size. Run from the backend folder with
+#   python -m benchmarks.suite [--users 100 1000] [--repeat 100] [--output results.json] [--baseline previous.json]
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+from benchmarks.common import measure
+
+def gitCommit():
+    """Return the commit of the working tree, None outside of a git repository."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+class Suite:
+    def __init__(self, app, rng: random.Random, repeat: int, warmup: int):
+        """The cases of the suite on the currently seeded database. The routes are requested through the test client of the application, i.e., in-process without the network, and each request of a case addresses another object.
+
+        parameters:
+            app -- the Flask application (see main.py)
+            rng -- random number generator choosing the objects
+            repeat -- number of measured calls per case
+            warmup -- number of unmeasured calls before each case
+        """
+        from src.util.controllers import getUserController, getTaskController
+
+        self.client = app.test_client()
+        self.rng = rng
+        self.repeat = repeat
+        self.warmup = warmup
+        self.calls = repeat + warmup
+        self.usercontroller = getUserController()
+        self.taskcontroller = getTaskController()
+
+        users = self.usercontroller.dao.find(filter={}, projection={'email': 1, 'tasks': 1})
+        self.users = [user for user in users if len(user.get('tasks', [])) > 0] or users
+        self.tasks = [task['$oid'] for user in self.users for task in user.get('tasks', [])]
+        self.todos = [todo['_id']['$oid'] for todo in self.taskcontroller.todos_dao.find(filter={}, projection={'_id': 1})]
+        if len(self.users) == 0 or len(self.tasks) == 0 or len(self.todos) == 0:
+            raise ValueError('Error: the seeded database needs at least one user with a task and a todo')
+
+    def request(self, method: str, url: str, **kwargs):
+        response = self.client.open(url, method=method, **kwargs)
+        # consume streamed responses, and never measure failing requests
+        response.get_data()
+        if response.status_code >= 400:
+            raise RuntimeError(f'Error: {method} {url} answered {response.status_code}')
+        return response
+
+    def sample(self, objects: list):
+        """Cycle endlessly through the objects in a random order."""
+        return itertools.cycle(self.rng.sample(objects, len(objects)))
+
+    def newUsers(self, n: int, tasks: int = 0):
+        """Create users (with tasks) which the writing cases may modify or delete, without measuring it."""
+        suffix = f'{time.time_ns()}'
+        users = []
+        for i in range(n):
+            user = self.usercontroller.create({'firstName': 'Bench', 'lastName': 'Mark', 'email': f'bench.{suffix}.{i}@edutask.test'})
+            self.taskcontroller.create_many([self.newTask(user['_id']['$oid'], j) for j in range(tasks)])
+            users.append(user['_id']['$oid'])
+        return users
+
+    def newTask(self, userid: str, i: int = 0):
+        return {'userid': userid, 'title': f'Benchmark task {i} {time.time_ns()}', 'description': 'Task created by the benchmark suite', 'url': 'dQw4w9WgXcQ', 'todos': ['Watch video', 'Take notes']}
+
+    def cases(self):
+        """Yield the name and the function without arguments of every case, where the objects a case modifies are prepared lazily right before the case is measured."""
+        users = self.sample(self.users)
+        tasks = self.sample(self.tasks)
+        todos = self.sample(self.todos)
+
+        yield 'GET /', lambda: self.request('GET', '/')
+        yield 'GET /users/<id>', lambda: self.request('GET', f'/users/{next(users)["_id"]["$oid"]}')
+        yield 'GET /users/bymail/<email>', lambda: self.request('GET', f'/users/bymail/{next(users)["email"]}')
+        yield 'GET /users/all', lambda: self.request('GET', '/users/all?limit=100')
+        yield 'GET /users/all?stream=ndjson', lambda: self.request('GET', '/users/all?stream=ndjson')
+        yield 'POST /users/create', self.creating(lambda i, suffix: self.request('POST', '/users/create', data={'firstName': 'Bench', 'lastName': 'Mark', 'email': f'post.{suffix}.{i}@edutask.test'}))
+        created = iter(self.newUsers(self.calls))
+        yield 'PUT /users/<id>', lambda: self.request('PUT', f'/users/{next(created)}', data={'lastName': 'Changed'})
+        created = iter(self.newUsers(self.calls))
+        yield 'DELETE /users/<id>', lambda: self.request('DELETE', f'/users/{next(created)}')
+
+        yield 'GET /tasks/byid/<id>', lambda: self.request('GET', f'/tasks/byid/{next(tasks)}')
+        yield 'GET /tasks/ofuser/<id>', lambda: self.request('GET', f'/tasks/ofuser/{next(users)["_id"]["$oid"]}')
+        yield 'GET /tasks/export', lambda: self.request('GET', '/tasks/export?format=ndjson')
+        owner = self.newUsers(1)[0]
+        yield 'POST /tasks/create', self.creating(lambda i, suffix: self.request('POST', '/tasks/create', data={**self.newTask(owner, i), 'todos': ['Watch video']}))
+        yield 'PUT /tasks/byid/<id>', lambda: self.request('PUT', f'/tasks/byid/{next(tasks)}', data={'data': json.dumps({'$set': {'description': 'Changed by the benchmark suite'}})})
+        created = iter(self.taskcontroller.create_many([self.newTask(owner, i) for i in range(self.calls)]))
+        yield 'DELETE /tasks/byid/<id>', lambda: self.request('DELETE', f'/tasks/byid/{next(created)}')
+
+        yield 'GET /todos/byid/<id>', lambda: self.request('GET', f'/todos/byid/{next(todos)}')
+        yield 'POST /todos/create', lambda: self.request('POST', '/todos/create', data={'taskid': next(tasks), 'description': f'Benchmark todo {time.time_ns()}'})
+        yield 'PUT /todos/byid/<id>', lambda: self.request('PUT', f'/todos/byid/{next(todos)}', data={'data': json.dumps({'$set': {'done': True}})})
+        taskid = self.taskcontroller.create(self.newTask(owner))
+        created = iter([self.request('POST', '/todos/create', data={'taskid': taskid, 'description': f'Deleted todo {i}'}).get_json()['_id']['$oid'] for i in range(self.calls)])
+        yield 'DELETE /todos/byid/<id>', lambda: self.request('DELETE', f'/todos/byid/{next(created)}')
+
+        yield 'TaskController.get_tasks_of_user', lambda: self.taskcontroller.get_tasks_of_user(next(users)['_id']['$oid'])
+        yield 'TaskController.create', self.creating(lambda i, suffix: self.taskcontroller.create(self.newTask(owner, i)))
+        created = iter(self.newUsers(self.calls, tasks=3))
+        yield 'TaskController.delete_of_user', lambda: self.taskcontroller.delete_of_user(next(created))
+        yield 'UserController.get_user_by_email', lambda: self.usercontroller.get_user_by_email(next(users)['email'])
+
+    def creating(self, create):
+        """Turn a function creating the i-th object of a case into a function without arguments."""
+        counter = itertools.count()
+        suffix = time.time_ns()
+        return lambda: create(next(counter), suffix)
+
+    def run(self, only: list = None):
+        """Measure all cases (or those whose name contains one of the given strings).
+
+        returns:
+            results -- dict mapping the name of each case to its summary (see benchmarks.common.summarize) and its throughput in calls per second
+        """
+        results = {}
+        for name, fn in self.cases():
+            if only and not any(part in name for part in only):
+                continue
+            summary = measure(fn, repeat=self.repeat, warmup=self.warmup)
+            summary['throughput'] = 1000 / summary['mean'] if summary['mean'] else None
+            results[name] = summary
+            print(f'{name:>40} {summary["p50"]:>9.2f} {summary["p95"]:>9.2f} {summary["p99"]:>9.2f} {summary["throughput"]:>10.1f}')
+        return results
+
+def compare(results: dict, baseline: dict, threshold: float, metric: str = 'p95'):
+    """Compare the results of the suite to a baseline of the same format.
+
+    parameters:
+        results -- the current results (see main)
+        baseline -- the results to compare to, e.g., of the previous commit
+        threshold -- tolerated relative increase of the metric, e.g., 0.2 for 20%
+        metric -- the compared latency (p50, p95, p99 or mean)
+
+    returns:
+        regressions -- list of (size, case, baseline value, current value) for every case which got slower than tolerated
+    """
+    regressions = []
+    for size, cases in results['sizes'].items():
+        for case, summary in cases.items():
+            before = baseline.get('sizes', {}).get(size, {}).get(case)
+            if before is None or not before.get(metric) or summary.get(metric) is None:
+                continue
+            if summary[metric] > before[metric] * (1 + threshold):
+                regressions.append((size, case, before[metric], summary[metric]))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the routes and controllers on seeded data')
+    parser.add_argument('--users', type=int, nargs='+', default=[100, 1000], help='numbers of seeded users, one run per number')
+    parser.add_argument('--tasks', type=float, default=5, help='mean number of tasks per user')
+    parser.add_argument('--todos', type=float, default=5, help='mean number of todos per task')
+    parser.add_argument('--repeat', type=int, default=100, help='measured calls per case')
+    parser.add_argument('--warmup', type=int, default=5, help='unmeasured calls per case')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database', default='edutask_benchmark', help='database which is dropped and seeded (never use the one of the application)')
+    parser.add_argument('--cache', action='store_true', help='enable the cache of the controllers with CACHE_MAXSIZE (10000 unless set) entries (by default, every read hits the database)')
+    parser.add_argument('--only', nargs='+', help='only run the cases containing one of these strings')
+    parser.add_argument('--output', help='json file for the results')
+    parser.add_argument('--baseline', help='json file of earlier results to compare to')
+    parser.add_argument('--threshold', type=float, default=0.2, help='tolerated relative slowdown compared to the baseline')
+    parser.add_argument('--metric', default='p95', choices=['mean', 'p50', 'p95', 'p99'])
+    args = parser.parse_args()
+
+    # read the baseline upfront, as it may be the file the results are written to
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+
+    # the settings are read on first use, so the environment has to be adapted before the application is imported
+    os.environ['MONGO_DATABASE'] = args.database
+    if not args.cache:
+        os.environ['CACHE_MAXSIZE'] = '0'
+    elif int(os.environ.get('CACHE_MAXSIZE') or 0) <= 0:
+        os.environ['CACHE_MAXSIZE'] = '10000'
+    from main import app
+    from src.util.mongo import getClient
+    from src.util.initdb import initDatabase
+    from src.util.seeding import seedDatabase
+
+    results = {
+        'commit': gitCommit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'parameters': {key: value for key, value in vars(args).items() if key not in ['output', 'baseline']},
+        'sizes': {}
+    }
+    for users in args.users:
+        getClient().drop_database(args.database)
+        for step, error in initDatabase().items():
+            print(f'Error: could not set up {step}: {error}')
+        counts = seedDatabase(users=users, tasks_per_user=args.tasks, todos_per_task=args.todos, seed=args.seed)
+        print(f'\n{users} users: {counts}')
+        print(f'{"case":>40} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"calls/s":>10}')
+        results['sizes'][str(users)] = Suite(app, random.Random(args.seed), args.repeat, args.warmup).run(args.only)
+    getClient().drop_database(args.database)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold, args.metric)
+        for size, case, before, after in regressions:
+            print(f'Regression: {case} with {size} users, {args.metric} {before:.2f} ms -> {after:.2f} ms')
+        if len(regressions) > 0:
+            sys.exit(1)
+        print(f'No regression of the {args.metric} latency by more than {args.threshold:.0%}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+# coding=utf-8
+# configuration of the production server (gunicorn, see https://docs.gunicorn.org/en/stable/settings.html), used by
+#   SERVER=production python ./main.py
+# or directly by
+#   gunicorn main:app
+# The values are taken from the settings of the server (see src/util/settings.py)
+import tempfile
+
+from src.util.mongo import getClient, closeClients
+from src.util.cache import getCache, disableCache
+from src.util.metrics import getMetrics
+from src.util.initdb import initDatabase
+from src.util.settings import getSettings
+
+settings = getSettings()
+
+bind = f'{settings.flask_bind_ip}:{settings.port}'
+
+# number of worker processes and of threads per worker, which serve requests concurrently while they wait for MongoDB
+workers = settings.server_workers
+threads = settings.server_threads
+worker_class = 'gthread' if threads > 1 else 'sync'
+
+# seconds to keep idle client connections open (e.g., between the requests of the frontend), which needs the threaded workers
+keepalive = settings.server_keepalive
+# seconds after which a worker which does not respond is restarted
+timeout = settings.server_timeout
+# seconds which the workers have after a SIGTERM to finish the requests in progress
+graceful_timeout = settings.server_graceful_timeout
+# restart workers after this many requests (0 never), with a random jitter such that they do not restart at once
+max_requests = settings.server_max_requests
+max_requests_jitter = max_requests // 10
+
+# load the application once in the master process and fork the workers from it
+preload_app = settings.server_preload
+
+accesslog = settings.server_access_log
+errorlog = '-'
+
+def on_starting(server):
+    # set up the collections, validators and indexes once in the master process, however the server was started (see src/util/initdb.py)
+    for step, error in initDatabase().items():
+        print(f'Error: could not set up {step}: {error}')
+    # the workers share their metrics via a directory, such that each of them renders the metrics of all (see src/util/metrics.py)
+    if settings.metrics_enabled and workers > 1:
+        getMetrics().share(settings.metrics_dir or tempfile.mkdtemp(prefix='edutask-metrics-'), cache=getCache)
+
+def when_ready(server):
+    # the master process does not serve requests, so it releases the client it used while loading the application
+    closeClients()
+
+def post_fork(server, worker):
+    # every worker connects with a client of its own (the registry of the master is never used after a fork)
+    getClient()
+    # the cache of a worker is only invalidated by its own changes, hence it is not used alongside other workers (see src/util/cache.py)
+    if server.cfg.workers > 1:
+        disableCache()
+
+def worker_exit(server, worker):
+    # keep the final metrics of the worker, and close its connection pool once its requests are drained
+    if getMetrics().directory is not None:
+        getMetrics().flush()
+    closeClients()
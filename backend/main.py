@@ -1,22 +1,29 @@
 # coding=utf-8
-import os, json
-from dotenv import dotenv_values, load_dotenv
-load_dotenv()
+import json, atexit
 
-from flask import Flask, jsonify
+from flask import Flask, jsonify, request, abort
 from flask_cors import CORS, cross_origin
 
 from src.blueprints.userblueprint import user_blueprint
 from src.blueprints.taskblueprint import task_blueprint
 from src.blueprints.todoblueprint import todo_blueprint
 
-from src.controllers.usercontroller import UserController
-from src.controllers.taskcontroller import TaskController
-from src.util.daos import getDao
+from src.util.controllers import getUserController, getTaskController
+from src.util.mongo import closeClients, pingDatabase
+from src.util.server import serve
+from src.util.seeding import seedDatabase, loadDataModel, getSeedArgs, DUMMY_DATA
+from src.util.initdb import initDatabase
+from src.util.cache import getCache
+from src.util.metrics import getMetrics, instrument
+from src.util.profiling import enableProfiling
+from src.util.settings import getSettings
 
 
 app = Flask('todoapp')
 
+# release the shared MongoDB connection pool when the process terminates
+atexit.register(closeClients)
+
 # configure CORS for cross-origin resource sharing (between the frontend and backend)
 cors = CORS(app)
 app.config['CORS_HEADERS'] = 'Content-Type'
@@ -26,23 +33,61 @@ app.register_blueprint(blueprint=user_blueprint, url_prefix='/users')
 app.register_blueprint(blueprint=task_blueprint, url_prefix='/tasks')
 app.register_blueprint(blueprint=todo_blueprint, url_prefix='/todos')
 
+# measure the latency and the database calls of the requests (see src/util/metrics.py)
+if getSettings().metrics_enabled:
+    instrument(app)
+
+# profile single requests which carry one of the PROFILE_TOKENS (see src/util/profiling.py)
+if getSettings().profile_dir and getSettings().profile_tokens:
+    enableProfiling(app)
+
+# simple heartbeat method to check if the server is running. It does not depend on the database, so its body is serialized once
+HEARTBEAT = app.json.dumps({'version': getSettings().version})
 
-# simple heartbeat method to check if the server is running
 @app.route('/')
 @cross_origin()
 def ping():
-    VERSION = dotenv_values('.env').get('VERSION')
-    return jsonify({'version': VERSION}), 200
+    return app.response_class(HEARTBEAT, mimetype='application/json')
 
-# simple population method that adds initial data to the database
+# readiness probe, which checks that the database can be reached via the connection pool of this process
+@app.route('/ready', methods=['GET'])
+@cross_origin()
+def ready():
+    try:
+        pingDatabase()
+        return jsonify({'ready': True}), 200
+    except Exception as e:
+        print(f'{e.__class__.__name__}: {e}')
+        return jsonify({'ready': False}), 503
+
+# usage statistics (hits and misses) of the cache of this process
+@app.route('/cache', methods=['GET'])
+@cross_origin()
+def cache_stats():
+    return jsonify(getCache().stats()), 200
+
+# metrics in the text format of Prometheus, of all workers of the production server (see src/util/metrics.py). Only recorded if METRICS_ENABLED is set
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return app.response_class(getMetrics().render(getCache()), mimetype='text/plain; version=0.0.4')
+
+# simple population method that adds initial data to the database. If the number of users is given in the form data,
+# synthetic data is generated instead (optionally with the mean numbers of tasks per user and todos per task, see src/util/seeding.py)
 @app.route('/populate', methods=['POST'])
 @cross_origin()
 def populate():
-    usercontroller = UserController(getDao(collection_name='user'))
-    taskcontroller = TaskController(tasks_dao=getDao(collection_name='task'), videos_dao=getDao(collection_name='video'), todos_dao=getDao(collection_name='todo'), users_dao=getDao(collection_name='user'))
+    if 'users' in request.values:
+        try:
+            arguments = getSeedArgs(request.values, loadDataModel())
+        except ValueError as e:
+            abort(400, str(e))
+        return jsonify(seedDatabase(**arguments)), 200
+
+    usercontroller = getUserController()
+    taskcontroller = getTaskController()
 
     response = {'users': []}
-    with open(f'./src/static/data/dummy.json', 'r') as f:
+    with open(DUMMY_DATA, 'r') as f:
         dummydata = json.load(f)
 
         for userdata in dummydata:
@@ -52,14 +97,13 @@ def populate():
                 'email': userdata['email']
             })
 
-            for taskdata in userdata['tasks']:
-                taskcontroller.create({
-                    'userid': user['_id']['$oid'],
-                    'title': taskdata['title'],
-                    'description': taskdata['description'],
-                    'url': taskdata['url'],
-                    'todos': taskdata['todos']
-                })
+            taskcontroller.create_many([{
+                'userid': user['_id']['$oid'],
+                'title': taskdata['title'],
+                'description': taskdata['description'],
+                'url': taskdata['url'],
+                'todos': taskdata['todos']
+            } for taskdata in userdata['tasks']])
 
             response['users'].append(user['_id']['$oid'])
 
@@ -70,11 +114,14 @@ if __name__ == '__main__':
     # print the URL map, which lists all API endpoints of this flask server
     print(app.url_map)
 
-    host = '0.0.0.0'
-    if (os.environ.get('FLASK_BIND_IP')):
-        # in case the environment variables contain a different IP address, overwrite the host value
-        host = os.environ.get('FLASK_BIND_IP')
-
-    port = os.environ.get('PORT')
-    app.run(host, port)
+    # SERVER=production runs the application with several worker processes (see gunicorn.conf.py, which sets up the database before it starts
+    # the workers), the default is the development server of Flask
+    settings = getSettings()
+    if settings.server == 'production':
+        serve(app)
+    else:
+        # set up the collections, validators and indexes (this has no effect if they already exist, see src/util/initdb.py)
+        for step, error in initDatabase().items():
+            print(f'Error: could not set up {step}: {error}')
+        app.run(settings.flask_bind_ip, settings.port)
     
\ No newline at end of file
@@ -0,0 +1,103 @@
+from quart import Blueprint, jsonify, abort, request
+
+from pymongo.errors import WriteError
+import json
+
+from src.util.versions import getAsyncVersionStore
+from src.util.asynchttp import conditionalResponse, streamResponse
+from src.util.pagination import getPageArgs
+from src.util.views import getViewArg, getExpandArg, expandVariant, tasksVariant
+from src.util.streaming import getStreamArgs
+from src.util.batch import getBatchIds, batchValues
+from src.util.controllers import getAsyncTaskController
+
+# instantiate the quart blueprint, which serves the same routes as the flask task blueprint
+task_blueprint = Blueprint('task_blueprint', __name__)
+
+# create a new task
+@task_blueprint.route('/create', methods=['POST'])
+async def create():
+    try:
+        data = (await request.form).to_dict(flat=False)
+        userid = data['userid'][0]
+        # convert all non-array fields back to simple values
+        for key in ['title', 'description', 'start', 'due', 'userid', 'url']:
+            if key in data and isinstance(data[key], list):
+                data[key] = data[key][0]
+
+        taskid = await getAsyncTaskController().create(data)
+        tasks = await getAsyncTaskController().get_tasks_of_user(userid)
+        return jsonify(tasks), 200
+    except WriteError as e:
+        abort(400, 'Invalid input data')
+    except Exception as e:
+        print(f'{e.__class__.__name__}: {e}')
+        abort(500, 'Unknown server error')
+
+# get or update a specific task
+@task_blueprint.route('/byid/<id>', methods=['GET', 'PUT', 'DELETE'])
+async def get(id):
+    try:
+        if request.method == 'GET':
+            expand = getExpandArg(request.args)
+            version = await getAsyncVersionStore().get(('task', id))
+            etag = getAsyncVersionStore().tag(('task', id), version, variant=expandVariant(expand))
+            async def make_response():
+                return jsonify(await getAsyncTaskController().get(id, expand=expand, version=version))
+            return await conditionalResponse(etag, make_response)
+        elif request.method == 'PUT':
+            data = (await request.form).to_dict(flat=True)['data']
+            data = json.loads(data.replace("'", "\""))
+
+            task = await getAsyncTaskController().update(id, data)
+            return jsonify(task), 200
+        elif request.method == 'DELETE':
+            result = await getAsyncTaskController().delete(id=id)
+            return jsonify({"success": result}), 200
+    except ValueError as e:
+        abort(400, str(e))
+    except Exception as e:
+        print(f'{e.__class__.__name__}: {e}')
+        abort(500, 'Unknown server error')
+
+# obtain several tasks at once by their ids (the form field ids or the list ids of a json body, optionally with expand)
+@task_blueprint.route('/batch', methods=['POST'])
+async def get_batch():
+    try:
+        ids = getBatchIds(batchValues(await request.form, await request.get_json(silent=True)))
+        return jsonify(await getAsyncTaskController().get_many(ids, expand=getExpandArg(request.args))), 200
+    except ValueError as e:
+        abort(400, str(e))
+    except Exception as e:
+        print(f'{e.__class__.__name__}: {e}')
+        abort(500, 'Unknown server error')
+
+# obtain all tasks associated to a specific user
+@task_blueprint.route('/ofuser/<id>', methods=['GET'])
+async def get_tasks_of_user(id):
+    try:
+        limit, after = getPageArgs(request.args)
+        summary = getViewArg(request.args)
+        expand = getExpandArg(request.args)
+        version = await getAsyncVersionStore().get(('user', id))
+        etag = getAsyncVersionStore().tag(('user', id), version, variant=tasksVariant(limit, after, summary, expand))
+        async def make_response():
+            return jsonify(await getAsyncTaskController().get_tasks_of_user(id, limit=limit, after=after, summary=summary, expand=expand, version=version))
+        return await conditionalResponse(etag, make_response)
+    except ValueError as e:
+        abort(400, str(e))
+    except Exception as e:
+        print(f'{e.__class__.__name__}: {e}')
+        abort(500, 'Unknown server error')
+
+# export all tasks (with resolved videos and todos), streamed as a json array or as newline-delimited json (format, batch_size)
+@task_blueprint.route('/export', methods=['GET'])
+async def export_tasks():
+    try:
+        format, batch_size = getStreamArgs(request.args, key='format')
+        return streamResponse(getAsyncTaskController().iterate_tasks(batch_size=batch_size), format or 'json')
+    except ValueError as e:
+        abort(400, str(e))
+    except Exception as e:
+        print(f'{e.__class__.__name__}: {e}')
+        abort(500, 'Unknown server error')
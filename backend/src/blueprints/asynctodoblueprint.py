@@ -0,0 +1,63 @@
+from quart import Blueprint, jsonify, abort, request
+
+import json
+
+from pymongo.errors import WriteError
+
+from src.util.versions import getAsyncVersionStore
+from src.util.asynchttp import conditionalResponse
+from src.util.batch import getBatchIds, batchValues
+from src.util.controllers import getAsyncTodoController
+
+# instantiate the quart blueprint, which serves the same routes as the flask todo blueprint
+todo_blueprint = Blueprint('todo_blueprint', __name__)
+
+# create a new todo
+@todo_blueprint.route('/create', methods=['POST'])
+async def create():
+    try:
+        data = (await request.form).to_dict(flat=True)
+        todo = await getAsyncTodoController().create(data)
+        return jsonify(todo), 200
+    except WriteError as e:
+        abort(400, 'Invalid input data')
+    except ValueError as e:
+        abort(400, str(e))
+    except Exception as e:
+        print(f'{e.__class__.__name__}: {e}')
+        abort(500, 'Unknown server error')
+
+# get, update or delete one todo by id
+@todo_blueprint.route('/byid/<id>', methods=['GET', 'PUT', 'DELETE'])
+async def get_todo(id):
+    try:
+        if request.method == 'GET':
+            version = await getAsyncVersionStore().get(('todo', id))
+            etag = getAsyncVersionStore().tag(('todo', id), version)
+            async def make_response():
+                return jsonify(await getAsyncTodoController().get(id, version=version))
+            return await conditionalResponse(etag, make_response)
+        elif request.method == 'PUT':
+            data = (await request.form).to_dict(flat=True)['data']
+            data = json.loads(data.replace("'", "\""))
+
+            todo = await getAsyncTodoController().update(id, data)
+            return jsonify(todo), 200
+        elif request.method == 'DELETE':
+            await getAsyncTodoController().delete(id)
+            return jsonify({'id': id}), 200
+    except Exception as e:
+        print(f'{e.__class__.__name__}: {e}')
+        abort(500, 'Unknown server error')
+
+# obtain several todos at once by their ids (the form field ids or the list ids of a json body)
+@todo_blueprint.route('/batch', methods=['POST'])
+async def get_batch():
+    try:
+        ids = getBatchIds(batchValues(await request.form, await request.get_json(silent=True)))
+        return jsonify(await getAsyncTodoController().get_many(ids)), 200
+    except ValueError as e:
+        abort(400, str(e))
+    except Exception as e:
+        print(f'{e.__class__.__name__}: {e}')
+        abort(500, 'Unknown server error')
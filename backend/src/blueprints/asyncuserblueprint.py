@@ -0,0 +1,87 @@
+from quart import Blueprint, jsonify, abort, request
+
+from pymongo.errors import WriteError
+
+from src.util.versions import getAsyncVersionStore
+from src.util.asynchttp import conditionalResponse, streamResponse
+from src.util.pagination import getPageArgs, getProjection
+from src.util.streaming import getStreamArgs
+from src.util.batch import getBatchIds, batchValues
+from src.util.controllers import getAsyncTaskController, getAsyncUserController
+
+# instantiate the quart blueprint, which serves the same routes as the flask user blueprint
+user_blueprint = Blueprint('user_blueprint', __name__)
+
+# create a new user
+@user_blueprint.route('/create', methods=['POST'])
+async def create_user():
+    data = (await request.form).to_dict()
+    try:
+        user = await getAsyncUserController().create(data)
+        return jsonify(user)
+    except WriteError as e:
+        abort(400, 'Invalid input data')
+    except Exception as e:
+        print(f'{e.__class__.__name__}: {e}')
+        abort(500, 'Unknown server error')
+
+# obtain several users at once by their ids (the form field ids or the list ids of a json body)
+@user_blueprint.route('/batch', methods=['POST'])
+async def get_batch():
+    try:
+        ids = getBatchIds(batchValues(await request.form, await request.get_json(silent=True)))
+        return jsonify(await getAsyncUserController().get_many(ids)), 200
+    except ValueError as e:
+        abort(400, str(e))
+    except Exception as e:
+        print(f'{e.__class__.__name__}: {e}')
+        abort(500, 'Unknown server error')
+
+# obtain one user by id (and optionally update or delete him)
+@user_blueprint.route('/<id>', methods=['GET', 'PUT', 'DELETE'])
+async def get_user(id):
+    try:
+        if request.method == 'GET':
+            version = await getAsyncVersionStore().get(('user', id))
+            etag = getAsyncVersionStore().tag(('user', id), version)
+            async def make_response():
+                return jsonify(await getAsyncUserController().get(id, version=version))
+            return await conditionalResponse(etag, make_response)
+        elif request.method == 'PUT':
+            data = (await request.form).to_dict()
+            user = await getAsyncUserController().update_and_get(id, data)
+            return jsonify(user), 200
+        elif request.method == 'DELETE':
+            deleted = await getAsyncTaskController().delete_of_user(id=id)
+            result = await getAsyncUserController().delete(id=id)
+            return jsonify({"success": result, "deleted": deleted}), 200
+    except Exception as e:
+        print(f'{e.__class__.__name__}: {e}')
+        abort(500, 'Unknown server error')
+
+# obtain one user by email
+@user_blueprint.route('/bymail/<email>', methods=['GET'])
+async def get_user_by_mail(email):
+    try:
+        user = await getAsyncUserController().get_user_by_email(email)
+        return jsonify(user), 200
+    except Exception as e:
+        print(f'{e.__class__.__name__}: {e}')
+        abort(500, 'Unknown server error')
+
+# obtain all users and return them
+@user_blueprint.route('/all', methods=['GET'])
+async def get_users():
+    try:
+        # optionally streamed (stream, batch_size), paginated (limit, next) and projected (fields)
+        format, batch_size = getStreamArgs(request.args)
+        if format is not None:
+            return streamResponse(getAsyncUserController().iterate_all(projection=getProjection(request.args), batch_size=batch_size), format)
+        limit, after = getPageArgs(request.args)
+        users = await getAsyncUserController().get_all(limit=limit, after=after, projection=getProjection(request.args))
+        return jsonify(users), 200
+    except ValueError as e:
+        abort(400, str(e))
+    except Exception as e:
+        print(f'{e.__class__.__name__}: {e}')
+        abort(500, 'Unknown server error')
@@ -4,10 +4,12 @@ from flask_cors import cross_origin
 from pymongo.errors import WriteError
 import json
 
-#import src.controllers.taskcontroller as controller
-from src.controllers.taskcontroller import TaskController
-from src.util.daos import getDao
-controller = TaskController(tasks_dao=getDao(collection_name='task'), videos_dao=getDao(collection_name='video'), todos_dao=getDao(collection_name='todo'), users_dao=getDao(collection_name='user'))
+from src.util.versions import getVersionStore, conditionalResponse
+from src.util.pagination import getPageArgs
+from src.util.views import getViewArg, getExpandArg, expandVariant, tasksVariant
+from src.util.streaming import getStreamArgs, streamResponse
+from src.util.batch import getBatchIds, batchValues
+from src.util.controllers import getTaskController
 
 # instantiate the flask blueprint
 task_blueprint = Blueprint('task_blueprint', __name__)
@@ -24,8 +26,8 @@ def create():
             if key in data and isinstance(data[key], list):
                 data[key] = data[key][0]
 
-        taskid = controller.create(data)
-        tasks = controller.get_tasks_of_user(userid)
+        taskid = getTaskController().create(data)
+        tasks = getTaskController().get_tasks_of_user(userid)
         return jsonify(tasks), 200
     except WriteError as e:
         abort(400, 'Invalid input data')
@@ -39,17 +41,36 @@ def create():
 def get(id):
     try:
         if request.method == 'GET':
-            task = controller.get(id)
-            return jsonify(task), 200
+            # optionally only some references resolved (expand)
+            expand = getExpandArg(request.args)
+            # the cached task is only used if it has the version of the ETag
+            version = getVersionStore().get(('task', id))
+            etag = getVersionStore().tag(('task', id), version, variant=expandVariant(expand))
+            return conditionalResponse(etag, lambda: jsonify(getTaskController().get(id, expand=expand, version=version)))
         elif request.method == 'PUT':
             data = request.form.to_dict(flat=True)['data']
             data = json.loads(data.replace("'", "\""))
 
-            task = controller.update(id, data)
+            task = getTaskController().update(id, data)
             return jsonify(task), 200
         elif request.method == 'DELETE':
-            result = controller.delete(id=id)
+            result = getTaskController().delete(id=id)
             return jsonify({"success": result}), 200
+    except ValueError as e:
+        abort(400, str(e))
+    except Exception as e:
+        print(f'{e.__class__.__name__}: {e}')
+        abort(500, 'Unknown server error')
+
+# obtain several tasks at once by their ids (the form field ids or the list ids of a json body, optionally with expand)
+@task_blueprint.route('/batch', methods=['POST'])
+@cross_origin()
+def get_batch():
+    try:
+        ids = getBatchIds(batchValues(request.form, request.get_json(silent=True)))
+        return jsonify(getTaskController().get_many(ids, expand=getExpandArg(request.args))), 200
+    except ValueError as e:
+        abort(400, str(e))
     except Exception as e:
         print(f'{e.__class__.__name__}: {e}')
         abort(500, 'Unknown server error')
@@ -59,8 +80,29 @@ def get(id):
 @cross_origin()
 def get_tasks_of_user(id):
     try:
-        tasks = controller.get_tasks_of_user(id)
-        return jsonify(tasks), 200
+        # optionally paginated (limit, next), and optionally only the summaries of the tasks (view=summary) or some references resolved (expand)
+        limit, after = getPageArgs(request.args)
+        summary = getViewArg(request.args)
+        expand = getExpandArg(request.args)
+        # the version of a user covers all of its tasks
+        version = getVersionStore().get(('user', id))
+        etag = getVersionStore().tag(('user', id), version, variant=tasksVariant(limit, after, summary, expand))
+        return conditionalResponse(etag, lambda: jsonify(getTaskController().get_tasks_of_user(id, limit=limit, after=after, summary=summary, expand=expand, version=version)))
+    except ValueError as e:
+        abort(400, str(e))
+    except Exception as e:
+        print(f'{e.__class__.__name__}: {e}')
+        abort(500, 'Unknown server error')
+
+# export all tasks (with resolved videos and todos), streamed as a json array or as newline-delimited json (format, batch_size)
+@task_blueprint.route('/export', methods=['GET'])
+@cross_origin()
+def export_tasks():
+    try:
+        format, batch_size = getStreamArgs(request.args, key='format')
+        return streamResponse(getTaskController().iterate_tasks(batch_size=batch_size), format or 'json')
+    except ValueError as e:
+        abort(400, str(e))
     except Exception as e:
         print(f'{e.__class__.__name__}: {e}')
         abort(500, 'Unknown server error')
\ No newline at end of file
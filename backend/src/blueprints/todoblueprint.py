@@ -5,9 +5,9 @@ import json
 
 from pymongo.errors import WriteError
 
-from src.controllers.todocontroller import TodoController
-from src.util.daos import getDao
-controller = TodoController(todo_dao=getDao(collection_name='todo'), tasks_dao=getDao(collection_name='task'))
+from src.util.versions import getVersionStore, conditionalResponse
+from src.util.batch import getBatchIds, batchValues
+from src.util.controllers import getTodoController
 
 # instantiate the flask blueprint
 todo_blueprint = Blueprint('todo_blueprint', __name__)
@@ -18,10 +18,12 @@ todo_blueprint = Blueprint('todo_blueprint', __name__)
 def create():
     try:
         data = request.form.to_dict(flat=True)
-        todo = controller.create(data)
+        todo = getTodoController().create(data)
         return jsonify(todo), 200
     except WriteError as e:
         abort(400, 'Invalid input data')
+    except ValueError as e:
+        abort(400, str(e))
     except Exception as e:
         print(f'{e.__class__.__name__}: {e}')
         abort(500, 'Unknown server error')
@@ -33,19 +35,32 @@ def get_todo(id):
     try:
         # get a specific todo
         if request.method == 'GET':
-            todo = controller.get(id)
-            return jsonify(todo), 200
+            version = getVersionStore().get(('todo', id))
+            return conditionalResponse(getVersionStore().tag(('todo', id), version), lambda: jsonify(getTodoController().get(id, version=version)))
         # update the todo
         elif request.method == 'PUT':
             data = request.form.to_dict(flat=True)['data']
             data = json.loads(data.replace("'", "\""))
 
-            todo = controller.update(id, data)
+            todo = getTodoController().update(id, data)
             return jsonify(todo), 200
         # delete an existing todo
         elif request.method == 'DELETE':
-            controller.delete(id)
+            getTodoController().delete(id)
             return jsonify({'id': id}), 200
     except Exception as e:
         print(f'{e.__class__.__name__}: {e}')
-        abort(500, 'Unknown server error')
\ No newline at end of file
+        abort(500, 'Unknown server error')
+
+# obtain several todos at once by their ids (the form field ids or the list ids of a json body)
+@todo_blueprint.route('/batch', methods=['POST'])
+@cross_origin()
+def get_batch():
+    try:
+        ids = getBatchIds(batchValues(request.form, request.get_json(silent=True)))
+        return jsonify(getTodoController().get_many(ids)), 200
+    except ValueError as e:
+        abort(400, str(e))
+    except Exception as e:
+        print(f'{e.__class__.__name__}: {e}')
+        abort(500, 'Unknown server error')
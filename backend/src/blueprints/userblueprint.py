@@ -3,11 +3,11 @@ from flask_cors import cross_origin
 
 from pymongo.errors import WriteError
 
-from src.util.daos import getDao
-from src.controllers.usercontroller import UserController
-from src.controllers.taskcontroller import TaskController
-controller = UserController(getDao(collection_name='user'))
-taskcontroller = TaskController(tasks_dao=getDao(collection_name='task'), videos_dao=getDao(collection_name='video'), todos_dao=getDao(collection_name='todo'), users_dao=getDao(collection_name='user'))
+from src.util.versions import getVersionStore, conditionalResponse
+from src.util.pagination import getPageArgs, getProjection
+from src.util.streaming import getStreamArgs, streamResponse
+from src.util.batch import getBatchIds, batchValues
+from src.util.controllers import getTaskController, getUserController
 
 # instantiate the flask blueprint
 user_blueprint = Blueprint('user_blueprint', __name__)
@@ -19,7 +19,7 @@ def create_user():
     data = request.form.to_dict()
     user = None
     try:
-        user = controller.create(data)
+        user = getUserController().create(data)
         return jsonify(user)
     except WriteError as e:
         abort(400, 'Invalid input data')
@@ -27,6 +27,19 @@ def create_user():
         print(f'{e.__class__.__name__}: {e}')
         abort(500, 'Unknown server error')
 
+# obtain several users at once by their ids (the form field ids or the list ids of a json body)
+@user_blueprint.route('/batch', methods=['POST'])
+@cross_origin()
+def get_batch():
+    try:
+        ids = getBatchIds(batchValues(request.form, request.get_json(silent=True)))
+        return jsonify(getUserController().get_many(ids)), 200
+    except ValueError as e:
+        abort(400, str(e))
+    except Exception as e:
+        print(f'{e.__class__.__name__}: {e}')
+        abort(500, 'Unknown server error')
+
 # obtain one user by id (and optionally update him)
 @user_blueprint.route('/<id>', methods=['GET', 'PUT', 'DELETE'])
 @cross_origin()
@@ -34,19 +47,18 @@ def get_user(id):
     try:
         # get a specific user
         if request.method == 'GET':
-            user = controller.get(id)
-            return jsonify(user), 200
+            version = getVersionStore().get(('user', id))
+            return conditionalResponse(getVersionStore().tag(('user', id), version), lambda: jsonify(getUserController().get(id, version=version)))
         # update the user
         elif request.method == 'PUT':
             data = request.form
-            update_result = controller.update(id, data)
-            user = controller.get(id)
+            user = getUserController().update_and_get(id, data)
             return jsonify(user), 200
         # delete a user
         elif request.method == 'DELETE':
-            taskcontroller.delete_of_user(id=id)
-            result = controller.delete(id=id)
-            return jsonify({"success": result}), 200
+            deleted = getTaskController().delete_of_user(id=id)
+            result = getUserController().delete(id=id)
+            return jsonify({"success": result, "deleted": deleted}), 200
     except Exception as e:
         print(f'{e.__class__.__name__}: {e}')
         abort(500, 'Unknown server error')
@@ -56,7 +68,7 @@ def get_user(id):
 @cross_origin()
 def get_user_by_mail(email):
     try:
-        user = controller.get_user_by_email(email)
+        user = getUserController().get_user_by_email(email)
         return jsonify(user), 200
     except Exception as e:
         print(f'{e.__class__.__name__}: {e}')
@@ -67,8 +79,15 @@ def get_user_by_mail(email):
 @cross_origin()
 def get_users():
     try:
-        users = controller.get_all()
+        # optionally streamed (stream, batch_size), paginated (limit, next) and projected (fields)
+        format, batch_size = getStreamArgs(request.args)
+        if format is not None:
+            return streamResponse(getUserController().iterate_all(projection=getProjection(request.args), batch_size=batch_size), format)
+        limit, after = getPageArgs(request.args)
+        users = getUserController().get_all(limit=limit, after=after, projection=getProjection(request.args))
         return jsonify(users), 200
+    except ValueError as e:
+        abort(400, str(e))
     except Exception as e:
         print(f'{e.__class__.__name__}: {e}')
         abort(500, 'Unknown server error')
\ No newline at end of file
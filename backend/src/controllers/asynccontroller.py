@@ -0,0 +1,76 @@
+from bson.objectid import ObjectId
+
+from src.controllers.controller import Controller
+from src.util.cache import MISS
+
+class AsyncController(Controller):
+    """Asynchronous variant of the Controller for the ASGI application, which works on an asynchronous data access object (see src.util.asyncdao) and an AsyncVersionStore. All methods accessing the database are coroutines with the same parameters and results as the synchronous ones, see Controller."""
+
+    async def changed(self, *keys: tuple):
+        self.cache.invalidate(*keys)
+        if self.versions is not None:
+            await self.versions.bump(*keys)
+
+    async def create(self, data: dict):
+        try:
+            return await self.dao.create(data)
+        except Exception as e:
+            raise
+
+    async def get(self, id: str, version: int = None):
+        try:
+            obj = self.cache.get((self.namespace, id), version=version)
+            if obj is MISS:
+                token = self.cache.token()
+                obj = await self.dao.findOne(id)
+                if obj is not None:
+                    self.cache.set((self.namespace, id), obj, token=token, version=version)
+            return obj
+        except Exception as e:
+            raise
+
+    async def get_many(self, ids: list):
+        try:
+            token = self.cache.token()
+            items, misses = self.cached_many(ids)
+            if len(misses) > 0:
+                self.remember_many(items, await self.dao.find(filter={'_id': {'$in': [ObjectId(id) for id in misses]}}), token=token)
+            return self.batch(ids, items)
+        except Exception as e:
+            raise
+
+    async def get_all(self, limit: int = None, after: str = None, projection: dict = None):
+        try:
+            if limit is None:
+                return await self.dao.find(projection=projection)
+            items, next_page = await self.dao.find_page(limit=limit, after=after, projection=projection)
+            return {'items': items, 'next': next_page}
+        except Exception as e:
+            raise
+
+    def iterate_all(self, projection: dict = None, batch_size: int = 0):
+        return self.dao.iterate(projection=projection, batch_size=batch_size)
+
+    async def update(self, id: str, data: dict):
+        try:
+            update_result = await self.dao.update(id=id, update_data=data)
+            await self.changed((self.namespace, id))
+            return update_result
+        except Exception as e:
+            raise
+
+    async def update_and_get(self, id: str, data: dict):
+        try:
+            obj = await self.dao.findOneAndUpdate(id=id, update_data=data)
+            await self.changed((self.namespace, id))
+            return obj
+        except Exception as e:
+            raise
+
+    async def delete(self, id: str):
+        try:
+            result = await self.dao.delete(id=id)
+            await self.changed((self.namespace, id))
+            return result
+        except Exception as e:
+            raise
@@ -0,0 +1,169 @@
+import asyncio
+from bson.objectid import ObjectId
+
+from pymongo.errors import WriteError
+
+from src.controllers.asynccontroller import AsyncController
+from src.controllers.taskcontroller import TaskController, chunks
+from src.util.cache import MISS
+
+class AsyncTaskController(AsyncController, TaskController):
+    """Asynchronous variant of the TaskController, see AsyncController. The aggregation pipelines and the preparation of new tasks are shared with the TaskController, and database operations which do not depend on each other run concurrently."""
+
+    async def create(self, data: dict):
+        try:
+            return (await self.create_many([data]))[0]
+        except Exception as e:
+            raise
+
+    async def create_many(self, datas: list):
+        userids, videos, todos, tasks = self.prepare(datas)
+
+        created = len(tasks)
+        failure = None
+        # the written documents of each collection along with the indexes of their tasks
+        written = []
+        try:
+            # the collections are written one after another, such that a failure stops the objects of all later tasks
+            for dao, objects in [(self.videos_dao, videos), (self.todos_dao, todos), (self.dao, tasks)]:
+                documents, taskindex = [], []
+                for index in range(created):
+                    documents.extend(objects[index])
+                    taskindex.extend([index] * len(objects[index]))
+
+                try:
+                    await dao.create_many(documents)
+                    written.append((dao, documents, taskindex))
+                except WriteError as e:
+                    failure = e
+                    created = taskindex[e.details['nInserted']]
+                    written.append((dao, documents[:e.details['nInserted']], taskindex[:e.details['nInserted']]))
+
+            # remove the videos and todos written for the failing task and the tasks following it, which are not created
+            for dao, documents, taskindex in written:
+                leftovers = [document['_id'] for document, index in zip(documents, taskindex) if index >= created]
+                if len(leftovers) > 0:
+                    await dao.delete_many(leftovers)
+
+            pushes = self.pushes(userids[:created], tasks[:created])
+            await self.users_dao.bulk_update(pushes)
+            await self.changed(*[(self.users_dao.collection_name, uid) for uid, _ in pushes])
+
+            if failure is not None:
+                raise failure
+            return [str(task[0]['_id']) for task in tasks]
+        except Exception as e:
+            raise
+
+    async def get(self, id: str, expand: tuple = None, version: int = None):
+        try:
+            key = (self.namespace, id) + self.expansion_key(expand)
+            task = self.cache.get(key, version=version)
+            if task is MISS:
+                token = self.cache.token()
+                tasks = await self.dao.aggregate([{'$match': {'_id': ObjectId(id)}}] + self.population_stages(expand))
+                if len(tasks) == 0:
+                    return None
+                task = tasks[0]
+                self.cache.set(key, task, depends_on=self.dependencies([task]), token=token, version=version)
+            return task
+        except Exception as e:
+            raise
+
+    async def get_many(self, ids: list, expand: tuple = None):
+        try:
+            token = self.cache.token()
+            items, misses = self.cached_many(ids, self.expansion_key(expand))
+            if len(misses) > 0:
+                tasks = await self.dao.aggregate([{'$match': {'_id': {'$in': [ObjectId(id) for id in misses]}}}] + self.population_stages(expand))
+                self.remember_many(items, tasks, self.expansion_key(expand), self.dependencies, token=token)
+            return self.batch(ids, items)
+        except Exception as e:
+            raise
+
+    async def get_tasks_of_user(self, id: str, limit: int = None, after: str = None, summary: bool = False, expand: tuple = None, version: int = None):
+        try:
+            key = self.tasks_of_user_key(id, limit, after, summary, expand)
+            result = self.cache.get(key, version=version)
+            if result is MISS:
+                token = self.cache.token()
+                tasks = await self.dao.aggregate(self.tasks_of_user_stages(id, limit, after) + (self.summary_stages() if summary else self.population_stages(expand)))
+                result = self.page(tasks, limit)
+                self.cache.set(key, result, depends_on=[(self.users_dao.collection_name, id)] + self.dependencies(tasks), token=token, version=version)
+            return result
+        except Exception as e:
+            raise
+
+    def iterate_tasks(self, batch_size: int = None):
+        return self.dao.aggregate_iterate([{'$sort': {'_id': 1}}] + self.population_stages(), batch_size=batch_size)
+
+    async def populate_task(self, task):
+        if self.embedded:
+            return TaskController.populate_task(self, task)
+        # the video and the todos are fetched concurrently
+        task['video'], task['todos'] = await asyncio.gather(
+            self.videos_dao.findOne(task['video']['$oid']),
+            self.todos_dao.find(filter={'_id': task['todos']}, toid=['_id'])
+        )
+        return task
+
+    async def update(self, id: str, data: dict):
+        try:
+            update_result, owners = await asyncio.gather(self.dao.update(id=id, update_data=data), self.owner_keys([id]))
+            await self.changed((self.namespace, id), *owners)
+            return update_result
+        except Exception as e:
+            raise
+
+    async def update_and_get(self, id: str, data: dict):
+        try:
+            task = await self.dao.findOneAndUpdate(id=id, update_data=data)
+            await self.changed((self.namespace, id), *self.owners([task] if task is not None else []))
+            return task
+        except Exception as e:
+            raise
+
+    async def owner_keys(self, ids: list):
+        if self.versions is None or len(ids) == 0:
+            return []
+        return self.owners(await self.dao.find(filter={'_id': {'$in': [ObjectId(id) for id in ids]}}, projection={'owner': 1}))
+
+    async def delete(self, id: str):
+        try:
+            await self.delete_tasks([id])
+            return True
+        except Exception as e:
+            raise
+
+    async def delete_of_user(self, id: str):
+        try:
+            tasks = await self.dao.find(filter={'owner': ObjectId(id)}, projection={'_id': 1})
+            return await self.delete_tasks([task['_id']['$oid'] for task in tasks])
+        except Exception as e:
+            raise
+
+    async def delete_tasks(self, ids: list):
+        counts = {'task': 0, 'video': 0, 'todo': 0}
+        try:
+            for taskids in chunks(ids, self.DELETE_CHUNK_SIZE):
+                tasks = await self.dao.find(filter={'_id': {'$in': [ObjectId(taskid) for taskid in taskids]}}, projection={'video': 1, 'todos': 1, 'owner': 1})
+                videoids, todoids = self.references(tasks)
+                videochunks = list(chunks(videoids, self.DELETE_CHUNK_SIZE))
+                # embedded todos are deleted along with their tasks
+                todochunks = [] if self.embedded else list(chunks(todoids, self.DELETE_CHUNK_SIZE))
+                if self.embedded:
+                    counts['video'] += len([task for task in tasks if task.get('video') is not None])
+                    counts['todo'] += len(todoids)
+
+                deleted, *deletes = await asyncio.gather(
+                    self.dao.delete_many(taskids),
+                    *[self.videos_dao.delete_many(videochunk) for videochunk in videochunks],
+                    *[self.todos_dao.delete_many(todochunk) for todochunk in todochunks]
+                )
+                counts['task'] += deleted
+                counts['video'] += sum(deletes[:len(videochunks)])
+                counts['todo'] += sum(deletes[len(videochunks):])
+                await self.changed(*[(self.namespace, taskid) for taskid in taskids], *[(self.todos_dao.collection_name, todoid) for todoid in todoids], *self.owners(tasks))
+            return counts
+        except Exception as e:
+            raise
@@ -0,0 +1,137 @@
+import asyncio
+from bson.objectid import ObjectId
+
+from src.controllers.asynccontroller import AsyncController
+from src.controllers.todocontroller import TodoController
+from src.util.cache import MISS
+from src.util.converters import to_json
+
+class AsyncTodoController(AsyncController, TodoController):
+    """Asynchronous variant of the TodoController, see AsyncController. The tasks and owners affected by a change are looked up concurrently to the change itself."""
+
+    async def create(self, data: dict):
+        try:
+            if 'taskid' in data:
+                taskid = data['taskid']
+                del data['taskid']
+
+                if 'done' in data:
+                    if isinstance(data['done'], str):
+                        data['done'] = (data['done'].lower() == 'true')
+
+                if self.embedded:
+                    todo = {'_id': ObjectId(), **data}
+                    push = self.addition(todo, data.get('done'))
+                    todo = to_json(todo)
+                else:
+                    todo = await self.dao.create(data)
+                    push = self.addition(ObjectId(todo['_id']['$oid']), data.get('done'))
+                task = await self.tasks_dao.findOneAndUpdate(id=taskid, update_data=push, projection={'_id': 1, 'owner': 1})
+                if task is None:
+                    if not self.embedded:
+                        await self.dao.delete(id=todo['_id']['$oid'])
+                    raise ValueError(f'Error: no task with id {taskid}')
+                await self.changed((self.tasks_dao.collection_name, taskid), *self.owner_keys(task))
+
+                return todo
+            elif self.embedded:
+                raise ValueError('Error: a todo must belong to a task (taskid), since the tasks embed their todos')
+            else:
+                return await self.dao.create(data)
+        except Exception as e:
+            raise
+
+    async def get(self, id: str, version: int = None):
+        if not self.embedded:
+            return await super().get(id, version=version)
+        try:
+            todo = self.cache.get((self.namespace, id), version=version)
+            if todo is MISS:
+                token = self.cache.token()
+                tasks = await self.tasks_dao.find(filter=self.embedded_filter(id), projection=self.embedded_projection(id))
+                todo = tasks[0]['todos'][0] if len(tasks) > 0 else None
+                if todo is not None:
+                    self.cache.set((self.namespace, id), todo, token=token, version=version)
+            return todo
+        except Exception as e:
+            raise
+
+    async def get_many(self, ids: list):
+        if not self.embedded:
+            return await super().get_many(ids)
+        try:
+            token = self.cache.token()
+            items, misses = self.cached_many(ids)
+            if len(misses) > 0:
+                tasks = await self.tasks_dao.find(filter={'todos._id': {'$in': [ObjectId(id) for id in misses]}}, projection={'todos': 1})
+                self.remember_many(items, self.embedded_todos(tasks, misses), token=token)
+            return self.batch(ids, items)
+        except Exception as e:
+            raise
+
+    async def update(self, id: str, data: dict):
+        try:
+            if self.embedded:
+                task = await self.update_embedded(id, data, projection={'_id': 1, 'owner': 1})
+                await self.changed((self.namespace, id), *self.container_keys(task))
+                return True
+            parents, _ = await asyncio.gather(self.parent_keys(id), self.update_referenced(id, data, projection={'_id': 1}))
+            await self.changed((self.namespace, id), *parents)
+            return True
+        except Exception as e:
+            raise
+
+    async def update_and_get(self, id: str, data: dict):
+        try:
+            if self.embedded:
+                task = await self.update_embedded(id, data, projection={**self.embedded_projection(id), 'owner': 1})
+                await self.changed((self.namespace, id), *self.container_keys(task))
+                return task['todos'][0] if task is not None else None
+            parents, todo = await asyncio.gather(self.parent_keys(id), self.update_referenced(id, data))
+            await self.changed((self.namespace, id), *parents)
+            return todo
+        except Exception as e:
+            raise
+
+    async def delete(self, id: str):
+        try:
+            task = None
+            if self.embedded:
+                for attempt, (condition, delta) in enumerate(self.counted_updates({'$unset': {'done': ''}})):
+                    task = await self.tasks_dao.findAndUpdate(self.embedded_filter(id, condition), self.removal({'_id': ObjectId(id)}, delta), projection={'_id': 1, 'owner': 1})
+                    if task is not None or (attempt == self.LOOKUP_ATTEMPT and len(await self.tasks_dao.find(filter=self.embedded_filter(id), projection={'_id': 1})) == 0):
+                        break
+            else:
+                todo = await self.dao.findOneAndDelete(id, projection={'done': 1})
+                if todo is not None:
+                    task = await self.tasks_dao.findAndUpdate({'todos': ObjectId(id)}, self.removal(ObjectId(id), -1 if todo.get('done') is True else 0), projection={'_id': 1, 'owner': 1})
+            await self.changed((self.namespace, id), *self.container_keys(task))
+            return True
+        except Exception as e:
+            raise
+
+    async def update_embedded(self, id: str, data: dict, projection: dict):
+        for attempt, (condition, delta) in enumerate(self.counted_updates(data)):
+            task = await self.tasks_dao.findAndUpdate(self.embedded_filter(id, condition), self.counted(self.positional(data), delta), projection=projection)
+            if task is not None:
+                return task
+            if attempt == self.LOOKUP_ATTEMPT and len(await self.tasks_dao.find(filter=self.embedded_filter(id), projection={'_id': 1})) == 0:
+                return None
+        return None
+
+    async def update_referenced(self, id: str, data: dict, projection: dict = None):
+        for attempt, (condition, delta) in enumerate(self.counted_updates(data)):
+            todo = await self.dao.findAndUpdate({'_id': ObjectId(id), **condition}, data, projection=projection)
+            if todo is not None:
+                if delta != 0:
+                    await self.tasks_dao.findAndUpdate({'todos': ObjectId(id)}, {'$inc': {'done': delta}}, projection={'_id': 1})
+                return todo
+            if attempt == self.LOOKUP_ATTEMPT and len(await self.dao.find(filter={'_id': ObjectId(id)}, projection={'_id': 1})) == 0:
+                return None
+        return None
+
+    async def parent_keys(self, id: str):
+        if self.versions is None or self.users_dao is None:
+            return []
+        tasks = await self.tasks_dao.aggregate(self.parent_stages(id))
+        return self.parents(tasks)
@@ -0,0 +1,36 @@
+from src.controllers.asynccontroller import AsyncController
+from src.controllers.usercontroller import UserController, emailValidator
+from src.util.indexes import EMAIL_COLLATION
+
+import re
+
+class AsyncUserController(AsyncController, UserController):
+    """Asynchronous variant of the UserController, see AsyncController."""
+
+    async def get_user_by_email(self, email: str):
+        if not re.fullmatch(emailValidator, email):
+            raise ValueError('Error: invalid email address')
+
+        try:
+            users = await self.dao.find({'email': email}, collation=EMAIL_COLLATION)
+            if len(users) == 1:
+                return users[0]
+            elif len(users) == 0:
+                return None
+            else:
+                print(f'Error: more than one user found with mail {email}')
+                return users[0]
+        except Exception as e:
+            raise
+
+    async def update(self, id, data):
+        try:
+            return await super().update(id=id, data={'$set': data})
+        except Exception as e:
+            raise
+
+    async def update_and_get(self, id, data):
+        try:
+            return await super().update_and_get(id=id, data={'$set': data})
+        except Exception as e:
+            raise
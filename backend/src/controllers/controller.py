@@ -1,15 +1,37 @@
+from bson.objectid import ObjectId
+
 from  src.util.dao import DAO
+from src.util.cache import Cache, NullCache, MISS
 
 class Controller:
-    def __init__(self, dao: DAO):
+    def __init__(self, dao: DAO, cache: Cache = None, versions=None):
         """Instantiate a controller, which acts as a mediator between the data access object and the blueprints.
         The main purpose of a controller is to abstract the data access from the blueprint routes, such that they can be
         executed outside of server operations.
 
         parameters:
             dao -- data access object, which has to grant access to the specific collection of the database
+            cache -- optional cache for objects read by id (see src.util.cache), no caching if omitted
+            versions -- optional VersionStore (see src.util.versions) whose counters are incremented upon changes, which is needed for ETags
         """
         self.dao = dao
+        self.cache = cache if cache is not None else NullCache()
+        self.versions = versions
+
+    def changed(self, *keys: tuple):
+        """Announce that the objects with the given keys (tuples of namespace and id) changed: remove them from the cache and increment their versions.
+
+        parameters:
+            keys -- the keys of the changed objects
+        """
+        self.cache.invalidate(*keys)
+        if self.versions is not None:
+            self.versions.bump(*keys)
+
+    @property
+    def namespace(self):
+        """The namespace of the cache keys of this controller, i.e., the name of its collection"""
+        return self.dao.collection_name
 
     def create(self, data: dict):
         """Create a new object in the database and return the newly created object. The database object will contain
@@ -27,12 +49,13 @@ class Controller:
             raise
 
     # get a user by id
-    def get(self, id: str):
+    def get(self, id: str, version: int = None):
         """Search for an object by id and return the associated database object. The database object will contain
         a unique id, which is accessible at ob['_id']['$oid] in the jsonified form.
 
         parameters:
             id -- the unique identifier of the object
+            version -- optional version of the object read before (see src.util.versions), a cached object is only returned if it was read at that version
 
         returns:
             user -- if an object associated to the given id can be found
@@ -42,25 +65,117 @@ class Controller:
             Exception -- in case the database operation fails, raise an exception
         """
         try:
-            return self.dao.findOne(id)
+            obj = self.cache.get((self.namespace, id), version=version)
+            if obj is MISS:
+                token = self.cache.token()
+                obj = self.dao.findOne(id)
+                if obj is not None:
+                    self.cache.set((self.namespace, id), obj, token=token, version=version)
+            return obj
         except Exception as e:
             raise
 
-    def get_all(self):
+    def get_many(self, ids: list):
+        """Search for several objects by their ids at once. The objects which are not cached are read with one single database query.
+
+        parameters:
+            ids -- list of unique identifiers of objects
+
+        returns:
+            result -- dict containing the found objects by their id under items and the ids without an object under missing
+
+        raises:
+            Exception -- in case the database operation fails, raise an exception
+        """
+        try:
+            token = self.cache.token()
+            items, misses = self.cached_many(ids)
+            if len(misses) > 0:
+                self.remember_many(items, self.dao.find(filter={'_id': {'$in': [ObjectId(id) for id in misses]}}), token=token)
+            return self.batch(ids, items)
+        except Exception as e:
+            raise
+
+    def cached_many(self, ids: list, suffix: tuple = ()):
+        """Look up several objects in the cache (see get_many).
+
+        parameters:
+            ids -- list of unique identifiers of objects
+            suffix -- optional part of the cache keys following the namespace and id, which distinguishes variants of the objects
+
+        returns:
+            items -- dict containing the cached objects by their id
+            misses -- list of the ids of the objects which are not cached
+        """
+        items, misses = {}, []
+        for id in ids:
+            obj = self.cache.get((self.namespace, id) + suffix)
+            if obj is MISS:
+                misses.append(id)
+            else:
+                items[id] = obj
+        return items, misses
+
+    def remember_many(self, items: dict, objects: list, suffix: tuple = (), dependencies=None, token=None):
+        """Add objects read from the database to the found objects by their id and to the cache (see cached_many).
+
+        parameters:
+            items -- dict containing the found objects by their id, which is extended
+            objects -- list of the read objects
+            suffix -- optional part of the cache keys following the namespace and id
+            dependencies -- optional function returning the cache keys a list of objects depends on (e.g., TaskController.dependencies)
+            token -- the token of the cache taken before the objects were read (see Cache.token)
+        """
+        for obj in objects:
+            id = obj['_id']['$oid']
+            items[id] = obj
+            self.cache.set((self.namespace, id) + suffix, obj, depends_on=dependencies([obj]) if dependencies is not None else (), token=token)
+
+    def batch(self, ids: list, items: dict):
+        """Return the result of get_many: the found objects in the order of the requested ids and the ids without an object."""
+        return {'items': {id: items[id] for id in ids if id in items}, 'missing': [id for id in ids if id not in items]}
+
+    def get_all(self, limit: int = None, after: str = None, projection: dict = None):
         """Gathers all object in the respective collection of the database. The database object will contain
-        a unique id, which is accessible at ob['_id']['$oid] in the jsonified form.
+        a unique id, which is accessible at ob['_id']['$oid] in the jsonified form. If a limit is given, only one
+        page of objects (ordered by their id) is returned.
+
+        parameters:
+            limit -- optional maximum number of objects per page
+            after -- token of the previous page as returned in next, None for the first page
+            projection -- optional dict of fields to include in (or exclude from) the objects
         
         returns:
-            users -- array of all objects in the respective collection in the database
+            users -- array of all objects in the respective collection in the database (if no limit is given)
+            page -- dict containing the objects of the page under items and the token of the next page (None on the last page) under next (if a limit is given)
 
         raises:
-            Exception -- in case the database operation fails, raise an exception
+            ValueError -- in case the token is not valid
+            Exception -- in case the database operation fails
         """
         try:
-            return self.dao.find()
+            if limit is None:
+                return self.dao.find(projection=projection)
+            items, next_page = self.dao.find_page(limit=limit, after=after, projection=projection)
+            return {'items': items, 'next': next_page}
         except Exception as e:
             raise
 
+    def iterate_all(self, projection: dict = None, batch_size: int = 0):
+        """Iterate over all objects in the respective collection of the database while they are read in batches, such that arbitrarily many objects can be streamed without holding them in memory (see get_all).
+
+        parameters:
+            projection -- optional dict of fields to include in (or exclude from) the objects
+            batch_size -- number of objects fetched per round trip (0 for the server default)
+
+        returns:
+            generator of all objects in the respective collection
+
+        raises:
+            Exception -- in case the database operation fails
+        """
+        return self.dao.iterate(projection=projection, batch_size=batch_size)
+
     def update(self, id: str, data: dict):
         """Locates an object in the respective collection of the database and updates it with the given data 
         values.
@@ -79,10 +194,33 @@ class Controller:
         """
         try:
             update_result = self.dao.update(id=id, update_data=data)
+            self.changed((self.namespace, id))
             return update_result
         except Exception as e:
             raise
 
+    def update_and_get(self, id: str, data: dict):
+        """Locates an object in the respective collection of the database, updates it with the given data values
+        and returns the updated object, using one single database operation.
+
+        parameters:
+            id -- the unique identifier of the object
+            data -- a dict of MongoDB update operators (see update)
+
+        returns: 
+            object -- the updated object
+            None -- if no object associated to the given id can be found
+            
+        raises:
+            Exception -- in case the database operation fails
+        """
+        try:
+            obj = self.dao.findOneAndUpdate(id=id, update_data=data)
+            self.changed((self.namespace, id))
+            return obj
+        except Exception as e:
+            raise
+
     def delete(self, id: str):
         """Delete an object from the respective collection of the database
 
@@ -98,6 +236,7 @@ class Controller:
         """
         try:
             result = self.dao.delete(id=id)
+            self.changed((self.namespace, id))
             return result
         except Exception as e:
             raise
\ No newline at end of file
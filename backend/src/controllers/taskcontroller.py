@@ -1,15 +1,27 @@
 from bson.objectid import ObjectId
 from datetime import datetime
 
+from pymongo.errors import WriteError
+
 from src.controllers.controller import Controller
 from src.util.dao import DAO
+from src.util.cache import Cache, MISS
+from src.util.pagination import encodeCursor, decodeCursor
+from src.util.views import EXPANSIONS
 
 class TaskController(Controller):
-    def __init__(self, tasks_dao: DAO, videos_dao: DAO, todos_dao: DAO, users_dao: DAO):
-        super().__init__(dao=tasks_dao)
+    # maximum number of ids per bulk delete operation
+    DELETE_CHUNK_SIZE = 1000
+    # fields of the tasks in the summary of the tasks of a user, which is served from the task documents alone
+    SUMMARY_FIELDS = ['title', 'description', 'startdate', 'duedate', 'categories', 'total', 'done']
+
+    def __init__(self, tasks_dao: DAO, videos_dao: DAO, todos_dao: DAO, users_dao: DAO, cache: Cache = None, versions=None, embedded: bool = False):
+        super().__init__(dao=tasks_dao, cache=cache, versions=versions)
         self.videos_dao = videos_dao
         self.todos_dao = todos_dao
         self.users_dao = users_dao
+        # whether the tasks embed their video and todos (TASK_STORAGE=embedded) instead of referencing them, see src.util.storage
+        self.embedded = embedded
 
     def create(self, data: dict):
         """Create a new task object based on the data contained in the dict. The data must contain at least a userid, a video url and a title. If todos are contained in the data, create todo objects and associate them to the task
@@ -25,73 +37,332 @@ class TaskController(Controller):
             Exception -- in case any database operation fails
         """
 
-        # store the userid
-        if 'userid' not in data:
-            raise KeyError('When creating a task object, the userid of the associated user must be given')
-        uid = data['userid']
-        del data['userid']
+        try:
+            return self.create_many([data])[0]
+        except Exception as e:
+            raise
+
+    def create_many(self, datas: list):
+        """Create several task objects at once, each based on a dict as described in create. Instead of one database operation per object, the videos, the todos and the tasks are each written with one bulk insert, and the tasks are assigned to their users with one bulk update.
 
-        
-        # fill default values for missing values
-        if 'startdate' not in data:
-            data['startdate'] = datetime.today()
-        if 'categories' not in data:
-            data['categories'] = []
+        attributes:
+            datas -- list of dicts containing the data of the new tasks (each at least a title, url, userid and the todos)
+
+        returns:
+            taskids -- list of the ids of the newly created tasks
 
+        raises:
+            KeyError -- in case an important key is missing in one of the data dicts (then nothing is written)
+            WriteError -- in case a video, todo or task violates its validator. Like when creating the tasks one after another, all tasks preceding the failing one are created and assigned to their users, while no video or todo of the failing task or the following ones is left behind
+            Exception -- in case any database operation fails
+        """
+        userids, videos, todos, tasks = self.prepare(datas)
+
+        created = len(tasks)
+        failure = None
+        # the written documents of each collection along with the indexes of their tasks
+        written = []
         try:
-            # add the video url
-            video = self.videos_dao.create({'url': data['url']})
-            del data['url']
-            data['video'] = ObjectId(video['_id']['$oid'])
-
-            # create and add todos
-            todos = []
-            for todo in data['todos']:
-                todoobj = self.todos_dao.create({'description': todo, 'done': False})
-                todos.append(ObjectId(todoobj['_id']['$oid']))
-            data['todos'] = todos
-
-            # create the task object and assign it to the user
-            task = self.dao.create(data)
-            self.users_dao.update(
-                uid, {'$push': {'tasks': ObjectId(task['_id']['$oid'])}})
-            return task['_id']['$oid']
+            for dao, objects in [(self.videos_dao, videos), (self.todos_dao, todos), (self.dao, tasks)]:
+                # only the objects of the tasks preceding an earlier failure are written
+                documents, taskindex = [], []
+                for index in range(created):
+                    documents.extend(objects[index])
+                    taskindex.extend([index] * len(objects[index]))
+
+                try:
+                    dao.create_many(documents)
+                    written.append((dao, documents, taskindex))
+                except WriteError as e:
+                    failure = e
+                    created = taskindex[e.details['nInserted']]
+                    written.append((dao, documents[:e.details['nInserted']], taskindex[:e.details['nInserted']]))
+
+            # remove the videos and todos written for the failing task and the tasks following it, which are not created
+            for dao, documents, taskindex in written:
+                leftovers = [document['_id'] for document, index in zip(documents, taskindex) if index >= created]
+                if len(leftovers) > 0:
+                    dao.delete_many(leftovers)
+
+            # assign the created tasks to their users
+            pushes = self.pushes(userids[:created], tasks[:created])
+            self.users_dao.bulk_update(pushes)
+            self.changed(*[(self.users_dao.collection_name, uid) for uid, _ in pushes])
+
+            if failure is not None:
+                raise failure
+            return [str(task[0]['_id']) for task in tasks]
         except Exception as e:
             raise
 
-    def get(self, id: str):
+    def prepare(self, datas: list):
+        """Prepare the documents of new tasks (see create_many) without accessing the database: default values are filled in, each task refers to its user as owner and counts its todos (total and done), and the ids of the tasks, videos and todos are assigned upfront, such that the references can be set without reading the created objects back. If the tasks embed their videos and todos, there are no separate video and todo documents to write.
+
+        attributes:
+            datas -- list of dicts containing the data of the new tasks
+
+        returns:
+            userids -- list of the ids of the users of the tasks
+            videos -- list of lists containing the video document of each task
+            todos -- list of lists containing the todo documents of each task
+            tasks -- list of lists containing the task document of each task
+
+        raises:
+            KeyError -- in case an important key is missing in one of the data dicts
+        """
+        userids, videos, todos, tasks = [], [], [], []
+        for data in datas:
+            # store the userid
+            if 'userid' not in data:
+                raise KeyError('When creating a task object, the userid of the associated user must be given')
+            task = dict(data)
+            userids.append(task['userid'])
+            task['owner'] = ObjectId(task['userid'])
+            del task['userid']
+
+            # fill default values for missing values
+            if 'startdate' not in task:
+                task['startdate'] = datetime.today()
+            if 'categories' not in task:
+                task['categories'] = []
+
+            video = {'_id': ObjectId(), 'url': task['url']}
+            del task['url']
+            tasktodos = [{'_id': ObjectId(), 'description': todo, 'done': False} for todo in task['todos']]
+            task['total'] = len(tasktodos)
+            task['done'] = 0
+            if self.embedded:
+                task['video'] = video
+                task['todos'] = tasktodos
+                videos.append([])
+                todos.append([])
+            else:
+                task['video'] = video['_id']
+                task['todos'] = [todo['_id'] for todo in tasktodos]
+                videos.append([video])
+                todos.append(tasktodos)
+
+            task['_id'] = ObjectId()
+            tasks.append([task])
+        return userids, videos, todos, tasks
+
+    def pushes(self, userids: list, tasks: list):
+        """Return the updates which assign created tasks to their users, one per user.
+
+        attributes:
+            userids -- list of the ids of the users of the tasks
+            tasks -- list of lists containing the task document of each task (see prepare)
+
+        returns:
+            updates -- list of tuples (userid, update_data) for bulk_update
+        """
+        pushes = {}
+        for userid, task in zip(userids, tasks):
+            pushes.setdefault(userid, []).append(task[0]['_id'])
+        return [(uid, {'$push': {'tasks': {'$each': taskids}}}) for uid, taskids in pushes.items()]
+
+    def get(self, id: str, expand: tuple = None, version: int = None):
+        """Return the task object with the given id, where the video and todo references are already resolved (or only those named in expand, the others are returned as ids).
+
+        attributes:
+            id -- the unique identifier of a task object
+            expand -- optional tuple of the references to resolve (see src.util.views.EXPANSIONS), None to resolve all
+            version -- optional version of the task read before (see Controller.get)
+
+        returns:
+            task -- populated task object
+            None -- if no task is associated to the given id
+
+        raises:
+            Exception -- in case any database operation fails
+        """
         try:
-            task = super().get(id)
-            return self.populate_task(task)
+            key = (self.namespace, id) + self.expansion_key(expand)
+            task = self.cache.get(key, version=version)
+            if task is MISS:
+                token = self.cache.token()
+                pipeline = [{'$match': {'_id': ObjectId(id)}}] + self.population_stages(expand)
+                tasks = self.dao.aggregate(pipeline)
+                if len(tasks) == 0:
+                    return None
+                task = tasks[0]
+                self.cache.set(key, task, depends_on=self.dependencies([task]), token=token, version=version)
+            return task
         except Exception as e:
             raise
 
+    def get_many(self, ids: list, expand: tuple = None):
+        """Return the task objects with the given ids (see get). The tasks which are not cached are read and populated with one single aggregation pipeline, which looks up the videos and todos of all of them at once.
 
-    def get_tasks_of_user(self, id: str):
-        """Return all task objects that are associated to a specific user.
+        attributes:
+            ids -- list of unique identifiers of task objects
+            expand -- optional tuple of the references to resolve (see src.util.views.EXPANSIONS), None to resolve all
+
+        returns:
+            result -- dict containing the populated tasks by their id under items and the ids without a task under missing
+
+        raises:
+            Exception -- in case any database operation fails
+        """
+        try:
+            token = self.cache.token()
+            items, misses = self.cached_many(ids, self.expansion_key(expand))
+            if len(misses) > 0:
+                tasks = self.dao.aggregate([{'$match': {'_id': {'$in': [ObjectId(id) for id in misses]}}}] + self.population_stages(expand))
+                self.remember_many(items, tasks, self.expansion_key(expand), self.dependencies, token=token)
+            return self.batch(ids, items)
+        except Exception as e:
+            raise
+
+    def get_tasks_of_user(self, id: str, limit: int = None, after: str = None, summary: bool = False, expand: tuple = None, version: int = None):
+        """Return all task objects that are associated to a specific user, ordered by their id. The tasks are found via their owner and resolved along with their videos and todos in one single aggregation pipeline on the task collection, without reading the user. If a limit is given, only one page of tasks is returned. A summary contains only the SUMMARY_FIELDS of each task, including the counters of its todos instead of the todos, and is read from the task documents alone.
 
         attributes:
             id -- the unique identifier of a user object
+            limit -- optional maximum number of tasks per page
+            after -- token of the previous page as returned in next, None for the first page
+            summary -- whether to return the summaries of the tasks instead of the populated tasks
+            expand -- optional tuple of the references of the populated tasks to resolve (see get), None to resolve all
+            version -- optional version of the user read before, which covers all of its tasks (see Controller.get)
 
         returns:
-            tasks -- list of tasks associated to that user
+            tasks -- list of populated tasks associated to that user (if no limit is given)
+            page -- dict containing the populated tasks of the page under items and the token of the next page (None on the last page) under next (if a limit is given)
 
         raises:
+            ValueError -- in case the token is not valid
             Exception -- in case any database operation fails
         """
         try:
-            user = self.users_dao.findOne(id)
-            tasks = self.dao.find(filter={'_id': user['tasks']}, toid=['_id'])
+            key = self.tasks_of_user_key(id, limit, after, summary, expand)
+            result = self.cache.get(key, version=version)
+            if result is MISS:
+                token = self.cache.token()
+                tasks = self.dao.aggregate(self.tasks_of_user_stages(id, limit, after) + (self.summary_stages() if summary else self.population_stages(expand)))
+                result = self.page(tasks, limit)
+                self.cache.set(key, result, depends_on=[(self.users_dao.collection_name, id)] + self.dependencies(tasks), token=token, version=version)
+            return result
+        except Exception as e:
+            raise
 
-            for task in tasks:
-                self.populate_task(task)
+    def tasks_of_user_stages(self, id: str, limit: int = None, after: str = None):
+        """Return the aggregation stages on the task collection which produce the (unpopulated) tasks of a user ordered by their id, see get_tasks_of_user. Both the match and the order are served by the index on the owner. If a limit is given, one more task than requested is produced to know whether there is a next page.
 
+        attributes:
+            id -- the unique identifier of a user object
+            limit -- optional maximum number of tasks per page
+            after -- token of the previous page, None for the first page
+
+        returns:
+            stages -- list of aggregation stages
+
+        raises:
+            ValueError -- in case the token is not valid
+        """
+        match = {'owner': ObjectId(id)}
+        if limit is not None and after is not None:
+            match['_id'] = {'$gt': decodeCursor(after)}
+        pipeline = [{'$match': match}, {'$sort': {'_id': 1}}]
+        if limit is not None:
+            pipeline.append({'$limit': limit + 1})
+        return pipeline
+
+    def tasks_of_user_key(self, id: str, limit: int = None, after: str = None, summary: bool = False, expand: tuple = None):
+        """Return the cache key of the tasks of a user, see get_tasks_of_user."""
+        key = ('ofuser', id) if limit is None else ('ofuser', id, limit, after)
+        return key + ('summary',) if summary else key + self.expansion_key(expand)
+
+    def expansion_key(self, expand: tuple = None):
+        """Return the part of a cache key which distinguishes the expansions of tasks (see get), empty if all references are resolved."""
+        if expand is None or tuple(expand) == EXPANSIONS:
+            return ()
+        return ('expand',) + tuple(expand)
+
+    def summary_stages(self):
+        """Return the aggregation stages which reduce task documents to their summaries (see get_tasks_of_user), with counters of 0 for tasks whose counters were never set.
+
+        returns:
+            stages -- list of aggregation stages to be appended to a pipeline producing task documents
+        """
+        projection = {field: 1 for field in self.SUMMARY_FIELDS}
+        projection.update({'total': {'$ifNull': ['$total', 0]}, 'done': {'$ifNull': ['$done', 0]}})
+        return [{'$project': projection}]
+
+    def page(self, tasks: list, limit: int = None):
+        """Turn the tasks produced by tasks_of_user_stages into the result of get_tasks_of_user.
+
+        attributes:
+            tasks -- list of populated tasks (with one task beyond the page, if there is a next page)
+            limit -- optional maximum number of tasks per page
+
+        returns:
+            tasks -- the given list (if no limit is given)
+            page -- dict containing the tasks of the page under items and the token of the next page under next (if a limit is given)
+        """
+        if limit is None:
             return tasks
-        except Exception as e:
-            raise
+        return {'items': tasks[:limit], 'next': encodeCursor(tasks[limit - 1]['_id']) if len(tasks) > limit else None}
+
+    def iterate_tasks(self, batch_size: int = None):
+        """Iterate over all task objects with resolved videos and todos (see get) while they are read in batches from one aggregation cursor, such that all tasks can be streamed (e.g., for an export) without holding them in memory.
+
+        attributes:
+            batch_size -- number of tasks fetched per round trip (None for the server default)
+
+        returns:
+            generator of populated task objects, ordered by their id
+
+        raises:
+            Exception -- in case any database operation fails
+        """
+        pipeline = [{'$sort': {'_id': 1}}] + self.population_stages()
+        return self.dao.aggregate_iterate(pipeline, batch_size=batch_size)
+
+    def dependencies(self, tasks: list):
+        """Return the cache keys which the cached value of populated tasks depends on: the keys of the tasks themselves and of their todos (if resolved).
+
+        parameters:
+            tasks -- list of populated task objects
+
+        returns:
+            keys -- list of cache keys
+        """
+        keys = []
+        for task in tasks:
+            keys.append((self.namespace, task['_id']['$oid']))
+            for todo in task.get('todos', []):
+                # unresolved todos are ids, which only change along with the task
+                if '_id' in todo:
+                    keys.append((self.todos_dao.collection_name, todo['_id']['$oid']))
+        return keys
+
+    def population_stages(self, expand: tuple = None):
+        """Return the aggregation stages which populate task documents in the same way as populate_task does: the video id is replaced by the video object (or None) and the list of todo ids by the list of todo objects. Tasks which embed their video and todos are already populated and only need a video (None if missing), such that both storage layouts yield the same objects. References which are not named in expand are left as ids without looking them up (embedded ones are reduced to their ids).
+
+        parameters:
+            expand -- optional tuple of the references to resolve (see src.util.views.EXPANSIONS), None to resolve all
+
+        returns:
+            stages -- list of aggregation stages to be appended to a pipeline producing task documents
+        """
+        expand = EXPANSIONS if expand is None else expand
+        if self.embedded:
+            fields = {'video': {'$ifNull': ['$video', None]} if 'video' in expand else '$video._id'}
+            if 'todos' not in expand:
+                fields['todos'] = '$todos._id'
+            return [{'$addFields': fields}]
+        stages = []
+        if 'video' in expand:
+            stages += [
+                {'$lookup': {'from': self.videos_dao.collection_name, 'localField': 'video', 'foreignField': '_id', 'as': 'video'}},
+                {'$addFields': {'video': {'$ifNull': [{'$arrayElemAt': ['$video', 0]}, None]}}}
+            ]
+        if 'todos' in expand:
+            stages.append({'$lookup': {'from': self.todos_dao.collection_name, 'localField': 'todos', 'foreignField': '_id', 'as': 'todos'}})
+        return stages
 
     def populate_task(self, task):
-        """Populate a given task object by resolving dependencies: replace the id contained in the video attribute by the actual video object and replace each todo id contained in the todos attribute by all actual todo objects
+        """Populate a given task object by resolving dependencies: replace the id contained in the video attribute by the actual video object and replace each todo id contained in the todos attribute by all actual todo objects. This costs two database round trips per task, prefer the aggregation based get and get_tasks_of_user for reading tasks.
 
         parameters:
             task -- task object with reference ids (external keys)
@@ -99,6 +370,10 @@ class TaskController(Controller):
         returns:
             task -- task object with resolved references        
         """
+        if self.embedded:
+            task.setdefault('video', None)
+            return task
+
         # populate the video of the task
         video = self.videos_dao.findOne(task['video']['$oid'])
         task['video'] = video
@@ -109,31 +384,141 @@ class TaskController(Controller):
 
         return task
 
+    def update(self, id: str, data: dict):
+        try:
+            update_result = self.dao.update(id=id, update_data=data)
+            self.changed((self.namespace, id), *self.owner_keys([id]))
+            return update_result
+        except Exception as e:
+            raise
+
+    def update_and_get(self, id: str, data: dict):
+        try:
+            task = self.dao.findOneAndUpdate(id=id, update_data=data)
+            self.changed((self.namespace, id), *self.owners([task] if task is not None else []))
+            return task
+        except Exception as e:
+            raise
+
+    def owner_keys(self, ids: list):
+        """Return the keys of the users owning the tasks with the given ids, whose versions change along with their tasks. The owners are only looked up if versions are kept, since cached task lists of users are invalidated via their dependencies anyway.
+
+        parameters:
+            ids -- list of unique identifiers of task objects
+
+        returns:
+            keys -- list of keys (tuples of namespace and id) of the owning users
+        """
+        if self.versions is None or len(ids) == 0:
+            return []
+        return self.owners(self.dao.find(filter={'_id': {'$in': [ObjectId(id) for id in ids]}}, projection={'owner': 1}))
+
+    def owners(self, tasks: list):
+        """Return the keys of the users owning the given tasks (see owner_keys), read from their owner field.
+
+        parameters:
+            tasks -- list of task objects containing (at least) their owner
+
+        returns:
+            keys -- list of keys (tuples of namespace and id) of the owning users
+        """
+        if self.versions is None:
+            return []
+        return list(dict.fromkeys((self.users_dao.collection_name, task['owner']['$oid']) for task in tasks if 'owner' in task))
+
+    def delete(self, id: str):
+        """Delete a task including its video and all of its todo items.
+
+        parameters:
+            id -- the unique identifier of the task object
+
+        returns: 
+            True -- if the delete was successful
+            False -- if the delete failed
+            
+        raises:
+            Exception -- in case the database operation fails
+        """
+        try:
+            self.delete_tasks([id])
+            return True
+        except Exception as e:
+            raise
+
     def delete_of_user(self, id: str):
-        """Delete all tasks that are associated to a user with the given ID. This includes each video and all todo items associated to each of the tasks.
+        """Delete all tasks that are associated to a user with the given ID, which are found via their owner. This includes each video and all todo items associated to each of the tasks.
         
         parameters:
             id -- the unique identifier of a user object
             
         returns:
-            n -- number of deleted tasks
+            counts -- dict containing the number of deleted objects per collection (keys task, video and todo)
         
         raises:
             Exception -- in case any database operation fails
         """
         try:
-            user = self.users_dao.findOne(id)
-            if 'tasks' in user:
-                tasks = self.dao.find(filter={'_id': user['tasks']}, toid=['_id'])
+            tasks = self.dao.find(filter={'owner': ObjectId(id)}, projection={'_id': 1})
+            return self.delete_tasks([task['_id']['$oid'] for task in tasks])
+        except Exception as e:
+            raise
 
-                for task in tasks:
-                    self.videos_dao.delete(id=task['video']['$oid'])
-                    for todo in task['todos']:
-                        self.todos_dao.delete(id=todo['$oid'])
-                    self.dao.delete(id=task['_id']['$oid'])
+    def references(self, tasks: list):
+        """Return the ids of the videos and todos referenced by the given (unpopulated) tasks. Embedded todos are identified by their _id as well, while embedded videos are no separate objects.
 
-                return len(tasks)
-            else:
-                return 0
+        parameters:
+            tasks -- list of task objects containing (at least) their video and todos
+
+        returns:
+            videoids -- list of video ids
+            todoids -- list of todo ids
+        """
+        if self.embedded:
+            return [], [todo['_id']['$oid'] for task in tasks for todo in task.get('todos', [])]
+        videoids = [task['video']['$oid'] for task in tasks if 'video' in task]
+        todoids = [todo['$oid'] for task in tasks for todo in task.get('todos', [])]
+        return videoids, todoids
+
+    def delete_tasks(self, ids: list):
+        """Delete the tasks with the given ids including their videos and todo items. Instead of deleting each object on its own, the objects are deleted with one operation per collection for every chunk of DELETE_CHUNK_SIZE ids, which bounds the size of each operation for users with very many tasks. Embedded videos and todos are deleted along with their tasks.
+
+        parameters:
+            ids -- list of unique identifiers of task objects
+
+        returns:
+            counts -- dict containing the number of deleted objects per collection (keys task, video and todo)
+
+        raises:
+            Exception -- in case any database operation fails
+        """
+        counts = {'task': 0, 'video': 0, 'todo': 0}
+        try:
+            for taskids in chunks(ids, self.DELETE_CHUNK_SIZE):
+                tasks = self.dao.find(filter={'_id': {'$in': [ObjectId(taskid) for taskid in taskids]}}, projection={'video': 1, 'todos': 1, 'owner': 1})
+                videoids, todoids = self.references(tasks)
+                if self.embedded:
+                    counts['video'] += len([task for task in tasks if task.get('video') is not None])
+                    counts['todo'] += len(todoids)
+                else:
+                    for videochunk in chunks(videoids, self.DELETE_CHUNK_SIZE):
+                        counts['video'] += self.videos_dao.delete_many(videochunk)
+                    for todochunk in chunks(todoids, self.DELETE_CHUNK_SIZE):
+                        counts['todo'] += self.todos_dao.delete_many(todochunk)
+                counts['task'] += self.dao.delete_many(taskids)
+                self.changed(*[(self.namespace, taskid) for taskid in taskids], *[(self.todos_dao.collection_name, todoid) for todoid in todoids], *self.owners(tasks))
+            return counts
         except Exception as e:
-            raise
\ No newline at end of file
+            raise
+
+def chunks(elements: list, size: int):
+    """Split a list into consecutive lists of at most size elements.
+
+    parameters:
+        elements -- the list to split
+        size -- the maximum length of each chunk
+
+    returns:
+        generator of lists
+    """
+    for start in range(0, len(elements), size):
+        yield elements[start:start + size]
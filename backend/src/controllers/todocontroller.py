@@ -1,15 +1,26 @@
 from src.controllers.controller import Controller
 from  src.util.dao import DAO
+from src.util.cache import Cache, MISS
+from src.util.converters import to_json
 
 from bson.objectid import ObjectId
 
 class TodoController(Controller):
-    def __init__(self, todo_dao: DAO, tasks_dao: DAO):
-        super().__init__(dao=todo_dao)
+    # number of times a counted update of a todo is attempted with each condition, see counted_updates
+    COUNTER_ATTEMPTS = 3
+    # the attempt of a counted update after which the todo is looked up once if no attempt matched yet, i.e., after one attempt with each condition
+    LOOKUP_ATTEMPT = 1
+
+    def __init__(self, todo_dao: DAO, tasks_dao: DAO, cache: Cache = None, versions=None, users_dao: DAO = None, embedded: bool = False):
+        super().__init__(dao=todo_dao, cache=cache, versions=versions)
         self.tasks_dao = tasks_dao
+        # the users are only needed to name the versions of the owners of todos
+        self.users_dao = users_dao
+        # whether the todos are embedded in their tasks (TASK_STORAGE=embedded), then they are read and changed via the task collection
+        self.embedded = embedded
 
     def create(self, data: dict):
-        """Given a valid dict containing the data of the new todo item create a new todo item and return the newly created item. If in addition a taskid attribute is given, then the new todo object will be automatically associated to the task object.
+        """Given a valid dict containing the data of the new todo item create a new todo item and return the newly created item. If in addition a taskid attribute is given, then the new todo object will be automatically associated to the task object, whose counters of todos (total and done) are incremented within the same operation. If the tasks embed their todos, the taskid is required and the todo is pushed onto the task within one operation.
 
         parameters: 
             data -- dict containing a description under the key description
@@ -18,23 +29,309 @@ class TodoController(Controller):
             todo -- created todo object upon success
         
         raises:
+            ValueError -- in case the given taskid is not associated to any task, or no taskid is given although the tasks embed their todos
             Exception -- in case any database operation fails
         """
 
         try:
             if 'taskid' in data:
-                task = self.tasks_dao.findOne(id=data['taskid'])
+                taskid = data['taskid']
                 del data['taskid']
 
                 if 'done' in data:
                     if isinstance(data['done'], str):
                         data['done'] = (data['done'].lower() == 'true')
 
-                todo = self.dao.create(data)
-                self.tasks_dao.update(id=task['_id']['$oid'], update_data={'$push' : {'todos': ObjectId(todo['_id']['$oid'])}})
+                if self.embedded:
+                    todo = {'_id': ObjectId(), **data}
+                    task = self.tasks_dao.findOneAndUpdate(id=taskid, update_data=self.addition(todo, data.get('done')), projection={'_id': 1, 'owner': 1})
+                    todo = to_json(todo)
+                else:
+                    todo = self.dao.create(data)
+                    task = self.tasks_dao.findOneAndUpdate(id=taskid, update_data=self.addition(ObjectId(todo['_id']['$oid']), data.get('done')), projection={'_id': 1, 'owner': 1})
+                if task is None:
+                    # do not leave a todo behind which is not associated to any task
+                    if not self.embedded:
+                        self.dao.delete(id=todo['_id']['$oid'])
+                    raise ValueError(f'Error: no task with id {taskid}')
+                self.changed((self.tasks_dao.collection_name, taskid), *self.owner_keys(task))
 
                 return todo
+            elif self.embedded:
+                raise ValueError('Error: a todo must belong to a task (taskid), since the tasks embed their todos')
             else:
                 return self.dao.create(data)
         except Exception as e:
-            raise
\ No newline at end of file
+            raise
+
+    def get(self, id: str, version: int = None):
+        """Return the todo object with the given id (see Controller.get). An embedded todo is read from its task with one query, projecting the task onto the todo.
+
+        parameters:
+            id -- the unique identifier of the todo object
+            version -- optional version of the todo read before (see Controller.get)
+
+        returns:
+            todo -- the todo object
+            None -- if no todo is associated to the given id
+
+        raises:
+            Exception -- in case any database operation fails
+        """
+        if not self.embedded:
+            return super().get(id, version=version)
+        try:
+            todo = self.cache.get((self.namespace, id), version=version)
+            if todo is MISS:
+                token = self.cache.token()
+                tasks = self.tasks_dao.find(filter=self.embedded_filter(id), projection=self.embedded_projection(id))
+                todo = tasks[0]['todos'][0] if len(tasks) > 0 else None
+                if todo is not None:
+                    self.cache.set((self.namespace, id), todo, token=token, version=version)
+            return todo
+        except Exception as e:
+            raise
+
+    def get_many(self, ids: list):
+        """Return the todo objects with the given ids (see Controller.get_many). Embedded todos are read with one query of the tasks embedding any of them.
+
+        parameters:
+            ids -- list of unique identifiers of todo objects
+
+        returns:
+            result -- dict containing the found todos by their id under items and the ids without a todo under missing
+
+        raises:
+            Exception -- in case any database operation fails
+        """
+        if not self.embedded:
+            return super().get_many(ids)
+        try:
+            token = self.cache.token()
+            items, misses = self.cached_many(ids)
+            if len(misses) > 0:
+                tasks = self.tasks_dao.find(filter={'todos._id': {'$in': [ObjectId(id) for id in misses]}}, projection={'todos': 1})
+                self.remember_many(items, self.embedded_todos(tasks, misses), token=token)
+            return self.batch(ids, items)
+        except Exception as e:
+            raise
+
+    def update(self, id: str, data: dict):
+        try:
+            if self.embedded:
+                task = self.update_embedded(id, data, projection={'_id': 1, 'owner': 1})
+                self.changed((self.namespace, id), *self.container_keys(task))
+                # acknowledged like DAO.update
+                return True
+            parents = self.parent_keys(id)
+            self.update_referenced(id, data, projection={'_id': 1})
+            self.changed((self.namespace, id), *parents)
+            return True
+        except Exception as e:
+            raise
+
+    def update_and_get(self, id: str, data: dict):
+        try:
+            if self.embedded:
+                task = self.update_embedded(id, data, projection={**self.embedded_projection(id), 'owner': 1})
+                self.changed((self.namespace, id), *self.container_keys(task))
+                return task['todos'][0] if task is not None else None
+            parents = self.parent_keys(id)
+            todo = self.update_referenced(id, data)
+            self.changed((self.namespace, id), *parents)
+            return todo
+        except Exception as e:
+            raise
+
+    def delete(self, id: str):
+        """Delete a todo and remove it from its task, whose counters of todos (total and done) are decremented within the same operation. In the referenced layout, the todo is deleted before it is removed from its task by a second operation (see update_referenced).
+
+        parameters:
+            id -- the unique identifier of the todo object
+
+        returns:
+            True -- if the delete was acknowledged
+
+        raises:
+            Exception -- in case any database operation fails
+        """
+        try:
+            task = None
+            if self.embedded:
+                # deleting a todo is counted like unsetting its done flag, in addition to decrementing the total
+                for attempt, (condition, delta) in enumerate(self.counted_updates({'$unset': {'done': ''}})):
+                    task = self.tasks_dao.findAndUpdate(self.embedded_filter(id, condition), self.removal({'_id': ObjectId(id)}, delta), projection={'_id': 1, 'owner': 1})
+                    if task is not None or (attempt == self.LOOKUP_ATTEMPT and len(self.tasks_dao.find(filter=self.embedded_filter(id), projection={'_id': 1})) == 0):
+                        break
+            else:
+                todo = self.dao.findOneAndDelete(id, projection={'done': 1})
+                if todo is not None:
+                    task = self.tasks_dao.findAndUpdate({'todos': ObjectId(id)}, self.removal(ObjectId(id), -1 if todo.get('done') is True else 0), projection={'_id': 1, 'owner': 1})
+            self.changed((self.namespace, id), *self.container_keys(task))
+            return True
+        except Exception as e:
+            raise
+
+    def update_embedded(self, id: str, data: dict, projection: dict):
+        """Apply an update to an embedded todo and count a change of its done flag on its task within the same operation, see counted_updates.
+
+        parameters:
+            id -- the unique identifier of the todo object
+            data -- dict of MongoDB update operators on the fields of the todo
+            projection -- dict of the fields of the task to return
+
+        returns:
+            task -- the updated task (projected)
+            None -- if no task embeds the todo
+        """
+        for attempt, (condition, delta) in enumerate(self.counted_updates(data)):
+            task = self.tasks_dao.findAndUpdate(self.embedded_filter(id, condition), self.counted(self.positional(data), delta), projection=projection)
+            if task is not None:
+                return task
+            if attempt == self.LOOKUP_ATTEMPT and len(self.tasks_dao.find(filter=self.embedded_filter(id), projection={'_id': 1})) == 0:
+                return None
+        return None
+
+    def update_referenced(self, id: str, data: dict, projection: dict = None):
+        """Apply an update to a todo of the todo collection and count a change of its done flag on the task containing it, see counted_updates. The todo and the counter are changed with two operations, which are not atomic: if the second one does not happen (e.g., since the process fails in between), the counter remains wrong until it is repaired (see src.util.counters).
+
+        parameters:
+            id -- the unique identifier of the todo object
+            data -- dict of MongoDB update operators on the fields of the todo
+            projection -- optional dict of the fields of the todo to return
+
+        returns:
+            todo -- the updated todo (projected)
+            None -- if there is no todo with the given id
+        """
+        for attempt, (condition, delta) in enumerate(self.counted_updates(data)):
+            todo = self.dao.findAndUpdate({'_id': ObjectId(id), **condition}, data, projection=projection)
+            if todo is not None:
+                if delta != 0:
+                    self.tasks_dao.findAndUpdate({'todos': ObjectId(id)}, {'$inc': {'done': delta}}, projection={'_id': 1})
+                return todo
+            if attempt == self.LOOKUP_ATTEMPT and len(self.dao.find(filter={'_id': ObjectId(id)}, projection={'_id': 1})) == 0:
+                return None
+        return None
+
+    def counted_updates(self, data: dict):
+        """Return the attempts to apply an update to a todo such that the done counter of its task changes exactly along with the done flag of the todo. Each attempt is a condition on the current done flag of the todo and the change of the counter in case the todo matches. An update which sets the flag is first attempted on the todo if the flag changes, then if it does not. Since the flag may be changed concurrently in between, the attempts are repeated up to COUNTER_ATTEMPTS times. If neither condition matched in the first round of attempts, the todo is looked up once, and the update is given up if it does not exist (see LOOKUP_ATTEMPT). An update which leaves the flag alone is applied without condition.
+
+        parameters:
+            data -- dict of MongoDB update operators on the fields of a todo
+
+        returns:
+            attempts -- list of tuples (condition, delta), where the condition is a filter on the fields of the todo
+        """
+        done = None
+        if 'done' in data.get('$set', {}):
+            done = data['$set']['done'] is True
+        elif 'done' in data.get('$unset', {}):
+            done = False
+        if done is None:
+            return [({}, 0)]
+        if done:
+            return [({'done': {'$ne': True}}, 1), ({'done': True}, 0)] * self.COUNTER_ATTEMPTS
+        return [({'done': True}, -1), ({'done': {'$ne': True}}, 0)] * self.COUNTER_ATTEMPTS
+
+    def counted(self, update: dict, delta: int):
+        """Add the change of the done counter to an update of a task."""
+        if delta != 0:
+            update.setdefault('$inc', {})['done'] = delta
+        return update
+
+    def addition(self, todo, done: bool):
+        """Return the update of a task which adds a todo (its id, or the todo itself if embedded) and counts it."""
+        return {'$push' : {'todos': todo}, '$inc': {'total': 1, 'done': int(done is True)}}
+
+    def removal(self, todo, delta: int):
+        """Return the update of a task which removes a todo (its id, or a filter of the embedded todo) and uncounts it, where delta is the change of the done counter."""
+        return {'$pull': {'todos': todo}, '$inc': {'total': -1, 'done': delta}}
+
+    def owner_keys(self, task: dict):
+        """Return the keys of the user owning the given task, read from its owner field. Owners are only considered if versions are kept, since cached objects depending on a todo are invalidated via their dependencies anyway.
+
+        parameters:
+            task -- task object containing (at least) its owner
+
+        returns:
+            keys -- list of keys (tuples of namespace and id) of the owning users
+        """
+        if self.versions is None or self.users_dao is None or 'owner' not in task:
+            return []
+        return [(self.users_dao.collection_name, task['owner']['$oid'])]
+
+    def parent_keys(self, id: str):
+        """Return the keys of the tasks containing the todo with the given id and of the users owning these tasks, resolved with one aggregation. Like owner_keys, this is only looked up if versions are kept.
+
+        parameters:
+            id -- the unique identifier of a todo object
+
+        returns:
+            keys -- list of keys (tuples of namespace and id) of the containing tasks and their owners
+        """
+        if self.versions is None or self.users_dao is None:
+            return []
+        tasks = self.tasks_dao.aggregate(self.parent_stages(id))
+        return self.parents(tasks)
+
+    def parent_stages(self, id: str):
+        """Return the aggregation stages on the task collection which produce the tasks containing the todo with the given id, each with its owner.
+
+        parameters:
+            id -- the unique identifier of a todo object
+
+        returns:
+            stages -- list of aggregation stages
+        """
+        return [
+            {'$match': {'todos': ObjectId(id)}},
+            {'$project': {'owner': 1}}
+        ]
+
+    def parents(self, tasks: list):
+        """Turn the tasks produced by parent_stages into the keys of the tasks and their owners.
+
+        parameters:
+            tasks -- list of tasks with their owner
+
+        returns:
+            keys -- list of keys (tuples of namespace and id)
+        """
+        keys = []
+        for task in tasks:
+            keys.append((self.tasks_dao.collection_name, task['_id']['$oid']))
+            keys.extend(self.owner_keys(task))
+        return keys
+
+    def embedded_filter(self, id: str, condition: dict = None):
+        """Return the filter of the task embedding the todo with the given id (and, if given, complying to the condition on its fields)."""
+        if condition:
+            return {'todos': {'$elemMatch': {'_id': ObjectId(id), **condition}}}
+        return {'todos._id': ObjectId(id)}
+
+    def embedded_todos(self, tasks: list, ids: list):
+        """Return the todos with the given ids which are embedded in the given tasks."""
+        ids = set(ids)
+        return [todo for task in tasks for todo in task.get('todos', []) if todo['_id']['$oid'] in ids]
+
+    def embedded_projection(self, id: str):
+        """Return the projection of the task embedding the todo with the given id onto (a list containing only) that todo."""
+        return {'todos': {'$elemMatch': {'_id': ObjectId(id)}}}
+
+    def positional(self, data: dict):
+        """Rewrite an update of a todo (e.g., {'$set': {'done': True}}) into the update of the todo embedded in the task matched by embedded_filter (e.g., {'$set': {'todos.$.done': True}}).
+
+        parameters:
+            data -- dict of MongoDB update operators on the fields of a todo
+
+        returns:
+            update -- dict of the update operators on the fields of the embedded todo
+        """
+        return {operator: {f'todos.$.{field}': value for field, value in fields.items()} for operator, fields in data.items()}
+
+    def container_keys(self, task: dict):
+        """Return the keys of the task embedding a changed todo (as returned by the update, None if there is none) and of its owners."""
+        if task is None:
+            return []
+        return [(self.tasks_dao.collection_name, task['_id']['$oid'])] + self.owner_keys(task)
@@ -1,12 +1,14 @@
 from src.controllers.controller import Controller
 from src.util.dao import DAO
+from src.util.cache import Cache
+from src.util.indexes import EMAIL_COLLATION
 
 import re
 emailValidator = re.compile(r'.*@.*')
 
 class UserController(Controller):
-    def __init__(self, dao: DAO):
-        super().__init__(dao=dao)
+    def __init__(self, dao: DAO, cache: Cache = None, versions=None):
+        super().__init__(dao=dao, cache=cache, versions=versions)
 
     def get_user_by_email(self, email: str):
         """Given a valid email address of an existing account, return the user object contained in the database associated 
@@ -29,7 +31,8 @@ class UserController(Controller):
             raise ValueError('Error: invalid email address')
 
         try:
-            users = self.dao.find({'email': email})
+            # email addresses are compared case-insensitively, which allows to use the unique email index
+            users = self.dao.find({'email': email}, collation=EMAIL_COLLATION)
             if len(users) == 1:
                 return users[0]
             elif len(users) == 0:
@@ -44,5 +47,11 @@ class UserController(Controller):
         try:
             update_result = super().update(id=id, data={'$set': data})
             return update_result
+        except Exception as e:
+            raise
+
+    def update_and_get(self, id, data):
+        try:
+            return super().update_and_get(id=id, data={'$set': data})
         except Exception as e:
             raise
\ No newline at end of file
@@ -0,0 +1,400 @@
+# coding=utf-8
+# create an asynchronous data access object
+from src.util.mongo import getAsyncClient, getAsyncDatabase
+from src.util.converters import to_json, to_json_many
+from src.util.pagination import encodeCursor, decodeCursor
+
+from bson.objectid import ObjectId
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, WriteError
+
+
+class AsyncDAO:
+
+    def __init__(self, collection_name: str):
+        """Establish an asynchronous data access object to a collection of the given name, which offers the methods of the synchronous DAO (see src.util.dao) as coroutines based on motor. While a coroutine waits for MongoDB, the event loop serves other requests. Asynchronous data access objects do not set up their collections, which is left to the init-db step (see src.util.initdb).
+
+        parameters:
+            collection_name -- the name of the collection (a collection validator of the same name must be available)
+        """
+        self.collection_name = collection_name
+        self._client = None
+        self._collection = None
+
+    @property
+    def collection(self):
+        """The motor collection associated to this data access object, resolved through the shared asynchronous client of the current process (see src.util.mongo.getAsyncClient)."""
+        client = getAsyncClient()
+        if self._client is not client:
+            self._collection = getAsyncDatabase()[self.collection_name]
+            self._client = client
+        return self._collection
+
+    async def create(self, data: dict):
+        """Create a new document in the collection (see DAO.create).
+
+        parameters:
+            data -- a dict containing key-value pairs compliant to the validator
+
+        returns:
+            object -- the newly created MongoDB document (parsed to a JSON object)
+
+        raises:
+            WriteError - in case at least one of the validator criteria is violated
+        """
+        localdata = dict(data)
+
+        try:
+            inserted_id = (await self.collection.insert_one(localdata)).inserted_id
+            return self.to_json(self.as_created(localdata, inserted_id))
+        except Exception as e:
+            raise
+
+    async def create_many(self, data: list):
+        """Create several new documents with one single (ordered) bulk insert (see DAO.create_many).
+
+        parameters:
+            data -- a list of dicts containing key-value pairs compliant to the validator
+
+        returns:
+            [object] -- the newly created MongoDB documents (parsed to JSON objects), in the order of the input data
+
+        raises:
+            WriteError - in case at least one of the validator criteria is violated, with the number of created documents under the key nInserted of its details
+        """
+        localdata = [dict(document) for document in data]
+        if len(localdata) == 0:
+            return []
+
+        try:
+            inserted_ids = (await self.collection.insert_many(localdata, ordered=True)).inserted_ids
+            return [self.to_json(self.as_created(document, inserted_id)) for document, inserted_id in zip(localdata, inserted_ids)]
+        except BulkWriteError as e:
+            error = e.details['writeErrors'][0]
+            details = dict(error)
+            details['nInserted'] = e.details.get('nInserted', error.get('index', 0))
+            raise WriteError(error=error.get('errmsg'), code=error.get('code'), details=details)
+
+    async def create_bulk(self, data: list, ordered: bool = False):
+        """Insert a large number of documents with one bulk insert without converting them back (see DAO.create_bulk).
+
+        parameters:
+            data -- a list of dicts containing key-value pairs compliant to the validator
+            ordered -- whether the documents have to be inserted in the given order, stopping at the first failure
+
+        returns:
+            n -- number of inserted documents
+
+        raises:
+            BulkWriteError - in case at least one of the documents violates the validator
+        """
+        if len(data) == 0:
+            return 0
+
+        try:
+            return len((await self.collection.insert_many(data, ordered=ordered)).inserted_ids)
+        except Exception as e:
+            raise
+
+    async def findOne(self, id: str):
+        """Find one specific object in the collection with the _id property equal to the given id.
+
+        parameters:
+            id -- id value of the requested object
+
+        returns:
+            object -- MongoDB document (parsed to json object)
+
+        raises:
+            Exception -- in case any database operation fails
+        """
+        try:
+            obj = await self.collection.find_one({'_id': ObjectId(id)})
+            return self.to_json(obj)
+        except Exception as e:
+            raise
+
+    async def find(self, filter=None, toid: list = None, projection: dict = None, collation=None):
+        """Find all objects contained in the collection which comply to the given filter (see DAO.find).
+
+        parameters:
+            filter -- dict containing key value pairs of properties and applicable filters
+            toid -- list of properties (contained in the filter) which are MongoDB ObjectIDs and hence need to be converted
+            projection -- optional dict of fields to include in (or exclude from) the returned objects
+            collation -- optional pymongo Collation for string comparisons
+
+        returns:
+            [object] -- list of objects compliant to the given filter
+
+        raises:
+            Exception -- in case any database operation fails
+        """
+        if toid and len(toid) > 0:
+            for i in toid:
+                filter[i] = {'$in': [ObjectId(element['$oid']) for element in filter[i]]}
+
+        try:
+            dbobjs = await self.collection.find(filter, projection, collation=collation).to_list(length=None)
+            return to_json_many(dbobjs)
+        except Exception as e:
+            raise
+
+    async def iterate(self, filter=None, projection: dict = None, batch_size: int = 0):
+        """Iterate lazily over all objects which comply to the given filter, fetching them in batches (see DAO.iterate).
+
+        parameters:
+            filter -- dict containing key value pairs of properties and applicable filters
+            projection -- optional dict of fields to include in (or exclude from) the returned objects
+            batch_size -- number of objects fetched per round trip (0 for the server default)
+
+        returns:
+            asynchronous generator of objects (parsed to json objects)
+
+        raises:
+            Exception -- in case any database operation fails
+        """
+        cursor = self.collection.find(filter, projection, batch_size=batch_size)
+        try:
+            async for obj in cursor:
+                yield to_json(obj)
+        finally:
+            await cursor.close()
+
+    async def find_page(self, filter=None, limit: int = 100, after: str = None, projection: dict = None):
+        """Find one page of the objects which comply to the given filter, ordered by their _id (see DAO.find_page).
+
+        parameters:
+            filter -- dict containing key value pairs of properties and applicable filters
+            limit -- the maximum number of objects of the page
+            after -- token of the previous page (see src.util.pagination), None for the first page
+            projection -- optional dict of fields to include in (or exclude from) the returned objects
+
+        returns:
+            [object] -- list of the objects of the page
+            next_page -- token of the next page, None if this is the last page
+
+        raises:
+            ValueError -- in case the token is not valid
+            Exception -- in case any database operation fails
+        """
+        query = dict(filter or {})
+        if after is not None:
+            condition = {'_id': {'$gt': decodeCursor(after)}}
+            query = {'$and': [query, condition]} if '_id' in query else {**query, **condition}
+
+        try:
+            dbobjs = await self.collection.find(query, projection).sort('_id', ASCENDING).limit(limit + 1).to_list(length=None)
+            next_page = encodeCursor(dbobjs[limit - 1]['_id']) if len(dbobjs) > limit else None
+            return to_json_many(dbobjs[:limit]), next_page
+        except Exception as e:
+            raise
+
+    async def aggregate(self, pipeline: list):
+        """Run an aggregation pipeline on the collection and return all resulting documents (see DAO.aggregate).
+
+        parameters:
+            pipeline -- list of aggregation stages
+
+        returns:
+            [object] -- list of resulting documents (parsed to json objects)
+
+        raises:
+            Exception -- in case any database operation fails
+        """
+        try:
+            dbobjs = await self.collection.aggregate(pipeline).to_list(length=None)
+            return to_json_many(dbobjs)
+        except Exception as e:
+            raise
+
+    async def aggregate_iterate(self, pipeline: list, batch_size: int = None):
+        """Iterate lazily over the resulting documents of an aggregation pipeline (see DAO.aggregate_iterate).
+
+        parameters:
+            pipeline -- list of aggregation stages
+            batch_size -- number of documents fetched per round trip (None for the server default)
+
+        returns:
+            asynchronous generator of documents (parsed to json objects)
+
+        raises:
+            Exception -- in case any database operation fails
+        """
+        options = {} if batch_size is None else {'batchSize': batch_size}
+        cursor = self.collection.aggregate(pipeline, **options)
+        try:
+            async for obj in cursor:
+                yield to_json(obj)
+        finally:
+            await cursor.close()
+
+    async def update(self, id: str, update_data: dict):
+        """Find one specific object in the collection with the _id property equal to the given id and update its data according to the update_data (see DAO.update).
+
+        parameters:
+            id -- id value of the requested object
+            update_data -- dict containing the update operation
+
+        returns:
+            True -- if the update was successful
+            False -- otherwise
+
+        raises:
+            Exception -- in case any database operation fails
+        """
+        try:
+            update_result = await self.collection.update_one({'_id': ObjectId(id)}, update_data)
+            return update_result.acknowledged
+        except Exception as e:
+            raise
+
+    async def bulk_update(self, updates: list):
+        """Update several objects of the collection, each identified by its id, with one single bulk write.
+
+        parameters:
+            updates -- list of tuples (id, update_data)
+
+        returns:
+            True -- if the updates were successful
+            False -- otherwise
+
+        raises:
+            Exception -- in case any database operation fails
+        """
+        if len(updates) == 0:
+            return True
+
+        try:
+            result = await self.collection.bulk_write(
+                [UpdateOne({'_id': ObjectId(id)}, update_data) for id, update_data in updates],
+                ordered=False
+            )
+            return result.acknowledged
+        except Exception as e:
+            raise
+
+    async def findOneAndUpdate(self, id: str, update_data: dict, projection: dict = None):
+        """Update one specific object and return the updated object within the same database operation (see DAO.findOneAndUpdate).
+
+        parameters:
+            id -- id value of the requested object
+            update_data -- dict containing the update operation
+            projection -- optional dict of fields to include in (or exclude from) the returned object
+
+        returns:
+            object -- the updated MongoDB document (parsed to json object)
+            None -- if no object with the given id exists
+
+        raises:
+            Exception -- in case any database operation fails
+        """
+        return await self.findAndUpdate({'_id': ObjectId(id)}, update_data, projection=projection)
+
+    async def findAndUpdate(self, filter: dict, update_data: dict, projection: dict = None):
+        """Update the first object which complies to the given filter and return the updated object within the same database operation (see DAO.findAndUpdate).
+
+        parameters:
+            filter -- dict containing key value pairs of properties and applicable filters
+            update_data -- dict containing the update operation
+            projection -- optional dict of fields to include in (or exclude from) the returned object
+
+        returns:
+            object -- the updated MongoDB document (parsed to json object)
+            None -- if no object complies to the filter
+
+        raises:
+            Exception -- in case any database operation fails
+        """
+        try:
+            obj = await self.collection.find_one_and_update(
+                filter,
+                update_data,
+                projection=projection,
+                return_document=ReturnDocument.AFTER
+            )
+            return self.to_json(obj)
+        except Exception as e:
+            raise
+
+    async def delete(self, id: str):
+        """Remove the object with the given id from the collection.
+
+        parameters:
+            id -- id value of the requested object
+
+        returns:
+            True -- if the deletion was successful
+            False -- otherwise
+
+        raises:
+            Exception -- in case any database operation fails
+        """
+        try:
+            result = await self.collection.delete_one({'_id': ObjectId(id)})
+            return result.acknowledged
+        except Exception as e:
+            raise
+
+    async def findOneAndDelete(self, id: str, projection: dict = None):
+        """Remove the object with the given id from the collection and return the removed object within the same database operation (see DAO.findOneAndDelete).
+
+        parameters:
+            id -- id value of the requested object
+            projection -- optional dict of fields to include in (or exclude from) the returned object
+
+        returns:
+            object -- the removed MongoDB document (parsed to json object)
+            None -- if no object is associated to the given id
+
+        raises:
+            Exception -- in case any database operation fails
+        """
+        try:
+            obj = await self.collection.find_one_and_delete({'_id': ObjectId(id)}, projection=projection)
+            return self.to_json(obj)
+        except Exception as e:
+            raise
+
+    async def delete_many(self, ids: list):
+        """Remove all objects with one of the given ids from the collection with one single database operation.
+
+        parameters:
+            ids -- list of id values (strings or ObjectIds) of the objects to remove
+
+        returns:
+            n -- the number of removed objects
+
+        raises:
+            Exception -- in case any database operation fails
+        """
+        if len(ids) == 0:
+            return 0
+
+        try:
+            result = await self.collection.delete_many({'_id': {'$in': [ObjectId(id) for id in ids]}})
+            return result.deleted_count
+        except Exception as e:
+            raise
+
+    async def drop(self):
+        """Remove the entire collection
+
+        raises:
+            Exception -- in case any database operation fails
+        """
+        try:
+            await self.collection.drop()
+        except Exception as e:
+            raise
+
+    def as_created(self, data: dict, inserted_id):
+        """Reconstruct a newly inserted document from its input data and the id assigned during the insert (see DAO.as_created)."""
+        document = {'_id': inserted_id}
+        for key, value in data.items():
+            if key != '_id':
+                document[key] = value
+        return document
+
+    def to_json(self, data):
+        """Transform a MongoDB document into a json object (see src.util.converters.to_json)."""
+        return to_json(data)
@@ -0,0 +1,34 @@
+# coding=utf-8
+# counterparts of the Flask response helpers for the asynchronous (Quart) application
+from quart import Response, current_app, request
+
+from src.util.streaming import FORMATS, encodeAsync
+
+async def conditionalResponse(etag: str, make_response):
+    """Answer a conditional GET request like src.util.versions.conditionalResponse, where the representation is produced by a coroutine.
+
+    parameters:
+        etag -- the current (unquoted) ETag of the requested resource
+        make_response -- coroutine function without arguments returning the Quart response for the resource
+
+    returns:
+        response -- Quart response carrying the ETag
+    """
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = await make_response()
+    response.set_etag(etag)
+    return response
+
+def streamResponse(objects, format: str = 'json'):
+    """Create a Quart response which streams an asynchronous iterable of json objects while it is iterated (see src.util.streaming.streamResponse).
+
+    parameters:
+        objects -- asynchronous iterable (e.g., generator reading from a motor cursor) of json objects
+        format -- json or ndjson
+
+    returns:
+        response -- streamed Quart response
+    """
+    return Response(encodeAsync(objects, format, current_app.json.dumps), mimetype=FORMATS[format])
@@ -0,0 +1,47 @@
+# coding=utf-8
+from bson.objectid import ObjectId
+
+from src.util.settings import getSettings
+
+def getBatchIds(values: list):
+    """Read the ids of a batch request (see Controller.get_many): each value may contain several comma-separated ids, and repeated ids are requested once.
+
+    parameters:
+        values -- list of the given values of the ids, e.g., the form field ids or the list ids of a json body
+
+    returns:
+        ids -- list of the distinct ids in the given order
+
+    raises:
+        ValueError -- in case no id is given, an id is not valid, or there are more ids than BATCH_MAX_IDS
+    """
+    ids = []
+    for value in values:
+        if not isinstance(value, str):
+            raise ValueError('Error: ids must be strings')
+        ids.extend(id.strip() for id in value.split(',') if id.strip() != '')
+    ids = list(dict.fromkeys(ids))
+
+    if len(ids) == 0:
+        raise ValueError('Error: no ids given')
+    invalid = [id for id in ids if not ObjectId.is_valid(id)]
+    if len(invalid) > 0:
+        raise ValueError(f'Error: invalid ids {", ".join(invalid[:10])}')
+    maximum = getSettings().batch_max_ids
+    if len(ids) > maximum:
+        raise ValueError(f'Error: at most {maximum} ids per request')
+    return ids
+
+def batchValues(form, body):
+    """Return the values of the ids of a batch request, given either as the (repeatable) form field ids or as the list ids of a json body.
+
+    parameters:
+        form -- the form data of the request
+        body -- the parsed json body of the request, None if there is none
+
+    returns:
+        values -- list of the given values (see getBatchIds)
+    """
+    if isinstance(body, dict) and 'ids' in body:
+        return body['ids'] if isinstance(body['ids'], list) else [body['ids']]
+    return form.getlist('ids')
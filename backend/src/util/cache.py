@@ -0,0 +1,201 @@
+# coding=utf-8
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from src.util.settings import getSettings
+
+# returned by get in case the key is not cached (None is a valid cached value)
+MISS = object()
+
+class Cache(ABC):
+    """Interface of the caches used by the controllers. Keys are tuples whose first element is a namespace (e.g., the collection name) and values are json objects as returned by the data access objects. A cached value may depend on other keys (e.g., a populated task on its todos), such that invalidating a key also invalidates all values depending on it. A value may be cached together with the version of the object it was read at (see src.util.versions), such that it is only returned for that version."""
+
+    @abstractmethod
+    def get(self, key: tuple, default=MISS, version: int = None):
+        """Return the value cached under the key, or the default if the key is not cached, expired, or (if a version is given) cached with another version."""
+        pass
+
+    @abstractmethod
+    def token(self):
+        """Return a token to take before a value is read from the database and to pass to set, such that a value which was read before a concurrent change (and its invalidation) is not cached."""
+        pass
+
+    @abstractmethod
+    def set(self, key: tuple, value, depends_on: list = (), token=None, version: int = None):
+        """Cache a value under the key, which will be invalidated as soon as one of the keys in depends_on is invalidated. If a token is given, the value is discarded in case the key or one of the keys in depends_on was invalidated since the token was taken. The version is the one read before the value (see get)."""
+        pass
+
+    @abstractmethod
+    def invalidate(self, *keys: tuple):
+        """Remove the given keys and, transitively, all keys depending on them."""
+        pass
+
+    @abstractmethod
+    def clear(self):
+        """Remove all cached values."""
+        pass
+
+    @abstractmethod
+    def stats(self):
+        """Return a dict of counters describing the usage of the cache (at least hits and misses)."""
+        pass
+
+class NullCache(Cache):
+    """A cache which never stores anything, used when caching is disabled."""
+
+    def __init__(self):
+        self.misses = 0
+
+    def get(self, key: tuple, default=MISS, version: int = None):
+        self.misses += 1
+        return default
+
+    def token(self):
+        return None
+
+    def set(self, key: tuple, value, depends_on: list = (), token=None, version: int = None):
+        pass
+
+    def invalidate(self, *keys: tuple):
+        pass
+
+    def clear(self):
+        pass
+
+    def stats(self):
+        return {'hits': 0, 'misses': self.misses, 'size': 0, 'maxsize': 0, 'evictions': 0}
+
+class LRUCache(Cache):
+    def __init__(self, maxsize: int, ttls: dict = None, default_ttl: float = 30):
+        """Create a size-bounded, thread-safe in-process cache which evicts the least recently used entry once maxsize entries are stored. Each entry expires after the time to live of its namespace.
+
+        parameters:
+            maxsize -- the maximum number of cached entries
+            ttls -- dict mapping namespaces to their time to live in seconds
+            default_ttl -- time to live in seconds of namespaces not contained in ttls
+        """
+        self.maxsize = maxsize
+        self.ttls = ttls or {}
+        self.default_ttl = default_ttl
+        self.entries = OrderedDict()  # key -> (expiry, value, dependencies, version)
+        self.dependents = {}  # key -> set of keys whose values depend on it
+        # logical clock of the invalidations: the time of the latest invalidation of the most recently invalidated keys (at most maxsize),
+        # older invalidations are only known to have happened until the horizon
+        self.clock = 0
+        self.invalidated = OrderedDict()  # key -> time of its latest invalidation
+        self.horizon = 0
+        self.lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: tuple, default=MISS, version: int = None):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] < time.monotonic() or (version is not None and entry[3] != version):
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            value = entry[1]
+        # every caller obtains its own copy, such that modifications do not alter the cached value
+        return clone(value)
+
+    def token(self):
+        with self.lock:
+            return self.clock
+
+    def set(self, key: tuple, value, depends_on: list = (), token=None, version: int = None):
+        value = clone(value)
+        expiry = time.monotonic() + self.ttls.get(key[0], self.default_ttl)
+        with self.lock:
+            if token is not None and self._stale(token, (key,) + tuple(depends_on)):
+                return
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (expiry, value, tuple(depends_on), version)
+            for dependency in depends_on:
+                self.dependents.setdefault(dependency, set()).add(key)
+            while len(self.entries) > self.maxsize:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def invalidate(self, *keys: tuple):
+        with self.lock:
+            self.clock += 1
+            pending = list(keys)
+            while len(pending) > 0:
+                key = pending.pop()
+                pending.extend(self.dependents.pop(key, ()))
+                if key in self.entries:
+                    self._remove(key)
+                self.invalidated[key] = self.clock
+                self.invalidated.move_to_end(key)
+            while len(self.invalidated) > self.maxsize:
+                self.horizon = self.invalidated.popitem(last=False)[1]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.dependents.clear()
+            # values read before are not cached anymore
+            self.clock += 1
+            self.invalidated.clear()
+            self.horizon = self.clock
+
+    def stats(self):
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self.entries), 'maxsize': self.maxsize, 'evictions': self.evictions}
+
+    def _stale(self, token: int, keys: tuple):
+        # whether any of the keys was (or may have been) invalidated after the token was taken
+        if token < self.horizon:
+            return True
+        return any(self.invalidated.get(key, 0) > token for key in keys)
+
+    def _remove(self, key: tuple):
+        # remove an entry and unregister it from the keys it depends on
+        expiry, value, dependencies, version = self.entries.pop(key)
+        for dependency in dependencies:
+            dependents = self.dependents.get(dependency)
+            if dependents is not None:
+                dependents.discard(key)
+                if len(dependents) == 0:
+                    del self.dependents[dependency]
+
+def clone(value):
+    """Copy a json object (nested dicts and lists of immutable values)."""
+    if value.__class__ is dict:
+        return {key: clone(element) for key, element in value.items()}
+    if value.__class__ is list:
+        return [clone(element) for element in value]
+    return value
+
+cache = None
+def disableCache():
+    """Replace the cache of this process by a NullCache. This is done in each worker of a server with several processes, whose caches would only be invalidated by their own changes, such that objects changed by another worker could be served until they expire."""
+    global cache
+    cache = NullCache()
+
+def getCache():
+    """Obtain the cache shared by all controllers of this process. It is configured via the settings: CACHE_MAXSIZE bounds the number of entries (0 disables caching), CACHE_TTL is the default time to live in seconds, and CACHE_TTL_USER, CACHE_TTL_TASK and CACHE_TTL_TODO set the time to live per collection.
+
+    returns:
+        cache -- the shared Cache
+    """
+    global cache
+    if cache is None:
+        settings = getSettings()
+        if settings.cache_maxsize <= 0:
+            cache = NullCache()
+        else:
+            default_ttl = settings.cache_ttl
+            ttls = {namespace: getattr(settings, f'cache_ttl_{namespace}') or default_ttl for namespace in ['user', 'task', 'todo']}
+            # the populated task lists of a user live as long as tasks
+            ttls['ofuser'] = ttls['task']
+            cache = LRUCache(maxsize=settings.cache_maxsize, ttls=ttls, default_ttl=default_ttl)
+    return cache
@@ -0,0 +1,57 @@
+from src.util.daos import getDao, getAsyncDao
+from src.util.cache import getCache
+from src.util.versions import getVersionStore, getAsyncVersionStore
+from src.util.settings import getSettings
+
+# layouts of the tasks, see src.util.storage
+STORAGE_LAYOUTS = ['referenced', 'embedded']
+
+controllers = {}
+def getController(name: str, create):
+    """Obtain the controller of the given name, which is created by calling create on first use. Like the data access objects (see getDao), the controllers are singletons, and creating them lazily keeps the import of the blueprints free of any work.
+
+    parameters:
+        name -- the name of the controller
+        create -- function without arguments returning a new controller
+
+    returns:
+        controller -- the controller of the given name
+    """
+    if name not in controllers:
+        controllers[name] = create()
+    return controllers[name]
+
+def isEmbedded():
+    """Return whether the tasks embed their videos and todos according to TASK_STORAGE.
+
+    raises:
+        ValueError -- in case TASK_STORAGE is not one of the STORAGE_LAYOUTS
+    """
+    layout = getSettings().task_storage
+    if layout not in STORAGE_LAYOUTS:
+        raise ValueError(f'Error: invalid value {layout} of TASK_STORAGE, choose from {", ".join(STORAGE_LAYOUTS)}')
+    return layout == 'embedded'
+
+def getUserController():
+    from src.controllers.usercontroller import UserController
+    return getController('user', lambda: UserController(getDao(collection_name='user'), cache=getCache(), versions=getVersionStore()))
+
+def getTaskController():
+    from src.controllers.taskcontroller import TaskController
+    return getController('task', lambda: TaskController(tasks_dao=getDao(collection_name='task'), videos_dao=getDao(collection_name='video'), todos_dao=getDao(collection_name='todo'), users_dao=getDao(collection_name='user'), cache=getCache(), versions=getVersionStore(), embedded=isEmbedded()))
+
+def getTodoController():
+    from src.controllers.todocontroller import TodoController
+    return getController('todo', lambda: TodoController(todo_dao=getDao(collection_name='todo'), tasks_dao=getDao(collection_name='task'), cache=getCache(), versions=getVersionStore(), users_dao=getDao(collection_name='user'), embedded=isEmbedded()))
+
+def getAsyncUserController():
+    from src.controllers.asyncusercontroller import AsyncUserController
+    return getController('asyncuser', lambda: AsyncUserController(getAsyncDao(collection_name='user'), cache=getCache(), versions=getAsyncVersionStore()))
+
+def getAsyncTaskController():
+    from src.controllers.asynctaskcontroller import AsyncTaskController
+    return getController('asynctask', lambda: AsyncTaskController(tasks_dao=getAsyncDao(collection_name='task'), videos_dao=getAsyncDao(collection_name='video'), todos_dao=getAsyncDao(collection_name='todo'), users_dao=getAsyncDao(collection_name='user'), cache=getCache(), versions=getAsyncVersionStore(), embedded=isEmbedded()))
+
+def getAsyncTodoController():
+    from src.controllers.asynctodocontroller import AsyncTodoController
+    return getController('asynctodo', lambda: AsyncTodoController(todo_dao=getAsyncDao(collection_name='todo'), tasks_dao=getAsyncDao(collection_name='task'), cache=getCache(), versions=getAsyncVersionStore(), users_dao=getAsyncDao(collection_name='user'), embedded=isEmbedded()))
@@ -0,0 +1,74 @@
+# coding=utf-8
+import math
+from datetime import datetime
+
+from bson import json_util
+from bson.objectid import ObjectId
+
+def to_json(data):
+    """Transform a MongoDB document into a json object in a single pass, without serializing it into a string and parsing it back. The result is identical to json.loads(json_util.dumps(data)), i.e., MongoDB relaxed extended JSON: ObjectIds become {'$oid': ...}, datetimes {'$date': ...} etc.
+
+    parameters:
+        data -- the MongoDB document (or any value contained in it)
+
+    returns:
+        dict -- the document converted to JSON
+    """
+    cls = data.__class__
+    if cls is str or cls is int or cls is bool or data is None:
+        return data
+    if cls is dict:
+        return {(key if key.__class__ is str else _key(key)): to_json(value) for key, value in data.items()}
+    if cls is ObjectId:
+        return {'$oid': str(data)}
+    if cls is list:
+        return [to_json(value) for value in data]
+    if cls is float:
+        return data if math.isfinite(data) else json_util.default(data)
+    if cls is datetime:
+        return json_util.default(data)
+    return _convert_other(data)
+
+def to_json_many(documents):
+    """Transform an iterable of MongoDB documents (e.g., a cursor) into a list of json objects.
+
+    parameters:
+        documents -- iterable of MongoDB documents
+
+    returns:
+        [dict] -- list of documents converted to JSON
+    """
+    return [to_json(document) for document in documents]
+
+def _key(key):
+    # keys which are not strings are converted the same way json.dumps does
+    if key is True:
+        return 'true'
+    if key is False:
+        return 'false'
+    if key is None:
+        return 'null'
+    if isinstance(key, float):
+        return float.__repr__(key)
+    if isinstance(key, int):
+        return int.__repr__(key)
+    return str(key)
+
+def _convert_other(data):
+    # the less common types are handled in the same order as json_util._json_convert does
+    if hasattr(data, 'items'):
+        return {(key if key.__class__ is str else _key(key)): to_json(value) for key, value in data.items()}
+    if hasattr(data, '__iter__') and not isinstance(data, (str, bytes)):
+        return [to_json(value) for value in data]
+    try:
+        return to_json(json_util.default(data))
+    except TypeError:
+        pass
+    # subclasses of the native json types (e.g., bson.int64.Int64) are reduced to their base type like a json round trip does
+    if isinstance(data, str):
+        return str.__str__(data)
+    if isinstance(data, int):
+        return int(data)
+    if isinstance(data, float):
+        return float(data)
+    return data
@@ -0,0 +1,74 @@
+# coding=utf-8
+# recompute the counters of todos of the tasks (total and done), run from the backend folder with
+#   python -m src.util.counters [--batch-size 500]
+import argparse
+
+from bson.objectid import ObjectId
+from pymongo import UpdateOne
+
+from src.util.daos import getDao
+
+def countTodos(task: dict, done: dict):
+    """Count the todos of a task in either storage layout: embedded todos are counted directly, referenced todos if they exist.
+
+    parameters:
+        task -- task document containing its todos
+        done -- dict mapping the id of each existing referenced todo to its done flag
+
+    returns:
+        total -- the number of todos of the task
+        done -- the number of done todos of the task
+    """
+    flags = []
+    for todo in task.get('todos', []):
+        if isinstance(todo, ObjectId):
+            if todo in done:
+                flags.append(done[todo])
+        else:
+            flags.append(todo.get('done') is True)
+    return len(flags), len([flag for flag in flags if flag])
+
+def repairCounters(batch_size: int = 500):
+    """Recompute the counters of todos (total and done) of all tasks, which TodoController maintains, e.g., after tasks were created before the counters were introduced or after an interrupted change. The tasks are read in batches and only tasks with wrong counters are updated, with one bulk write per batch. A task is only updated if its todos and counters were not changed since it was read, but a todo toggled while its task is repaired may leave a wrong counter behind, so the repair is best run while the todos are not changed, or run again.
+
+    parameters:
+        batch_size -- number of tasks read and repaired at once
+
+    returns:
+        counts -- dict containing the number of checked tasks (key checked) and of repaired tasks (key repaired)
+
+    raises:
+        Exception -- in case any database operation fails
+    """
+    tasks_dao, todos_dao = getDao(collection_name='task'), getDao(collection_name='todo')
+    counts = {'checked': 0, 'repaired': 0}
+    last = None
+    while True:
+        filter = {} if last is None else {'_id': {'$gt': last}}
+        tasks = list(tasks_dao.collection.find(filter, {'todos': 1, 'total': 1, 'done': 1}).sort('_id', 1).limit(batch_size))
+        if len(tasks) == 0:
+            return counts
+
+        todoids = [todo for task in tasks for todo in task.get('todos', []) if isinstance(todo, ObjectId)]
+        done = {todo['_id']: todo.get('done') is True for todo in todos_dao.collection.find({'_id': {'$in': todoids}}, {'done': 1})}
+
+        updates = []
+        for task in tasks:
+            total, finished = countTodos(task, done)
+            if task.get('total') != total or task.get('done') != finished:
+                unchanged = {'_id': task['_id'], 'todos': task.get('todos', []), 'total': task.get('total'), 'done': task.get('done')}
+                updates.append(UpdateOne(unchanged, {'$set': {'total': total, 'done': finished}}))
+        if len(updates) > 0:
+            counts['repaired'] += tasks_dao.collection.bulk_write(updates, ordered=False).modified_count
+        counts['checked'] += len(tasks)
+        last = tasks[-1]['_id']
+
+def main():
+    parser = argparse.ArgumentParser(description='Recompute the counters of todos of the tasks')
+    parser.add_argument('--batch-size', type=int, default=500, help='number of tasks repaired per bulk write')
+    args = parser.parse_args()
+
+    print(repairCounters(args.batch_size))
+
+if __name__ == '__main__':
+    main()
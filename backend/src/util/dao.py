@@ -1,43 +1,60 @@
 # coding=utf-8
-import os
-
-import pymongo
-from dotenv import dotenv_values
-
 # create a data access object
 from src.util.validators import getValidator
+from src.util.mongo import getClient, getDatabase, getMongoUrl
+from src.util.converters import to_json, to_json_many
+from src.util.pagination import encodeCursor, decodeCursor
 
-import json
-from bson import json_util
 from bson.objectid import ObjectId
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, WriteError, CollectionInvalid, OperationFailure
 
 
 class DAO:
 
     def __init__(self, collection_name: str):
-        """Establish a data access object to a collection of the given name in the MongoDB database as specified in the environment variables. When the collection is first creted, it will be associated to a validator (see https://www.mongodb.com/docs/manual/core/schema-validation/) to ensure some basic data compliance.
+        """Establish a data access object to a collection of the given name in the MongoDB database as specified in the environment variables. No database operation happens on instantiation: when the collection is first used, it is created if it does not yet exist and then associated to a validator (see https://www.mongodb.com/docs/manual/core/schema-validation/) to ensure some basic data compliance. Usually, the collections are already set up by the init-db step (see src.util.initdb), which also updates the validators of existing collections.
 
         parameters:
             collection_name -- the name of the collection (a collection validator of the same name must be available)
         """
 
-        # load the local mongo URL (something like mongodb://localhost:27017)
-        LOCAL_MONGO_URL = dotenv_values('.env').get('MONGO_URL')
-        # check out of the environment (which can be overridden by the docker-compose file) also specifies an URL, and use that instead if it exists
-        MONGO_URL = os.environ.get('MONGO_URL', LOCAL_MONGO_URL)
-
-        # connect to the MongoDB and select the appropriate database
-        print(
-            f'Connecting to collection {collection_name} on MongoDB at url {MONGO_URL}')
-        client = pymongo.MongoClient(MONGO_URL)
-        database = client.edutask
+        self.collection_name = collection_name
+        self._client = None
+        self._collection = None
+        self.bootstrapped = False
+
+    @property
+    def collection(self):
+        """The pymongo collection associated to this data access object. It is resolved through the shared client of the current process, such that a data access object created before a fork uses the client of the forked process."""
+        if not self.bootstrapped:
+            self.ensure_collection()
+        client = getClient()
+        if self._client is not client:
+            self._collection = getDatabase()[self.collection_name]
+            self._client = client
+        return self._collection
+
+    def ensure_collection(self):
+        """Create the collection with its validator if it does not yet exist. This is done once per data access object (and inherited by forked processes). Concurrent requests (or processes) may attempt to create the same collection, in which case all but one find it created already.
 
-        # create the collection if it does not yet exist
-        if collection_name not in database.list_collection_names():
-            validator = getValidator(collection_name)
-            database.create_collection(collection_name, validator=validator)
-
-        self.collection = database[collection_name]
+        raises:
+            Exception -- in case any database operation fails
+        """
+        # all data access objects share the connection pool of one MongoClient per process (see src.util.mongo)
+        print(f'Connecting to collection {self.collection_name} on MongoDB at url {getMongoUrl()}')
+        database = getDatabase()
+        if self.collection_name not in database.list_collection_names():
+            validator = getValidator(self.collection_name)
+            try:
+                database.create_collection(self.collection_name, validator=validator)
+            except CollectionInvalid:
+                pass
+            except OperationFailure as e:
+                # NamespaceExists: the collection was created after it was listed
+                if e.code != 48:
+                    raise
+        self.bootstrapped = True
 
     def create(self, data: dict):
         """Creates a new document in the collection associated to this data access object. The creation of a new document must comply to the corresponding validator, which defines the data structure of the collection. In particular, the validator has to make sure that: (1) the data for the new object contains all required properties, (2) every property complies to the bson data type constraint (see https://www.mongodb.com/docs/manual/reference/bson-types/, though we currently only consider Strings and Booleans), (3) and the values of a property flagged with 'uniqueItems' are unique among all documents of the collection.
@@ -57,13 +74,59 @@ class DAO:
             # insert the object into the database
             inserted_id = self.collection.insert_one(localdata).inserted_id
 
-            # fetch and return the created object
-            obj = self.collection.find_one({'_id': inserted_id})
-            return self.to_json(obj)
+            # the created object consists of the input data and the generated id, so it does not need to be fetched again
+            return self.to_json(self.as_created(localdata, inserted_id))
         except Exception as e:
             # forward any pymongo.errors.WriteError that occurs during insert_one
             raise
 
+    def create_many(self, data: list):
+        """Creates several new documents in the collection with one single (ordered) bulk insert. Each document must comply to the validator of the collection (see create).
+
+        parameters:
+            data -- a list of dicts containing key-value pairs compliant to the validator
+
+        returns:
+            [object] -- the newly created MongoDB documents (parsed to JSON objects), in the order of the input data
+
+        raises:
+            WriteError - in case at least one of the validator criteria is violated. The documents preceding the first violating one are created, their number is available in the details of the error under the key nInserted
+        """
+        localdata = [dict(document) for document in data]
+        if len(localdata) == 0:
+            return []
+
+        try:
+            inserted_ids = self.collection.insert_many(localdata, ordered=True).inserted_ids
+            return [self.to_json(self.as_created(document, inserted_id)) for document, inserted_id in zip(localdata, inserted_ids)]
+        except BulkWriteError as e:
+            # report the first failing document in the same way as a failing insert_one does
+            error = e.details['writeErrors'][0]
+            details = dict(error)
+            details['nInserted'] = e.details.get('nInserted', error.get('index', 0))
+            raise WriteError(error=error.get('errmsg'), code=error.get('code'), details=details)
+
+    def create_bulk(self, data: list, ordered: bool = False):
+        """Insert a large number of documents with one bulk insert without converting them back, which is meant for seeding the database. Unless ordered is set, MongoDB may insert the documents in any order and continues after a failing document.
+
+        parameters:
+            data -- a list of dicts containing key-value pairs compliant to the validator
+            ordered -- whether the documents have to be inserted in the given order, stopping at the first failure
+
+        returns:
+            n -- number of inserted documents
+
+        raises:
+            BulkWriteError - in case at least one of the documents violates the validator
+        """
+        if len(data) == 0:
+            return 0
+
+        try:
+            return len(self.collection.insert_many(data, ordered=ordered).inserted_ids)
+        except Exception as e:
+            raise
+
     def findOne(self, id: str):
         """Find one specific object in the collection with the _id property equal to the given id.
 
@@ -83,12 +146,14 @@ class DAO:
             raise
 
     # find all objects that comply to the optional filter
-    def find(self, filter=None, toid: list = None):
+    def find(self, filter=None, toid: list = None, projection: dict = None, collation=None):
         """Find all objects contained in the collection which comply to the given filter. 
 
         parameters: 
             filter -- dict containing key value pairs of properties and applicable filters
             toid -- list of properties (contained in the filter) which are MongoDB ObjectIDs and hence need to be converted
+            projection -- optional dict of fields to include in (or exclude from) the returned objects
+            collation -- optional pymongo Collation for string comparisons (which must match the one of an index for the index to be used)
 
         returns:
             [object] -- list of objects compliant to the given filter
@@ -106,14 +171,75 @@ class DAO:
                     converted.append(conv)
                 filter[i] = {'$in': converted}
 
-        objs = []
         try:
-            dbobjs = self.collection.find(filter)
+            dbobjs = self.collection.find(filter, projection, collation=collation)
+            return to_json_many(dbobjs)
+        except Exception as e:
+            raise
+
+    def iterate(self, filter=None, projection: dict = None, batch_size: int = 0):
+        """Iterate lazily over all objects which comply to the given filter. In contrast to find, the objects are fetched from the database in batches while iterating and converted one by one, such that memory usage does not grow with the number of objects.
+
+        parameters: 
+            filter -- dict containing key value pairs of properties and applicable filters
+            projection -- optional dict of fields to include in (or exclude from) the returned objects
+            batch_size -- number of objects fetched per round trip (0 for the server default)
+
+        returns:
+            generator of objects (parsed to json objects)
+
+        raises:
+            Exception -- in case any database operation fails
+        """
+        with self.collection.find(filter, projection, batch_size=batch_size) as cursor:
+            for obj in cursor:
+                yield to_json(obj)
+
+    def find_page(self, filter=None, limit: int = 100, after: str = None, projection: dict = None):
+        """Find one page of the objects which comply to the given filter, ordered by their _id (keyset pagination). In contrast to skipping objects, each page costs the same, independent of its position.
+
+        parameters: 
+            filter -- dict containing key value pairs of properties and applicable filters
+            limit -- the maximum number of objects of the page
+            after -- token of the previous page (see src.util.pagination), None for the first page
+            projection -- optional dict of fields to include in (or exclude from) the returned objects
+
+        returns:
+            [object] -- list of the objects of the page
+            next_page -- token of the next page, None if this is the last page
+
+        raises:
+            ValueError -- in case the token is not valid
+            Exception -- in case any database operation fails
+        """
+        query = dict(filter or {})
+        if after is not None:
+            condition = {'_id': {'$gt': decodeCursor(after)}}
+            query = {'$and': [query, condition]} if '_id' in query else {**query, **condition}
+
+        try:
+            # fetch one more object than requested to know whether there is a next page
+            dbobjs = list(self.collection.find(query, projection).sort('_id', ASCENDING).limit(limit + 1))
+            next_page = encodeCursor(dbobjs[limit - 1]['_id']) if len(dbobjs) > limit else None
+            return to_json_many(dbobjs[:limit]), next_page
+        except Exception as e:
+            raise
 
-            for obj in dbobjs:
-                objs.append(self.to_json(obj))
+    def aggregate(self, pipeline: list):
+        """Run an aggregation pipeline on the collection and return all resulting documents. This allows to resolve references into other collections (via $lookup) in a single database round trip.
 
-            return objs
+        parameters:
+            pipeline -- list of aggregation stages (see https://www.mongodb.com/docs/manual/reference/operator/aggregation-pipeline/)
+
+        returns:
+            [object] -- list of resulting documents (parsed to json objects)
+
+        raises:
+            Exception -- in case any database operation fails
+        """
+        try:
+            dbobjs = self.collection.aggregate(pipeline)
+            return to_json_many(dbobjs)
         except Exception as e:
             raise
 
@@ -140,6 +266,92 @@ class DAO:
         except Exception as e:
             raise
 
+    def aggregate_iterate(self, pipeline: list, batch_size: int = None):
+        """Iterate lazily over the resulting documents of an aggregation pipeline (see aggregate and iterate).
+
+        parameters:
+            pipeline -- list of aggregation stages
+            batch_size -- number of documents fetched per round trip (None for the server default)
+
+        returns:
+            generator of documents (parsed to json objects)
+
+        raises:
+            Exception -- in case any database operation fails
+        """
+        options = {} if batch_size is None else {'batchSize': batch_size}
+        with self.collection.aggregate(pipeline, **options) as cursor:
+            for obj in cursor:
+                yield to_json(obj)
+
+    def bulk_update(self, updates: list):
+        """Update several objects of the collection, each identified by its id, with one single bulk write.
+
+        parameters: 
+            updates -- list of tuples (id, update_data), where update_data is a dict containing the update operation (see update)
+
+        returns:
+            True -- if the updates were successful
+            False -- otherwise
+
+        raises:
+            Exception -- in case any database operation fails
+        """
+        if len(updates) == 0:
+            return True
+
+        try:
+            result = self.collection.bulk_write(
+                [UpdateOne({'_id': ObjectId(id)}, update_data) for id, update_data in updates],
+                ordered=False
+            )
+            return result.acknowledged
+        except Exception as e:
+            raise
+
+    def findOneAndUpdate(self, id: str, update_data: dict, projection: dict = None):
+        """Find one specific object in the collection with the _id property equal to the given id, update its data according to the update_data and return the updated object within the same database operation.
+
+        parameters: 
+            id -- id value of the requested object
+            update_data -- dict containing the update operation (see update)
+            projection -- optional dict of fields to include in (or exclude from) the returned object
+
+        returns:
+            object -- the updated MongoDB document (parsed to json object)
+            None -- if no object with the given id exists
+
+        raises:
+            Exception -- in case any database operation fails
+        """
+        return self.findAndUpdate({'_id': ObjectId(id)}, update_data, projection=projection)
+
+    def findAndUpdate(self, filter: dict, update_data: dict, projection: dict = None):
+        """Update the first object which complies to the given filter and return the updated object within the same database operation (see findOneAndUpdate), e.g., to update an embedded document with the positional operator $.
+
+        parameters:
+            filter -- dict containing key value pairs of properties and applicable filters
+            update_data -- dict containing the update operation (see update)
+            projection -- optional dict of fields to include in (or exclude from) the returned object
+
+        returns:
+            object -- the updated MongoDB document (parsed to json object)
+            None -- if no object complies to the filter
+
+        raises:
+            Exception -- in case any database operation fails
+        """
+        try:
+            obj = self.collection.find_one_and_update(
+                filter,
+                update_data,
+                projection=projection,
+                return_document=ReturnDocument.AFTER
+            )
+            return self.to_json(obj)
+        except Exception as e:
+            raise
+
     def delete(self, id: str):
         """Find one specific object in the collection with the _id property equal to the given id and remove it from the collection
 
@@ -161,6 +373,49 @@ class DAO:
         except Exception as e:
             raise
 
+    def findOneAndDelete(self, id: str, projection: dict = None):
+        """Remove the object with the given id from the collection and return the removed object within the same database operation.
+
+        parameters:
+            id -- id value of the requested object
+            projection -- optional dict of fields to include in (or exclude from) the returned object
+
+        returns:
+            object -- the removed MongoDB document (parsed to json object)
+            None -- if no object is associated to the given id
+
+        raises:
+            Exception -- in case any database operation fails
+        """
+        try:
+            obj = self.collection.find_one_and_delete({'_id': ObjectId(id)}, projection=projection)
+            return self.to_json(obj)
+        except Exception as e:
+            raise
+
+    def delete_many(self, ids: list):
+        """Remove all objects with one of the given ids from the collection with one single database operation.
+
+        parameters: 
+            ids -- list of id values (strings or ObjectIds) of the objects to remove
+
+        returns:
+            n -- the number of removed objects
+
+        raises:
+            Exception -- in case any database operation fails
+        """
+        if len(ids) == 0:
+            return 0
+
+        try:
+            result = self.collection.delete_many(
+                {'_id': {'$in': [ObjectId(id) for id in ids]}}
+            )
+            return result.deleted_count
+        except Exception as e:
+            raise
+
     def drop(self):
         """Remove the entire collection
 
@@ -172,8 +427,24 @@ class DAO:
         except Exception as e:
             raise
 
+    def as_created(self, data: dict, inserted_id):
+        """Reconstruct a newly inserted document from its input data and the id assigned during the insert, with the _id as first field like MongoDB stores it.
+
+        parameters:
+            data -- the inserted dict
+            inserted_id -- the ObjectId of the inserted document
+
+        returns:
+            document -- the stored MongoDB document
+        """
+        document = {'_id': inserted_id}
+        for key, value in data.items():
+            if key != '_id':
+                document[key] = value
+        return document
+
     def to_json(self, data):
-        """Transform a MongoDB document into a json object.
+        """Transform a MongoDB document into a json object (see src.util.converters.to_json).
 
         paramenters: 
             data -- the MongoDB document
@@ -181,4 +452,4 @@ class DAO:
         returns:
             dict -- the document converted to JSON
         """
-        return json.loads(json_util.dumps(data))
+        return to_json(data)
@@ -1,4 +1,5 @@
 from src.util.dao import DAO
+from src.util.asyncdao import AsyncDAO
 
 daos = {}
 def getDao(collection_name: str):
@@ -13,4 +14,18 @@ def getDao(collection_name: str):
     """
     if collection_name not in daos:
         daos[collection_name] = DAO(collection_name=collection_name)
-    return daos[collection_name]
\ No newline at end of file
+    return daos[collection_name]
+
+async_daos = {}
+def getAsyncDao(collection_name: str):
+    """Obtain an asynchronous data access object of a collection (see src.util.asyncdao), likewise one per collection.
+
+    parameters:
+        collection_name -- the name of the collection
+
+    returns:
+        dao -- AsyncDAO to the given collection
+    """
+    if collection_name not in async_daos:
+        async_daos[collection_name] = AsyncDAO(collection_name=collection_name)
+    return async_daos[collection_name]
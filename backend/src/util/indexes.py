@@ -0,0 +1,109 @@
+# coding=utf-8
+import argparse
+import json
+
+from pymongo import ASCENDING, IndexModel
+from pymongo.collation import Collation
+from pymongo.errors import OperationFailure
+
+from src.util.daos import getDao
+
+COLLECTIONS = ['user', 'task', 'todo', 'video']
+
+# email addresses are compared case-insensitively, queries have to specify the same collation to make use of the index
+EMAIL_COLLATION = Collation(locale='en', strength=2)
+
+# indexes required by the query patterns of the controllers
+QUERY_INDEXES = {
+    'user': [
+        # login via UserController.get_user_by_email, one account per email address
+        IndexModel([('email', ASCENDING)], name='email_unique', unique=True, collation=EMAIL_COLLATION)
+    ],
+    'task': [
+        # the tasks of a user ordered by their id, see TaskController.get_tasks_of_user
+        IndexModel([('owner', ASCENDING), ('_id', ASCENDING)], name='owner'),
+        # the task containing a todo
+        IndexModel([('todos', ASCENDING)], name='todos'),
+        # the task embedding a todo (TASK_STORAGE=embedded)
+        IndexModel([('todos._id', ASCENDING)], name='todos_id', sparse=True),
+        # tasks by due date
+        IndexModel([('duedate', ASCENDING)], name='duedate', sparse=True)
+    ]
+}
+
+# indexes created by earlier versions which no query uses (the properties flagged with uniqueItems in the validators), dropped by ensureIndexes
+OBSOLETE_INDEXES = {
+    'task': ['title'],
+    'todo': ['description']
+}
+
+def getIndexModels(collection_name: str):
+    """Return the indexes a collection requires, i.e., those needed by the query patterns (see QUERY_INDEXES). Properties flagged with uniqueItems in the validators are not indexed for their own sake: the flag is not enforced by the $jsonSchema validator of MongoDB, only the email of a user is unique, and an index on a field no query filters on (e.g., the todo description) only slows down the writes.
+
+    parameters:
+        collection_name -- the name of the collection
+
+    returns:
+        [IndexModel] -- list of index models
+    """
+    return list(QUERY_INDEXES.get(collection_name, []))
+
+def ensureIndexes():
+    """Create all indexes required by the collections and drop the obsolete ones (see OBSOLETE_INDEXES). Creating an index which already exists with the same specification has no effect, hence this can be run at every startup. An index that cannot be created (e.g., a unique index over duplicate data, or an index of the same name with a different specification) does not prevent the creation of the others.
+
+    returns:
+        errors -- dict mapping 'collection.index' to the error message for each index that could not be created
+    """
+    errors = {}
+    for collection_name in COLLECTIONS:
+        collection = getDao(collection_name=collection_name).collection
+        for model in getIndexModels(collection_name):
+            try:
+                collection.create_indexes([model])
+            except OperationFailure as e:
+                errors[f'{collection_name}.{model.document["name"]}'] = str(e)
+        existing = collection.index_information()
+        for name in OBSOLETE_INDEXES.get(collection_name, []):
+            if name in existing:
+                try:
+                    collection.drop_index(name)
+                except OperationFailure as e:
+                    errors[f'{collection_name}.{name}'] = str(e)
+    return errors
+
+def reportIndexes():
+    """Compare the required indexes of each collection with the existing ones and their usage statistics (via $indexStats, counted since the last restart of the MongoDB server).
+
+    returns:
+        report -- dict mapping each collection name to a dict with the lists missing (required but not existing), unused (existing but never used) and unknown (existing but not required)
+    """
+    report = {}
+    for collection_name in COLLECTIONS:
+        collection = getDao(collection_name=collection_name).collection
+        required = [model.document['name'] for model in getIndexModels(collection_name)]
+        existing = [name for name in collection.index_information() if name != '_id_']
+        usage = {stats['name']: stats['accesses']['ops'] for stats in collection.aggregate([{'$indexStats': {}}])}
+
+        report[collection_name] = {
+            'missing': [name for name in required if name not in existing],
+            'unused': [name for name in existing if usage.get(name, 0) == 0],
+            'unknown': [name for name in existing if name not in required]
+        }
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage the indexes of the database')
+    parser.add_argument('command', choices=['ensure', 'report'], help='ensure: create missing and drop obsolete indexes, report: list missing, unused and unknown indexes')
+    args = parser.parse_args()
+
+    if args.command == 'ensure':
+        errors = ensureIndexes()
+        for index, error in errors.items():
+            print(f'Error: could not create index {index}: {error}')
+        if len(errors) > 0:
+            exit(1)
+    else:
+        print(json.dumps(reportIndexes(), indent=4))
+
+if __name__ == '__main__':
+    main()
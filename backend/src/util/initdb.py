@@ -0,0 +1,42 @@
+# coding=utf-8
+# set up the database of the application, run from the backend folder with
+#   python -m src.util.initdb
+import argparse
+
+from pymongo.errors import OperationFailure
+
+from src.util.daos import getDao
+from src.util.indexes import COLLECTIONS, ensureIndexes
+from src.util.mongo import getDatabase
+from src.util.validators import getValidator
+
+def initDatabase():
+    """Set up the database: create the missing collections with their validators, update the validators of the existing collections (e.g., after a change of a validator file) and create the indexes (see src.util.indexes). Every step is idempotent, so this can be run at every deployment or start of the server. The data access objects of this process (see getDao) do not set up their collections again, neither do the processes forked from it.
+
+    returns:
+        errors -- dict mapping 'collection' or 'collection.index' to the error message for each step that failed
+    """
+    errors = {}
+    database = getDatabase()
+    # the version counters (see src.util.versions) need a collection, but no indexes
+    for collection_name in COLLECTIONS + ['version']:
+        try:
+            getDao(collection_name=collection_name).ensure_collection()
+            database.command('collMod', collection_name, validator=getValidator(collection_name))
+        except OperationFailure as e:
+            errors[collection_name] = str(e)
+    errors.update(ensureIndexes())
+    return errors
+
+def main():
+    parser = argparse.ArgumentParser(description='Create the collections, validators and indexes of the database')
+    parser.parse_args()
+
+    errors = initDatabase()
+    for step, error in errors.items():
+        print(f'Error: could not set up {step}: {error}')
+    if len(errors) > 0:
+        exit(1)
+
+if __name__ == '__main__':
+    main()
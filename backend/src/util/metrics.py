@@ -0,0 +1,334 @@
+# coding=utf-8
+import bisect
+import json
+import os
+import threading
+import time
+
+from pymongo import monitoring
+
+# upper bounds of the latency buckets in seconds, and of the buckets of database calls per request
+LATENCY_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+CALL_BUCKETS = [0, 1, 2, 3, 5, 10, 20, 50, 100]
+
+def labelset(names: tuple, values: tuple):
+    """Format label names and values in the text exposition format, e.g. {collection="task",command="find"}."""
+    if len(names) == 0:
+        return ''
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        """A monotonically increasing count per combination of label values.
+
+        parameters:
+            name -- the name of the metric
+            help -- description of the metric
+            labels -- names of the labels
+        """
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, *values, amount: float = 1):
+        with self.lock:
+            self.values[values] = self.values.get(values, 0) + amount
+
+    def snapshot(self):
+        """Return the counts as a json list of [label values, count]."""
+        with self.lock:
+            return [[list(values), count] for values, count in self.values.items()]
+
+    def merge(self, snapshot: list):
+        """Add the counts of a snapshot (e.g., of another process)."""
+        for values, count in snapshot:
+            self.inc(*values, amount=count)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        with self.lock:
+            for values, count in sorted(self.values.items()):
+                lines.append(f'{self.name}{labelset(self.labels, values)} {count}')
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: list = LATENCY_BUCKETS):
+        """A distribution of observed values per combination of label values, counted in buckets of upper bounds.
+
+        parameters:
+            name -- the name of the metric
+            help -- description of the metric
+            labels -- names of the labels
+            buckets -- sorted list of the upper bounds of the buckets
+        """
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self.values = {}  # label values -> [count per bucket (the last one unbounded), sum]
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, *values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.values.get(values)
+            if series is None:
+                series = self.values[values] = [[0] * (len(self.buckets) + 1), 0]
+            series[0][index] += 1
+            series[1] += value
+
+    def snapshot(self):
+        """Return the observations as a json list of [label values, count per bucket, sum]."""
+        with self.lock:
+            return [[list(values), list(counts), total] for values, (counts, total) in self.values.items()]
+
+    def merge(self, snapshot: list):
+        """Add the observations of a snapshot (e.g., of another process)."""
+        with self.lock:
+            for values, counts, total in snapshot:
+                series = self.values.get(tuple(values))
+                if series is None:
+                    series = self.values[tuple(values)] = [[0] * (len(self.buckets) + 1), 0]
+                for index, count in enumerate(counts):
+                    series[0][index] += count
+                series[1] += total
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self.lock:
+            series = sorted((values, list(counts), total) for values, (counts, total) in self.values.items())
+        for values, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ['+Inf'], counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{labelset(self.labels + ("le",), values + (bound,))} {cumulative}')
+            lines.append(f'{self.name}_sum{labelset(self.labels, values)} {total}')
+            lines.append(f'{self.name}_count{labelset(self.labels, values)} {cumulative}')
+        return lines
+
+class CommandMetrics(monitoring.CommandListener):
+    """Listener of the commands a MongoClient sends, which counts the commands and their durations per collection and the commands of the current request."""
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self.collections = {}  # request id of a started command -> collection
+
+    def started(self, event):
+        command = event.command
+        # the value of the command name is the collection, except for getMore (and commands like ping)
+        collection = command.get('collection') if event.command_name == 'getMore' else command.get(event.command_name)
+        self.collections[event.request_id] = collection if isinstance(collection, str) else ''
+        self.metrics.local.calls = getattr(self.metrics.local, 'calls', 0) + 1
+
+    def succeeded(self, event):
+        collection = self.collections.pop(event.request_id, None)
+        if collection is not None:
+            self.metrics.commands.observe(event.duration_micros / 1e6, collection, event.command_name)
+
+    def failed(self, event):
+        collection = self.collections.pop(event.request_id, None)
+        if collection is not None:
+            self.metrics.commands.observe(event.duration_micros / 1e6, collection, event.command_name)
+            self.metrics.failures.inc(collection, event.command_name)
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Listener of the connection pool of a MongoClient, which measures how long operations wait for a pooled connection."""
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self.local = threading.local()
+
+    def connection_check_out_started(self, event):
+        self.local.start = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        start = getattr(self.local, 'start', None)
+        if start is not None:
+            self.local.start = None
+            self.metrics.checkouts.observe(time.perf_counter() - start)
+
+    def connection_check_out_failed(self, event):
+        self.connection_checked_out(event)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+    def connection_checked_in(self, event):
+        pass
+
+class Metrics:
+    def __init__(self):
+        """Collect the metrics of this process: the latency and the number of database calls of the requests per endpoint, the number and duration of the MongoDB commands per collection, and the wait for pooled connections. They are recorded as soon as the requests and the MongoDB clients are instrumented, which METRICS_ENABLED switches on (see instrument and src.util.mongo). The processes of a server with several workers share their metrics via a directory (see share), such that each of them renders the metrics of all."""
+        self.local = threading.local()
+        self.requests = Histogram('http_request_duration_seconds', 'Latency of the requests until the response is returned', ('endpoint', 'method', 'status'))
+        self.calls = Histogram('http_request_db_calls', 'Number of MongoDB commands per request', ('endpoint',), buckets=CALL_BUCKETS)
+        self.commands = Histogram('mongo_command_duration_seconds', 'Duration of the MongoDB commands', ('collection', 'command'))
+        self.failures = Counter('mongo_command_failures_total', 'Number of failed MongoDB commands', ('collection', 'command'))
+        self.checkouts = Histogram('mongo_pool_checkout_seconds', 'Time waited for a connection of the pool')
+        self.command_listener = CommandMetrics(self)
+        self.pool_listener = PoolMetrics(self)
+        self.directory = None
+        self.cache = None
+        self.interval = 1
+        self.flusher = None  # id of the process whose flusher thread runs
+
+    def metrics(self):
+        """Return the recorded metrics (without the statistics of the cache)."""
+        return [self.requests, self.calls, self.commands, self.failures, self.checkouts]
+
+    def share(self, directory: str, cache=None, interval: float = 1):
+        """Share the metrics of this process and of the processes forked from it via a directory. Every process which serves requests writes a snapshot of its metrics to a file of its own every interval seconds (see flush), and renders the sum of the snapshots of all processes, including those which exited, such that no count is ever lost or reset. The directory is emptied, hence this has to be called once before the workers are forked.
+
+        parameters:
+            directory -- the directory of the snapshots, which is created if needed
+            cache -- optional function returning the Cache of the calling process (see src.util.cache.getCache), whose statistics are shared as well
+            interval -- seconds between two snapshots of a process
+        """
+        os.makedirs(directory, exist_ok=True)
+        for name in os.listdir(directory):
+            if name.endswith('.json'):
+                os.remove(os.path.join(directory, name))
+        self.directory = directory
+        self.cache = cache
+        self.interval = interval
+
+    def snapshot(self):
+        """Return the metrics of this process as a json object, which contains the snapshot of each metric by its name and the statistics of the shared cache (if any) under cache."""
+        snapshot = {metric.name: metric.snapshot() for metric in self.metrics()}
+        if self.cache is not None:
+            snapshot['cache'] = self.cache().stats()
+        return snapshot
+
+    def flush(self):
+        """Write the snapshot of this process to the shared directory (see share), replacing its previous snapshot at once."""
+        path = os.path.join(self.directory, f'{os.getpid()}.json')
+        with open(f'{path}.tmp', 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(f'{path}.tmp', path)
+
+    def start_flusher(self):
+        # write the snapshots of this process periodically from a background thread, which does not survive a fork
+        self.flusher = os.getpid()
+        def flush():
+            while True:
+                time.sleep(self.interval)
+                self.flush()
+        threading.Thread(target=flush, name='metrics', daemon=True).start()
+
+    def listeners(self):
+        """Return the event listeners to pass to a MongoClient."""
+        return [self.command_listener, self.pool_listener]
+
+    def start_request(self):
+        if self.directory is not None and self.flusher != os.getpid():
+            self.start_flusher()
+        self.local.calls = 0
+        self.local.start = time.perf_counter()
+
+    def end_request(self, endpoint: str, method: str, status: int):
+        start = getattr(self.local, 'start', None)
+        if start is not None:
+            self.local.start = None
+            self.requests.observe(time.perf_counter() - start, endpoint, method, status)
+            self.calls.observe(self.local.calls, endpoint)
+
+    def collect(self):
+        """Sum up the snapshots of all processes sharing the metrics (see share), including the current state of this process.
+
+        returns:
+            metrics -- new Metrics containing the sums
+            stats -- the summed statistics of the caches, None if they are not shared
+        """
+        self.flush()
+        merged = Metrics()
+        stats = None
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), 'r') as f:
+                    snapshot = json.load(f)
+            except FileNotFoundError:
+                continue
+            for metric in merged.metrics():
+                metric.merge(snapshot.get(metric.name, []))
+            if 'cache' in snapshot:
+                stats = {key: (stats or {}).get(key, 0) + value for key, value in snapshot['cache'].items()}
+        return merged, stats
+
+    def render(self, cache=None):
+        """Render all metrics in the text exposition format of Prometheus. If the metrics are shared, those of all processes are rendered (see share).
+
+        parameters:
+            cache -- optional Cache (see src.util.cache) whose statistics are included, unless the statistics of the caches are shared
+
+        returns:
+            text -- the metrics
+        """
+        metrics, stats = (self, None) if self.directory is None else self.collect()
+        if stats is None and cache is not None:
+            stats = cache.stats()
+        lines = []
+        for metric in metrics.metrics():
+            lines.extend(metric.render())
+        if stats is not None:
+            lookups = stats['hits'] + stats['misses']
+            lines.extend([
+                '# HELP cache_hits_total Number of cache lookups which found an entry', '# TYPE cache_hits_total counter', f'cache_hits_total {stats["hits"]}',
+                '# HELP cache_misses_total Number of cache lookups which found no entry', '# TYPE cache_misses_total counter', f'cache_misses_total {stats["misses"]}',
+                '# HELP cache_evictions_total Number of entries evicted because the cache was full', '# TYPE cache_evictions_total counter', f'cache_evictions_total {stats["evictions"]}',
+                '# HELP cache_entries Number of cached entries', '# TYPE cache_entries gauge', f'cache_entries {stats["size"]}',
+                '# HELP cache_hit_ratio Share of the cache lookups which found an entry', '# TYPE cache_hit_ratio gauge', f'cache_hit_ratio {stats["hits"] / lookups if lookups > 0 else 0}'
+            ])
+        return '\n'.join(lines) + '\n'
+
+metrics = Metrics()
+def getMetrics():
+    """Obtain the metrics of this process.
+
+    returns:
+        metrics -- the Metrics
+    """
+    return metrics
+
+def instrument(app):
+    """Measure the requests of a Flask application (see Metrics).
+
+    parameters:
+        app -- the Flask application
+    """
+    from flask import request
+
+    @app.before_request
+    def start_request():
+        metrics.start_request()
+
+    @app.after_request
+    def end_request(response):
+        rule = request.url_rule
+        metrics.end_request(rule.rule if rule is not None else 'unmatched', request.method, response.status_code)
+        return response
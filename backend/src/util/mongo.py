@@ -0,0 +1,160 @@
+# coding=utf-8
+import os
+import asyncio
+import threading
+
+import pymongo
+
+from src.util.settings import getSettings
+from src.util.metrics import getMetrics
+
+# process-wide registry of MongoDB clients, keyed by the URL they connect to
+clients = {}
+# registry of the asynchronous (motor) clients used by the ASGI application, keyed likewise
+async_clients = {}
+clients_pid = os.getpid()
+clients_lock = threading.Lock()
+
+# settings which configure the connection pool, mapped to the corresponding MongoClient options
+POOL_OPTIONS = {
+    'mongo_max_pool_size': 'maxPoolSize',
+    'mongo_min_pool_size': 'minPoolSize',
+    'mongo_max_idle_time_ms': 'maxIdleTimeMS',
+    'mongo_server_selection_timeout_ms': 'serverSelectionTimeoutMS',
+    'mongo_wait_queue_timeout_ms': 'waitQueueTimeoutMS'
+}
+
+def getMongoUrl():
+    """Return the URL of the MongoDB server (something like mongodb://localhost:27017)."""
+    return getSettings().mongo_url
+
+def getClientOptions():
+    """Collect the connection pool options of the MongoClient from the settings. Options which are not configured are omitted such that the pymongo defaults apply. If METRICS_ENABLED is set, the listeners of the metrics (see src.util.metrics) monitor the commands and the connection pool.
+
+    returns:
+        options -- dict of keyword arguments for pymongo.MongoClient
+    """
+    settings = getSettings()
+    options = {}
+    for setting, option in POOL_OPTIONS.items():
+        value = getattr(settings, setting)
+        if value is not None:
+            options[option] = value
+    if settings.metrics_enabled:
+        options['event_listeners'] = getMetrics().listeners()
+    return options
+
+def getClient(url: str = None):
+    """Obtain the MongoClient of this process. All data access objects share one client (and hence one connection pool and one set of monitoring threads) per URL. Clients are created lazily, so a process forked from a parent which already used a client creates its own client on first use instead of reusing the inherited connections.
+
+    parameters:
+        url -- the URL of the MongoDB server (defaults to the configured MONGO_URL)
+
+    returns:
+        client -- the shared pymongo.MongoClient
+    """
+    global clients_pid
+    if url is None:
+        url = getMongoUrl()
+
+    # fast path without locking for the common case of an existing client
+    if clients_pid == os.getpid() and url in clients:
+        return clients[url]
+
+    with clients_lock:
+        if clients_pid != os.getpid():
+            # the registry was inherited from the parent process: never use (or close) its clients
+            clients.clear()
+            async_clients.clear()
+            clients_pid = os.getpid()
+        if url not in clients:
+            clients[url] = pymongo.MongoClient(url, **getClientOptions())
+        return clients[url]
+
+def getDatabase(url: str = None):
+    """Obtain the database of the application (named by MONGO_DATABASE, edutask by default) from the shared client.
+
+    parameters:
+        url -- the URL of the MongoDB server (defaults to the configured MONGO_URL)
+
+    returns:
+        database -- pymongo database object
+    """
+    return getClient(url)[getSettings().mongo_database]
+
+def getAsyncClient(url: str = None):
+    """Obtain the asynchronous MongoClient (motor) of this process, which is shared by all asynchronous data access objects (see src.util.asyncdao) like getClient. A motor client is bound to the event loop in which it is first used, so it must only be used from the one event loop of the serving process. Motor is only imported on demand, such that the synchronous application does not depend on it.
+
+    parameters:
+        url -- the URL of the MongoDB server (defaults to the configured MONGO_URL)
+
+    returns:
+        client -- the shared motor.motor_asyncio.AsyncIOMotorClient
+    """
+    from motor.motor_asyncio import AsyncIOMotorClient
+    global clients_pid
+    if url is None:
+        url = getMongoUrl()
+
+    if clients_pid == os.getpid() and url in async_clients:
+        return async_clients[url]
+
+    with clients_lock:
+        if clients_pid != os.getpid():
+            clients.clear()
+            async_clients.clear()
+            clients_pid = os.getpid()
+        if url not in async_clients:
+            async_clients[url] = AsyncIOMotorClient(url, **getClientOptions())
+        return async_clients[url]
+
+def getAsyncDatabase(url: str = None):
+    """Obtain the database of the application from the shared asynchronous client (see getDatabase).
+
+    parameters:
+        url -- the URL of the MongoDB server (defaults to the configured MONGO_URL)
+
+    returns:
+        database -- motor database object
+    """
+    return getAsyncClient(url)[getSettings().mongo_database]
+
+def pingDatabase():
+    """Check that the MongoDB server can be reached with a connection of the shared pool within READY_TIMEOUT_MS (including the server selection and the wait for a free connection), e.g., for a readiness probe.
+
+    raises:
+        PyMongoError -- in case the server cannot be reached in time
+    """
+    with pymongo.timeout(getSettings().ready_timeout_ms / 1000):
+        getClient().admin.command('ping')
+
+async def pingDatabaseAsync():
+    """Check that the MongoDB server can be reached with the shared asynchronous client within READY_TIMEOUT_MS (see pingDatabase).
+
+    raises:
+        PyMongoError -- in case the server cannot be reached
+        TimeoutError -- in case the server does not answer in time
+    """
+    await asyncio.wait_for(getAsyncClient().admin.command('ping'), getSettings().ready_timeout_ms / 1000)
+
+def closeClients():
+    """Close all clients of this process and remove them from the registry, such that the next call of getClient connects anew. Use this at shutdown and between tests."""
+    global clients_pid
+    with clients_lock:
+        if clients_pid == os.getpid():
+            for client in list(clients.values()) + list(async_clients.values()):
+                client.close()
+        clients.clear()
+        async_clients.clear()
+        clients_pid = os.getpid()
+
+def _forget_clients():
+    # the child of a fork must not touch the connections of its parent, and the lock may have been held by another thread during the fork
+    global clients_pid, clients_lock
+    clients_lock = threading.Lock()
+    clients.clear()
+    async_clients.clear()
+    clients_pid = os.getpid()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_clients)
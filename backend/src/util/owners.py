@@ -0,0 +1,48 @@
+# coding=utf-8
+# set the owner of tasks created before the tasks referred to their users, run from the backend folder with
+#   python -m src.util.owners [--batch-size 500]
+import argparse
+
+from pymongo import UpdateMany
+
+from src.util.daos import getDao
+
+def backfillOwners(batch_size: int = 500):
+    """Set the owner of each task without one to the user whose tasks array contains the task. The users are read in batches of their ids and the tasks of each batch are updated with one bulk write. Tasks which have an owner already are not touched, so the backfill can be run again to resume after an interruption, or while the server keeps creating tasks.
+
+    parameters:
+        batch_size -- number of users whose tasks are updated with one bulk write
+
+    returns:
+        counts -- dict containing the number of updated tasks (key task) and of tasks which are still without an owner, since no user contains them (key orphaned)
+
+    raises:
+        Exception -- in case any database operation fails
+    """
+    users_dao, tasks_dao = getDao(collection_name='user'), getDao(collection_name='task')
+    counts = {'task': 0, 'orphaned': 0}
+    last = None
+    while True:
+        match = {'tasks.0': {'$exists': True}}
+        if last is not None:
+            match['_id'] = {'$gt': last}
+        users = list(users_dao.collection.find(match, {'tasks': 1}).sort('_id', 1).limit(batch_size))
+        if len(users) == 0:
+            break
+
+        updates = [UpdateMany({'_id': {'$in': user['tasks']}, 'owner': {'$exists': False}}, {'$set': {'owner': user['_id']}}) for user in users]
+        counts['task'] += tasks_dao.collection.bulk_write(updates, ordered=False).modified_count
+        last = users[-1]['_id']
+
+    counts['orphaned'] = tasks_dao.collection.count_documents({'owner': {'$exists': False}})
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description='Set the owner of the tasks which do not have one yet')
+    parser.add_argument('--batch-size', type=int, default=500, help='number of users whose tasks are updated per bulk write')
+    args = parser.parse_args()
+
+    print(backfillOwners(args.batch_size))
+
+if __name__ == '__main__':
+    main()
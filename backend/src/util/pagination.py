@@ -0,0 +1,76 @@
+# coding=utf-8
+import base64
+import binascii
+
+from bson.objectid import ObjectId
+
+from src.util.settings import getSettings
+
+def encodeCursor(id):
+    """Encode the _id of the last object of a page into an opaque token, which allows to request the next page.
+
+    parameters:
+        id -- the ObjectId (or its json form {'$oid': ...})
+
+    returns:
+        token -- url-safe string
+    """
+    if isinstance(id, dict):
+        id = ObjectId(id['$oid'])
+    return base64.urlsafe_b64encode(id.binary).decode('ascii').rstrip('=')
+
+def decodeCursor(token: str):
+    """Decode a token created by encodeCursor.
+
+    parameters:
+        token -- the token
+
+    returns:
+        id -- the ObjectId of the last object of the previous page
+
+    raises:
+        ValueError -- in case the token is not valid
+    """
+    try:
+        binary = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+    except (binascii.Error, ValueError):
+        raise ValueError(f'Error: invalid page token {token}')
+    if len(binary) != 12:
+        raise ValueError(f'Error: invalid page token {token}')
+    return ObjectId(binary)
+
+def getPageArgs(args):
+    """Read the pagination parameters of a request: limit (the page size, bounded by PAGE_MAX_LIMIT) and next (the token of the previous page).
+
+    parameters:
+        args -- the query arguments of the request
+
+    returns:
+        limit -- the page size, or None if the request is not paginated
+        after -- the token of the previous page, or None for the first page
+
+    raises:
+        ValueError -- in case the limit is not a positive integer
+    """
+    if 'limit' not in args:
+        return None, None
+    try:
+        limit = int(args['limit'])
+    except ValueError:
+        raise ValueError('Error: the limit must be an integer')
+    if limit <= 0:
+        raise ValueError('Error: the limit must be positive')
+    return min(limit, getSettings().page_max_limit), args.get('next')
+
+def getProjection(args):
+    """Read the fields parameter of a request, a comma-separated list of the fields to return (the _id is always returned).
+
+    parameters:
+        args -- the query arguments of the request
+
+    returns:
+        projection -- dict to include the requested fields, or None to return all fields
+    """
+    if not args.get('fields'):
+        return None
+    return {field.strip(): 1 for field in args['fields'].split(',') if field.strip() != ''}
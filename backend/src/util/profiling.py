@@ -0,0 +1,169 @@
+# coding=utf-8
+import os
+import re
+import sys
+import hmac
+import time
+import zlib
+import threading
+from collections import Counter
+
+from src.util.settings import getSettings
+
+# header which requests profiling, its value must be one of the PROFILE_TOKENS. Tokens are not accepted in the query, which ends up in access logs
+PROFILE_HEADER = 'X-Profile'
+
+# geometry of the flamegraph in pixels
+FRAME_HEIGHT = 16
+GRAPH_WIDTH = 1200
+CHARACTER_WIDTH = 7
+
+class Sampler(threading.Thread):
+    def __init__(self, thread_id: int, interval: float):
+        """A background thread which samples the stack of another thread in regular intervals until it is stopped. Only the stack of the sampled thread is recorded, but each sample holds the GIL while it captures the frames of all threads, which delays the other requests served by the same process by a few microseconds per sample (more with many threads or deep stacks), hence the interval should not be much shorter than the default PROFILE_INTERVAL_MS.
+
+        parameters:
+            thread_id -- identifier of the thread to sample (see threading.get_ident)
+            interval -- seconds between two samples
+        """
+        super().__init__(name='profiler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[stackOf(frame)] += 1
+
+    def stop(self):
+        """Stop sampling and wait for the sampler to finish.
+
+        returns:
+            stacks -- Counter of the sampled stacks (frames separated by semicolons, outermost first)
+        """
+        self.stopped.set()
+        self.join()
+        return self.stacks
+
+def stackOf(frame):
+    """Describe the stack of a frame as its functions (with file and line), outermost first and separated by semicolons."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+def collapse(stacks: Counter):
+    """Format sampled stacks in the collapsed format of flamegraph tools, one line of stack and count per distinct stack."""
+    return ''.join(f'{stack} {count}\n' for stack, count in sorted(stacks.items()))
+
+def escape(text: str):
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')
+
+def flamegraph(stacks: Counter, title: str = ''):
+    """Render sampled stacks as a flamegraph: each function is a box as wide as the share of samples it appears in, stacked upon its caller.
+
+    parameters:
+        stacks -- Counter of the sampled stacks (see Sampler.stop)
+        title -- title of the graph
+
+    returns:
+        svg -- the flamegraph as SVG document
+    """
+    # merge the stacks into a tree of [samples, children by function]
+    root = [0, {}]
+    for stack, count in stacks.items():
+        root[0] += count
+        node = root
+        for name in stack.split(';'):
+            node = node[1].setdefault(name, [0, {}])
+            node[0] += count
+
+    def depthOf(node):
+        return 1 + max([depthOf(child) for child in node[1].values()], default=0)
+
+    total = max(root[0], 1)
+    height = (depthOf(root) + 2) * FRAME_HEIGHT
+    boxes = []
+
+    def layout(name, node, x, depth):
+        width = node[0] / total * GRAPH_WIDTH
+        y = height - (depth + 1) * FRAME_HEIGHT
+        color = zlib.crc32(name.encode())
+        label = name if len(name) * CHARACTER_WIDTH < width - 4 else name[:max(int((width - 4) / CHARACTER_WIDTH) - 2, 0)] + '..'
+        boxes.append(
+            f'<g><title>{escape(name)} ({node[0]} samples, {node[0] / total:.1%})</title>'
+            f'<rect x="{x:.1f}" y="{y}" width="{width:.1f}" height="{FRAME_HEIGHT - 1}" fill="rgb({205 + color % 50},{(color >> 8) % 180},{(color >> 16) % 55})"/>'
+            f'<text x="{x + 2:.1f}" y="{y + FRAME_HEIGHT - 4}">{escape(label) if width > 3 * CHARACTER_WIDTH else ""}</text></g>'
+        )
+        for childname, child in sorted(node[1].items()):
+            layout(childname, child, x, depth + 1)
+            x += child[0] / total * GRAPH_WIDTH
+
+    layout('all', root, 0, 0)
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{GRAPH_WIDTH}" height="{height}" font-family="monospace" font-size="11">'
+        f'<text x="{GRAPH_WIDTH / 2}" y="{FRAME_HEIGHT - 2}" text-anchor="middle" font-size="13">{escape(title)} ({root[0]} samples)</text>'
+        + ''.join(boxes) + '</svg>\n'
+    )
+
+def isAuthorized(token: str):
+    """Check whether a token is one of the comma-separated PROFILE_TOKENS, comparing in constant time."""
+    if not token:
+        return False
+    tokens = [allowed.strip() for allowed in (getSettings().profile_tokens or '').split(',')]
+    return any(allowed and hmac.compare_digest(token.encode(), allowed.encode()) for allowed in tokens)
+
+def writeProfile(stacks: Counter, title: str):
+    """Write sampled stacks to PROFILE_DIR as collapsed stacks (.collapsed) and as flamegraph (.svg). The file names contain the process, so the workers of the production server do not overwrite each other's profiles.
+
+    parameters:
+        stacks -- Counter of the sampled stacks (see Sampler.stop)
+        title -- description of the profiled request
+
+    returns:
+        name -- the file name of the flamegraph within PROFILE_DIR
+    """
+    directory = getSettings().profile_dir
+    os.makedirs(directory, exist_ok=True)
+    name = f'{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}-{threading.get_ident()}-{re.sub("[^A-Za-z0-9]+", "_", title).strip("_")}'
+    with open(os.path.join(directory, name + '.collapsed'), 'w') as f:
+        f.write(collapse(stacks))
+    with open(os.path.join(directory, name + '.svg'), 'w') as f:
+        f.write(flamegraph(stacks, title))
+    return name + '.svg'
+
+def enableProfiling(app):
+    """Let a Flask application profile single requests on demand. A request carrying one of the PROFILE_TOKENS in the X-Profile header is sampled every PROFILE_INTERVAL_MS while it is served, and the resulting flamegraph is named by the X-Profile header of the response (see writeProfile). Requests without a valid token are served as usual.
+
+    parameters:
+        app -- the Flask application
+    """
+    from flask import g, request
+
+    @app.before_request
+    def start_profile():
+        if isAuthorized(request.headers.get(PROFILE_HEADER)):
+            g.sampler = Sampler(threading.get_ident(), getSettings().profile_interval_ms / 1000)
+            g.sampler.start()
+
+    @app.after_request
+    def end_profile(response):
+        sampler = g.pop('sampler', None)
+        if sampler is not None:
+            try:
+                response.headers[PROFILE_HEADER] = writeProfile(sampler.stop(), f'{request.method} {request.path}')
+            except OSError as e:
+                print(f'Error: could not write the profile: {e}')
+        return response
+
+    @app.teardown_request
+    def stop_profile(exception=None):
+        # stop the sampler if the request failed before its response was created
+        sampler = g.pop('sampler', None)
+        if sampler is not None:
+            sampler.stop()
@@ -0,0 +1,245 @@
+# coding=utf-8
+import argparse
+import json
+import math
+import os
+import random
+import secrets
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+from bson.objectid import ObjectId
+
+from src.util.daos import getDao
+from src.util.controllers import isEmbedded
+from src.util.settings import getSettings
+
+COLLECTIONS = ['user', 'task', 'video', 'todo']
+
+# the dummy data, independent of the working directory
+DUMMY_DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static', 'data', 'dummy.json')
+
+# additional names to combine with the ones of the dummy data, such that generated users are not all called Jane Doe
+FIRST_NAMES = ['Alex', 'Sam', 'Kim', 'Robin', 'Noa', 'Mika', 'Jordan', 'Charlie', 'Ali', 'Eli']
+LAST_NAMES = ['Smith', 'Berg', 'Okafor', 'Nguyen', 'Garcia', 'Kowalski', 'Tanaka', 'Silva', 'Lind', 'Haddad']
+
+class DataModel:
+    def __init__(self, dummydata: list):
+        """Derive the vocabulary and the distributions of synthetic data from the dummy data of the application (see src/static/data/dummy.json).
+
+        parameters:
+            dummydata -- list of users in the format of the dummy data
+        """
+        self.first_names = sorted({user['firstName'] for user in dummydata} | set(FIRST_NAMES))
+        self.last_names = sorted({user['lastName'] for user in dummydata} | set(LAST_NAMES))
+        self.domains = sorted({user['email'].split('@')[1] for user in dummydata})
+        self.tasks = [task for user in dummydata for task in user['tasks']]
+        self.todos = [todo for task in self.tasks for todo in task['todos']]
+
+        # empirical distributions of the number of tasks per user and todos per task
+        self.tasks_per_user = [len(user['tasks']) for user in dummydata]
+        self.todos_per_task = [len(task['todos']) for task in self.tasks]
+
+    def sample(self, rng: random.Random, distribution: list, mean: float):
+        """Draw a count from an empirical distribution, scaled such that its expected value equals the given mean.
+
+        parameters:
+            rng -- random number generator
+            distribution -- list of observed counts
+            mean -- the expected value of the drawn counts
+
+        returns:
+            n -- non-negative integer count
+        """
+        observed_mean = sum(distribution) / len(distribution)
+        if observed_mean == 0:
+            return round(mean)
+        return max(0, round(rng.choice(distribution) * mean / observed_mean))
+
+def loadDataModel(filename: str = DUMMY_DATA):
+    """Create a data model from the dummy data file.
+
+    parameters:
+        filename -- path to a json file in the format of the dummy data
+
+    returns:
+        model -- DataModel
+    """
+    with open(filename, 'r') as f:
+        return DataModel(json.load(f))
+
+def generate(model: DataModel, rng: random.Random, index: int, tasks_per_user: float, todos_per_task: float, run: str = '', embedded: bool = False):
+    """Generate the documents of one synthetic user including its tasks, videos and todos. All references are set via ObjectIds which are assigned upfront. If the tasks embed their videos and todos, there are no separate video and todo documents.
+
+    parameters:
+        model -- the DataModel to draw the values from
+        rng -- random number generator
+        index -- running number of the user, which makes its email address unique within a run
+        tasks_per_user -- mean number of tasks per user
+        todos_per_task -- mean number of todos per task
+        run -- token of the seeding run, which makes the email addresses unique across runs
+        embedded -- whether the tasks embed their videos and todos (see TASK_STORAGE)
+
+    returns:
+        documents -- dict mapping each collection name to the list of generated documents
+    """
+    documents = {collection: [] for collection in COLLECTIONS}
+    first_name = rng.choice(model.first_names)
+    last_name = rng.choice(model.last_names)
+    user = {
+        '_id': ObjectId(),
+        'firstName': first_name,
+        'lastName': last_name,
+        'email': f'{first_name}.{last_name}.{run}{index}@{rng.choice(model.domains)}'.lower(),
+        'tasks': []
+    }
+
+    for t in range(model.sample(rng, model.tasks_per_user, tasks_per_user)):
+        template = rng.choice(model.tasks)
+        video = {'_id': ObjectId(), 'url': template['url']}
+        todos = [
+            {'_id': ObjectId(), 'description': rng.choice(model.todos), 'done': rng.random() < 0.3}
+            for _ in range(model.sample(rng, model.todos_per_task, todos_per_task))
+        ]
+        task = {
+            '_id': ObjectId(),
+            'title': f'{template["title"]} {t + 1}',
+            'description': template['description'],
+            'startdate': datetime.today() - timedelta(days=rng.randint(0, 365)),
+            'categories': [],
+            'owner': user['_id'],
+            'total': len(todos),
+            'done': len([todo for todo in todos if todo['done']])
+        }
+        if rng.random() < 0.5:
+            task['duedate'] = task['startdate'] + timedelta(days=rng.randint(1, 60))
+
+        if embedded:
+            task['video'] = video
+            task['todos'] = todos
+        else:
+            task['video'] = video['_id']
+            task['todos'] = [todo['_id'] for todo in todos]
+            documents['video'].append(video)
+            documents['todo'].extend(todos)
+
+        user['tasks'].append(task['_id'])
+        documents['task'].append(task)
+    documents['user'].append(user)
+    return documents
+
+def seedRange(start: int, count: int, tasks_per_user: float, todos_per_task: float, batch_size: int = 500, seed: int = None, run: str = ''):
+    """Generate and insert the users with the running numbers start to start+count-1. The documents of batch_size users at a time are written with one unordered bulk insert per collection.
+
+    parameters:
+        start -- running number of the first user
+        count -- number of users to generate
+        tasks_per_user -- mean number of tasks per user
+        todos_per_task -- mean number of todos per task
+        batch_size -- number of users whose documents are inserted together
+        seed -- seed of the random number generator (None for a random seed)
+        run -- token of the seeding run (see generate)
+
+    returns:
+        counts -- dict mapping each collection name to the number of inserted documents
+    """
+    model = loadDataModel()
+    rng = random.Random(None if seed is None else seed + start)
+    daos = {collection: getDao(collection_name=collection) for collection in COLLECTIONS}
+    embedded = isEmbedded()
+    counts = {collection: 0 for collection in COLLECTIONS}
+
+    for batch_start in range(start, start + count, batch_size):
+        batch = {collection: [] for collection in COLLECTIONS}
+        for index in range(batch_start, min(batch_start + batch_size, start + count)):
+            for collection, documents in generate(model, rng, index, tasks_per_user, todos_per_task, run, embedded).items():
+                batch[collection].extend(documents)
+
+        # insert the referenced objects first, such that no reference ever dangles
+        for collection in ['video', 'todo', 'task', 'user']:
+            counts[collection] += daos[collection].create_bulk(batch[collection], ordered=False)
+    return counts
+
+def seedDatabase(users: int, tasks_per_user: float, todos_per_task: float, batch_size: int = 500, workers: int = 1, seed: int = None):
+    """Populate the database with synthetic users, tasks, videos and todos. The tasks refer to or embed their videos and todos according to TASK_STORAGE. With more than one worker, the users are split into equal ranges which are generated and inserted by a pool of processes.
+
+    parameters:
+        users -- number of users to generate
+        tasks_per_user -- mean number of tasks per user
+        todos_per_task -- mean number of todos per task
+        batch_size -- number of users whose documents are inserted together
+        workers -- number of processes
+        seed -- seed of the random number generator (None for a random seed)
+
+    returns:
+        counts -- dict mapping each collection name to the number of inserted documents
+    """
+    # create missing collections (with their validators) once, before the workers race to do so
+    for collection in COLLECTIONS:
+        getDao(collection_name=collection).ensure_collection()
+
+    # the email addresses of each run carry a random token, such that repeated seeding never reuses one (even after users were deleted)
+    run = f'{secrets.token_hex(4)}.'
+
+    if workers <= 1:
+        return seedRange(0, users, tasks_per_user, todos_per_task, batch_size, seed, run)
+
+    chunk = -(-users // workers)
+    ranges = [(start, min(chunk, users - start)) for start in range(0, users, chunk)]
+    counts = {collection: 0 for collection in COLLECTIONS}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(seedRange, start, count, tasks_per_user, todos_per_task, batch_size, seed, run) for start, count in ranges]
+        for future in futures:
+            for collection, n in future.result().items():
+                counts[collection] += n
+    return counts
+
+def getSeedArgs(values, model: DataModel):
+    """Read the parameters of synthetic seeding from the form data of POST /populate: users (at most SEED_MAX_USERS), tasks and todos (the mean numbers per user and per task, by default those of the dummy data), batchsize and workers (at most SEED_MAX_WORKERS).
+
+    parameters:
+        values -- the form data of the request
+        model -- the DataModel providing the default means
+
+    returns:
+        arguments -- dict of the keyword arguments of seedDatabase
+
+    raises:
+        ValueError -- in case a parameter is not a number or out of range
+    """
+    settings = getSettings()
+    arguments = {}
+    for name, key, kind, default, minimum, maximum in [
+        ('users', 'users', int, None, 1, settings.seed_max_users),
+        ('tasks_per_user', 'tasks', float, sum(model.tasks_per_user) / len(model.tasks_per_user), 0, None),
+        ('todos_per_task', 'todos', float, sum(model.todos_per_task) / len(model.todos_per_task), 0, None),
+        ('batch_size', 'batchsize', int, 500, 1, None),
+        ('workers', 'workers', int, 1, 1, settings.seed_max_workers)
+    ]:
+        try:
+            value = kind(values[key]) if key in values else default
+        except ValueError:
+            raise ValueError(f'Error: {key} must be a number')
+        if not math.isfinite(value) or value < minimum or (maximum is not None and value > maximum):
+            raise ValueError(f'Error: {key} must be between {minimum} and {maximum}' if maximum is not None else f'Error: {key} must be at least {minimum}')
+        arguments[name] = value
+    return arguments
+
+def main():
+    model = loadDataModel()
+    parser = argparse.ArgumentParser(description='Populate the database with synthetic data modeled on the dummy data')
+    parser.add_argument('--users', type=int, required=True, help='number of users to generate')
+    parser.add_argument('--tasks', type=float, default=sum(model.tasks_per_user) / len(model.tasks_per_user), help='mean number of tasks per user')
+    parser.add_argument('--todos', type=float, default=sum(model.todos_per_task) / len(model.todos_per_task), help='mean number of todos per task')
+    parser.add_argument('--batch-size', type=int, default=500, help='number of users inserted per bulk insert')
+    parser.add_argument('--workers', type=int, default=1, help='number of processes')
+    parser.add_argument('--seed', type=int, default=None, help='seed of the random number generator')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = seedDatabase(args.users, args.tasks, args.todos, args.batch_size, args.workers, args.seed)
+    print(f'Inserted {counts} in {time.perf_counter() - start:.1f}s')
+
+if __name__ == '__main__':
+    main()
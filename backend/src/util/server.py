@@ -0,0 +1,24 @@
+# coding=utf-8
+import os
+
+def serve(app, config: str = None):
+    """Serve a WSGI application with the production server (gunicorn) configured in gunicorn.conf.py: several worker processes with several threads each, keep-alive connections, and a graceful shutdown upon SIGTERM that drains the requests in progress.
+
+    parameters:
+        app -- the WSGI (e.g., Flask) application
+        config -- path of the gunicorn configuration file (defaults to gunicorn.conf.py next to main.py)
+    """
+    from gunicorn.app.base import Application
+
+    if config is None:
+        config = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'gunicorn.conf.py')
+
+    class Server(Application):
+        def load_config(self):
+            # only the configuration file applies, not the command line arguments of the calling script
+            self.load_config_from_file(config)
+
+        def load(self):
+            return app
+
+    Server().run()
@@ -0,0 +1,121 @@
+# coding=utf-8
+import os
+import multiprocessing
+import typing
+from dataclasses import dataclass, field, fields
+
+from dotenv import dotenv_values
+
+# the backend folder, which contains the .env file (independent of the working directory)
+BACKEND = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@dataclass(frozen=True)
+class Settings:
+    """The configuration of the server. Each field is set by the environment variable of the same name in upper case (e.g., mongo_url by MONGO_URL), which takes precedence over the .env file, and falls back to its default otherwise."""
+    version: str = None
+
+    # MongoDB (see src.util.mongo), the pool options are omitted if not set such that the pymongo defaults apply
+    mongo_url: str = 'mongodb://localhost:27017'
+    mongo_database: str = 'edutask'
+    mongo_max_pool_size: int = None
+    mongo_min_pool_size: int = None
+    mongo_max_idle_time_ms: int = None
+    mongo_server_selection_timeout_ms: int = None
+    mongo_wait_queue_timeout_ms: int = None
+
+    # cache of the controllers (see src.util.cache), disabled by default since it is only invalidated within its process.
+    # The time to live per collection defaults to cache_ttl
+    cache_maxsize: int = 0
+    cache_ttl: float = 30
+    cache_ttl_user: float = None
+    cache_ttl_task: float = None
+    cache_ttl_todo: float = None
+
+    # layout of the tasks: referenced (videos and todos in their own collections) or embedded (see src.util.storage)
+    task_storage: str = 'referenced'
+
+    # lists (see src.util.pagination and src.util.streaming)
+    page_max_limit: int = 1000
+    stream_batch_size: int = 500
+    # maximum number of ids per batch request (see src.util.batch)
+    batch_max_ids: int = 100
+    # maximum number of synthetic users and of processes per seeding request (see src.util.seeding)
+    seed_max_users: int = 100000
+    seed_max_workers: int = 4
+
+    # server (see main.py and gunicorn.conf.py)
+    server: str = 'development'
+    flask_bind_ip: str = '0.0.0.0'
+    port: int = 5000
+    server_workers: int = field(default_factory=lambda: multiprocessing.cpu_count() * 2 + 1)
+    server_threads: int = 4
+    server_keepalive: int = 5
+    server_timeout: int = 30
+    server_graceful_timeout: int = 30
+    server_max_requests: int = 0
+    server_preload: bool = True
+    server_access_log: str = None
+
+    # time the readiness probe waits for MongoDB
+    ready_timeout_ms: int = 1000
+
+    # instrumentation of the requests and the MongoDB clients (see src.util.metrics), and the directory via which the workers of the
+    # production server share their metrics (a temporary directory by default)
+    metrics_enabled: bool = False
+    metrics_dir: str = None
+
+    # profiling of single requests (see src.util.profiling), which is disabled unless both the directory and the tokens are set
+    profile_dir: str = None
+    profile_tokens: str = None
+    profile_interval_ms: float = 10
+
+def parse(value: str, kind):
+    """Convert the string value of a variable to the type of a settings field."""
+    if kind is bool:
+        if value.lower() in ['true', '1', 'yes']:
+            return True
+        if value.lower() in ['false', '0', 'no']:
+            return False
+        raise ValueError(f'{value} is not a boolean')
+    return kind(value)
+
+def loadSettings(environ: dict = None, dotenv: str = None):
+    """Build the settings from the environment and the .env file.
+
+    parameters:
+        environ -- the environment variables (os.environ by default)
+        dotenv -- path of the .env file (the one in the backend folder by default)
+
+    returns:
+        settings -- the Settings
+
+    raises:
+        ValueError -- in case a variable cannot be converted to the type of its field
+    """
+    values = dict(dotenv_values(dotenv or os.path.join(BACKEND, '.env')))
+    values.update(os.environ if environ is None else environ)
+
+    kinds = typing.get_type_hints(Settings)
+    arguments = {}
+    for setting in fields(Settings):
+        value = values.get(setting.name.upper())
+        # unset and empty variables leave the default
+        if value is None or value == '':
+            continue
+        try:
+            arguments[setting.name] = parse(value, kinds[setting.name])
+        except ValueError:
+            raise ValueError(f'Error: invalid value {value} of {setting.name.upper()}')
+    return Settings(**arguments)
+
+settings = None
+def getSettings():
+    """Obtain the settings of this process, which are loaded once on first use.
+
+    returns:
+        settings -- the Settings
+    """
+    global settings
+    if settings is None:
+        settings = loadSettings()
+    return settings
@@ -0,0 +1,134 @@
+# coding=utf-8
+# convert the tasks between the storage layouts (see TASK_STORAGE), run from the backend folder with
+#   python -m src.util.storage --to embedded|referenced [--batch-size 500]
+import argparse
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from src.util.daos import getDao
+
+# error code of MongoDB for a duplicate key
+DUPLICATE_KEY = 11000
+
+def unchanged(task: dict):
+    """Return the filter of a task whose video and todos are still the read ones, such that a task changed in the meantime is not converted."""
+    return {
+        '_id': task['_id'],
+        'video': task.get('video'),
+        'todos': task['todos'] if 'todos' in task else {'$exists': False}
+    }
+
+def embedTasks(batch_size: int = 500):
+    """Convert referencing tasks into tasks which embed their video and todos: each task receives copies of its video and todos (in the order of its references), after which the videos and todos are removed from their collections. Tasks which are embedding already are skipped, so an interrupted migration can be resumed by running it again.
+
+    parameters:
+        batch_size -- number of tasks converted with one bulk write
+
+    returns:
+        counts -- dict containing the number of converted tasks and of embedded videos and todos (keys task, video and todo)
+
+    raises:
+        Exception -- in case any database operation fails
+    """
+    tasks_dao, videos_dao, todos_dao = getDao(collection_name='task'), getDao(collection_name='video'), getDao(collection_name='todo')
+    counts = {'task': 0, 'video': 0, 'todo': 0}
+    last = None
+    referencing = {'$or': [{'video': {'$type': 'objectId'}}, {'todos': {'$type': 'objectId'}}]}
+    while True:
+        match = referencing
+        if last is not None:
+            match = {'$and': [match, {'_id': {'$gt': last}}]}
+        tasks = list(tasks_dao.collection.aggregate([
+            {'$match': match},
+            {'$sort': {'_id': 1}},
+            {'$limit': batch_size},
+            {'$project': {'video': 1, 'todos': 1}},
+            {'$lookup': {'from': videos_dao.collection_name, 'localField': 'video', 'foreignField': '_id', 'as': 'videos'}},
+            {'$lookup': {'from': todos_dao.collection_name, 'localField': 'todos', 'foreignField': '_id', 'as': 'tododocuments'}}
+        ]))
+        if len(tasks) == 0:
+            return counts
+
+        updates = []
+        for task in tasks:
+            update = {'$set': {}}
+            todos = {todo['_id']: todo for todo in task['tododocuments']}
+            # references to missing todos are dropped
+            update['$set']['todos'] = [todos[todoid] for todoid in task.get('todos', []) if todoid in todos]
+            if len(task['videos']) > 0:
+                update['$set']['video'] = task['videos'][0]
+            else:
+                update['$unset'] = {'video': ''}
+            updates.append(UpdateOne(unchanged(task), update))
+        result = tasks_dao.collection.bulk_write(updates, ordered=False)
+
+        # the videos and todos of tasks which were changed in the meantime (and are left for the next run) are kept
+        changed = {task['_id'] for task in tasks_dao.collection.find({'$and': [referencing, {'_id': {'$in': [task['_id'] for task in tasks]}}]}, {'_id': 1})}
+        videoids = [video['_id'] for task in tasks if task['_id'] not in changed for video in task['videos']]
+        todoids = [todo['_id'] for task in tasks if task['_id'] not in changed for todo in task['tododocuments']]
+        videos_dao.collection.delete_many({'_id': {'$in': videoids}})
+        todos_dao.collection.delete_many({'_id': {'$in': todoids}})
+        counts['task'] += result.modified_count
+        counts['video'] += len(videoids)
+        counts['todo'] += len(todoids)
+        last = tasks[-1]['_id']
+
+def referenceTasks(batch_size: int = 500):
+    """Convert embedding tasks back into tasks which reference their video and todos: the embedded video and todos are inserted into their collections with their ids, after which the tasks are set to reference them. Tasks which are referencing already are skipped, and objects inserted before an interruption are not inserted twice, so an interrupted migration can be resumed by running it again.
+
+    parameters:
+        batch_size -- number of tasks converted with one bulk write
+
+    returns:
+        counts -- dict containing the number of converted tasks and of extracted videos and todos (keys task, video and todo)
+
+    raises:
+        Exception -- in case any database operation fails
+    """
+    tasks_dao, videos_dao, todos_dao = getDao(collection_name='task'), getDao(collection_name='video'), getDao(collection_name='todo')
+    counts = {'task': 0, 'video': 0, 'todo': 0}
+    last = None
+    while True:
+        match = {'$or': [{'video': {'$type': 'object'}}, {'todos': {'$type': 'object'}}]}
+        if last is not None:
+            match = {'$and': [match, {'_id': {'$gt': last}}]}
+        tasks = list(tasks_dao.collection.find(match, {'video': 1, 'todos': 1}).sort('_id', 1).limit(batch_size))
+        if len(tasks) == 0:
+            return counts
+
+        videos = [task['video'] for task in tasks if isinstance(task.get('video'), dict)]
+        todos = [todo for task in tasks for todo in task.get('todos', []) if isinstance(todo, dict)]
+        for dao, documents in [(videos_dao, videos), (todos_dao, todos)]:
+            if len(documents) > 0:
+                try:
+                    dao.collection.insert_many(documents, ordered=False)
+                except BulkWriteError as e:
+                    if any(error['code'] != DUPLICATE_KEY for error in e.details['writeErrors']):
+                        raise
+
+        updates = []
+        for task in tasks:
+            update = {'$set': {'todos': [todo['_id'] if isinstance(todo, dict) else todo for todo in task.get('todos', [])]}}
+            if isinstance(task.get('video'), dict):
+                update['$set']['video'] = task['video']['_id']
+            updates.append(UpdateOne(unchanged(task), update))
+        result = tasks_dao.collection.bulk_write(updates, ordered=False)
+
+        counts['task'] += result.modified_count
+        counts['video'] += len(videos)
+        counts['todo'] += len(todos)
+        last = tasks[-1]['_id']
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert the tasks between the referenced and the embedded storage layout')
+    parser.add_argument('--to', required=True, choices=['embedded', 'referenced'], help='the layout to convert the tasks to')
+    parser.add_argument('--batch-size', type=int, default=500, help='number of tasks converted per bulk write')
+    args = parser.parse_args()
+
+    counts = embedTasks(args.batch_size) if args.to == 'embedded' else referenceTasks(args.batch_size)
+    print(counts)
+    print(f'Set TASK_STORAGE={args.to} and restart the server')
+
+if __name__ == '__main__':
+    main()
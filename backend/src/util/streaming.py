@@ -0,0 +1,137 @@
+# coding=utf-8
+from flask import Response, current_app, stream_with_context
+
+from src.util.settings import getSettings
+
+FORMATS = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson'
+}
+
+# number of characters collected before they are sent, which saves writes to the socket without growing the memory usage
+CHUNK_SIZE = 65536
+
+def getStreamArgs(args, key: str = 'stream'):
+    """Read the streaming parameters of a request: the output format (json or ndjson) and batch_size, the number of objects fetched from the database per round trip (STREAM_BATCH_SIZE by default).
+
+    parameters:
+        args -- the query arguments of the request
+        key -- name of the argument which selects the format
+
+    returns:
+        format -- json or ndjson, or None if the argument is not given
+        batch_size -- number of objects per database round trip
+
+    raises:
+        ValueError -- in case the format or batch size is not valid
+    """
+    format = args.get(key)
+    if format is not None and format not in FORMATS:
+        raise ValueError(f'Error: unknown format {format}, use one of {", ".join(FORMATS)}')
+    try:
+        batch_size = int(args.get('batch_size', getSettings().stream_batch_size))
+    except ValueError:
+        raise ValueError('Error: the batch_size must be an integer')
+    if batch_size <= 0:
+        raise ValueError('Error: the batch_size must be positive')
+    return format, batch_size
+
+class Encoder:
+    def __init__(self, format: str, dumps):
+        """Incremental encoder of json objects, either as one json array or as newline-delimited json (one object per line). Encoded objects are collected until CHUNK_SIZE characters are reached.
+
+        parameters:
+            format -- json or ndjson
+            dumps -- function encoding one json object to a string
+        """
+        self.format = format
+        self.dumps = dumps
+        self.separator = ''
+        self.chunk = []
+        self.size = 0
+
+    def open(self):
+        """Return the beginning of the output, which is sent right away such that the first byte does not wait for the first batch."""
+        return '[' if self.format == 'json' else ''
+
+    def add(self, obj):
+        """Encode one object and return the collected chunk if it is complete (None otherwise)."""
+        if self.format == 'json':
+            part = self.separator + self.dumps(obj)
+            self.separator = ','
+        else:
+            part = self.dumps(obj) + '\n'
+        self.chunk.append(part)
+        self.size += len(part)
+        if self.size >= CHUNK_SIZE:
+            return self.flush()
+        return None
+
+    def close(self):
+        """Return the rest of the output."""
+        if self.format == 'json':
+            self.chunk.append(']')
+        return self.flush()
+
+    def flush(self):
+        chunk = ''.join(self.chunk)
+        self.chunk, self.size = [], 0
+        return chunk
+
+def encode(objects, format: str, dumps=None):
+    """Encode an iterable of json objects incrementally (see Encoder).
+
+    parameters:
+        objects -- iterable of json objects
+        format -- json or ndjson
+        dumps -- function encoding one json object (the json provider of the current Flask application by default)
+
+    returns:
+        generator of strings
+    """
+    encoder = Encoder(format, dumps or current_app.json.dumps)
+    chunk = encoder.open()
+    if chunk:
+        yield chunk
+    for obj in objects:
+        chunk = encoder.add(obj)
+        if chunk:
+            yield chunk
+    chunk = encoder.close()
+    if chunk:
+        yield chunk
+
+async def encodeAsync(objects, format: str, dumps):
+    """Encode an asynchronous iterable of json objects incrementally (see encode), e.g., for a streamed response of the ASGI application.
+
+    parameters:
+        objects -- asynchronous iterable of json objects
+        format -- json or ndjson
+        dumps -- function encoding one json object
+
+    returns:
+        asynchronous generator of strings
+    """
+    encoder = Encoder(format, dumps)
+    chunk = encoder.open()
+    if chunk:
+        yield chunk
+    async for obj in objects:
+        chunk = encoder.add(obj)
+        if chunk:
+            yield chunk
+    chunk = encoder.close()
+    if chunk:
+        yield chunk
+
+def streamResponse(objects, format: str = 'json'):
+    """Create a Flask response which streams an iterable of json objects to the client while it is iterated, such that the whole result never has to be held in memory.
+
+    parameters:
+        objects -- iterable (e.g., generator reading from a database cursor) of json objects
+        format -- json or ndjson
+
+    returns:
+        response -- streamed Flask response
+    """
+    return Response(stream_with_context(encode(objects, format)), mimetype=FORMATS[format])
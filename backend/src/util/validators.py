@@ -1,5 +1,9 @@
+import os
 import json
 
+# the validator files, independent of the working directory
+VALIDATORS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static', 'validators')
+
 validators = {}
 def getValidator(collection_name: str):
     """Obtain a validator object of a collection which is stored as a json file with the same name. The validator must comply to a schema validation format (see https://www.mongodb.com/docs/manual/core/schema-validation/)
@@ -11,6 +15,6 @@ def getValidator(collection_name: str):
         validator -- dict in the format of a MongoDB collection validator
     """
     if collection_name not in validators:
-        with open(f'./src/static/validators/{collection_name}.json', 'r') as f:
+        with open(os.path.join(VALIDATORS, f'{collection_name}.json'), 'r') as f:
             validators[collection_name] = json.load(f)
     return validators[collection_name]
\ No newline at end of file
@@ -0,0 +1,128 @@
+# coding=utf-8
+from flask import Response, request
+from pymongo import UpdateOne
+
+from src.util.dao import DAO
+from src.util.daos import getDao, getAsyncDao
+
+class VersionStore:
+    def __init__(self, dao: DAO):
+        """Instantiate a store of version counters, which count the changes of objects (e.g., ('task', id)) or object graphs (e.g., ('user', id) for a user and all of its tasks). The counters are kept in the database, such that all server processes agree on them, and allow to derive ETags without serializing the objects.
+
+        parameters:
+            dao -- data access object of the version collection
+        """
+        self.dao = dao
+
+    def get(self, key: tuple):
+        """Return the current version of a key (0 if it never changed).
+
+        parameters:
+            key -- tuple of namespace and id
+
+        returns:
+            v -- the number of changes
+        """
+        document = self.dao.collection.find_one({'_id': self.id(key)})
+        if document is None:
+            return 0
+        return document['v']
+
+    def bump(self, *keys: tuple):
+        """Increment the versions of the given keys with one single database operation.
+
+        parameters:
+            keys -- tuples of namespace and id
+        """
+        ids = sorted({self.id(key) for key in keys})
+        if len(ids) > 0:
+            self.dao.collection.bulk_write([UpdateOne({'_id': id}, {'$inc': {'v': 1}}, upsert=True) for id in ids], ordered=False)
+
+    def etag(self, key: tuple, variant: str = ''):
+        """Derive a strong ETag from the version of a key.
+
+        parameters:
+            key -- tuple of namespace and id
+            variant -- distinguishes different representations of the same object
+
+        returns:
+            etag -- the (unquoted) entity tag
+        """
+        return self.tag(key, self.get(key), variant)
+
+    def tag(self, key: tuple, version: int, variant: str = ''):
+        """Derive the strong ETag of a key from a version which was read before (see get), e.g., to pass the same version to the controller.
+
+        parameters:
+            key -- tuple of namespace and id
+            version -- the version of the key
+            variant -- distinguishes different representations of the same object
+
+        returns:
+            etag -- the (unquoted) entity tag
+        """
+        etag = f'{self.id(key)}:{version}'
+        if variant:
+            etag = f'{etag}:{variant}'
+        return etag
+
+    def id(self, key: tuple):
+        return ':'.join(str(part) for part in key)
+
+class AsyncVersionStore(VersionStore):
+    """Variant of the VersionStore for the asynchronous data access objects (see src.util.asyncdao), whose get, bump and etag are coroutines."""
+
+    async def get(self, key: tuple):
+        document = await self.dao.collection.find_one({'_id': self.id(key)})
+        if document is None:
+            return 0
+        return document['v']
+
+    async def bump(self, *keys: tuple):
+        ids = sorted({self.id(key) for key in keys})
+        if len(ids) > 0:
+            await self.dao.collection.bulk_write([UpdateOne({'_id': id}, {'$inc': {'v': 1}}, upsert=True) for id in ids], ordered=False)
+
+    async def etag(self, key: tuple, variant: str = ''):
+        return self.tag(key, await self.get(key), variant)
+
+versions = None
+def getVersionStore():
+    """Obtain the version store of this process, which is backed by the version collection.
+
+    returns:
+        store -- the VersionStore
+    """
+    global versions
+    if versions is None:
+        versions = VersionStore(getDao(collection_name='version'))
+    return versions
+
+async_versions = None
+def getAsyncVersionStore():
+    """Obtain the asynchronous version store of this process (see getVersionStore).
+
+    returns:
+        store -- the AsyncVersionStore
+    """
+    global async_versions
+    if async_versions is None:
+        async_versions = AsyncVersionStore(getAsyncDao(collection_name='version'))
+    return async_versions
+
+def conditionalResponse(etag: str, make_response):
+    """Answer a conditional GET request: if the client already holds the representation with the given ETag (If-None-Match), respond with 304 Not Modified without producing the representation; otherwise produce it and tag it. The version of the ETag has to be read before the representation, which has to come from the database or from a cache entry of that very version (see the version parameter of the controllers), such that a concurrent change can only cause an outdated ETag on a newer representation and never the other way around. Reading the version costs one point query of the version collection per request, which also serves to validate the cache across the server processes.
+
+    parameters:
+        etag -- the current (unquoted) ETag of the requested resource
+        make_response -- function without arguments returning the Flask response for the resource
+
+    returns:
+        response -- Flask response carrying the ETag
+    """
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = make_response()
+    response.set_etag(etag)
+    return response
@@ -0,0 +1,57 @@
+# coding=utf-8
+
+# views of the tasks of a user: the populated tasks (full) or only their summaries (summary, see TaskController.get_tasks_of_user)
+VIEWS = ['full', 'summary']
+
+# references of a task which can be resolved (expanded) when reading tasks, in their canonical order
+EXPANSIONS = ('video', 'todos')
+
+def getViewArg(args):
+    """Read the view parameter of a request for the tasks of a user.
+
+    parameters:
+        args -- the query arguments of the request
+
+    returns:
+        summary -- whether only the summaries of the tasks are requested
+
+    raises:
+        ValueError -- in case the view is unknown
+    """
+    view = args.get('view', 'full')
+    if view not in VIEWS:
+        raise ValueError(f'Error: view must be one of {", ".join(VIEWS)}')
+    return view == 'summary'
+
+def getExpandArg(args):
+    """Read the expand parameter of a request for tasks: a comma-separated list of the references to resolve (see EXPANSIONS), e.g. expand=video. An empty list resolves none of them.
+
+    parameters:
+        args -- the query arguments of the request
+
+    returns:
+        expand -- tuple of the references to resolve in the order of EXPANSIONS, or None if the parameter is missing (then all references are resolved)
+
+    raises:
+        ValueError -- in case an unknown reference is named
+    """
+    if 'expand' not in args:
+        return None
+    names = [name.strip() for name in args['expand'].split(',') if name.strip() != '']
+    unknown = [name for name in names if name not in EXPANSIONS]
+    if len(unknown) > 0:
+        raise ValueError(f'Error: cannot expand {", ".join(unknown)}, only {", ".join(EXPANSIONS)}')
+    return tuple(name for name in EXPANSIONS if name in names)
+
+def expandVariant(expand: tuple = None):
+    """Return the part of the variant of an ETag (see VersionStore.etag) which distinguishes the expansions of tasks, empty if all references are resolved."""
+    if expand is None or tuple(expand) == EXPANSIONS:
+        return ''
+    return f'expand={",".join(expand)}'
+
+def tasksVariant(limit: int = None, after: str = None, summary: bool = False, expand: tuple = None):
+    """Return the variant of the ETag of the tasks of a user (see VersionStore.etag), which distinguishes the pages, views and expansions of the tasks covered by the same version of the user."""
+    variant = 'summary' if summary else 'tasks'
+    if not summary and expandVariant(expand):
+        variant = f'{variant}:{expandVariant(expand)}'
+    return variant if limit is None else f'{variant}:{limit}:{after}'
@@ -0,0 +1,75 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from pymongo.errors import WriteError
+
+from src.controllers.asynctaskcontroller import AsyncTaskController
+
+def taskdata(title: str, todos: list):
+    return {'userid': '64d0c1f0a1b2c3d4e5f60700', 'title': title, 'description': 'description', 'url': 'U_gANjtv28g', 'todos': todos}
+
+@pytest.fixture
+def daos():
+    """
+    Fixture for the four mocked asynchronous DAOs of an AsyncTaskController.
+
+    Returns: dict: mocked DAOs by the name of the respective constructor parameter.
+    """
+    return {'tasks_dao': AsyncMock(), 'videos_dao': AsyncMock(), 'todos_dao': AsyncMock(), 'users_dao': AsyncMock()}
+
+@pytest.mark.unit
+def test_create_many_write_error(daos):
+    """
+    Like for the TaskController, the tasks preceding a task whose todo violates the validator are created and assigned to their user.
+    """
+    daos['todos_dao'].create_many.side_effect = WriteError('invalid todo', code=121, details={'nInserted': 2})
+    tc = AsyncTaskController(**daos)
+
+    with pytest.raises(WriteError):
+        asyncio.run(tc.create_many([taskdata('a', ['x', 'y']), taskdata('b', ['z'])]))
+
+    tasks = daos['tasks_dao'].create_many.call_args.args[0]
+    assert [task['title'] for task in tasks] == ['a']
+    daos['users_dao'].bulk_update.assert_awaited_once()
+
+@pytest.mark.unit
+def test_populate_task_concurrent(daos):
+    """
+    The video and the todos of a task are fetched concurrently: the video lookup only completes once the todo lookup started.
+    """
+    async def populate():
+        todos_started = asyncio.Event()
+        async def find_video(id):
+            await todos_started.wait()
+            return {'url': 'U_gANjtv28g'}
+        async def find_todos(filter, toid):
+            todos_started.set()
+            return [{'description': 'x'}]
+        daos['videos_dao'].findOne.side_effect = find_video
+        daos['todos_dao'].find.side_effect = find_todos
+        tc = AsyncTaskController(**daos)
+        task = {'video': {'$oid': '64d0c1f0a1b2c3d4e5f60701'}, 'todos': [{'$oid': '64d0c1f0a1b2c3d4e5f60702'}]}
+        return await asyncio.wait_for(tc.populate_task(task), timeout=1)
+
+    task = asyncio.run(populate())
+
+    assert task == {'video': {'url': 'U_gANjtv28g'}, 'todos': [{'description': 'x'}]}
+
+@pytest.mark.unit
+def test_delete_of_user_chunks(daos):
+    """
+    Deleting the tasks of a user reports the same counts as the TaskController, with one bulk operation per collection and chunk.
+    """
+    ids = [f'64d0c1f0a1b2c3d4e5f607{i:02d}' for i in range(5)]
+    daos['tasks_dao'].find.side_effect = lambda filter, projection: [
+        {'_id': {'$oid': str(id)}, 'video': {'$oid': str(id)}, 'todos': [{'$oid': str(id)}, {'$oid': str(id)}]} for id in filter['_id']['$in']
+    ] if '_id' in filter else [{'_id': {'$oid': id}} for id in ids]
+    for dao in daos.values():
+        dao.delete_many.side_effect = len
+    tc = AsyncTaskController(**daos)
+    tc.DELETE_CHUNK_SIZE = 2
+
+    counts = asyncio.run(tc.delete_of_user('64d0c1f0a1b2c3d4e5f60799'))
+
+    assert counts == {'task': 5, 'video': 5, 'todo': 10}
+    assert daos['tasks_dao'].delete_many.await_count == 3
@@ -0,0 +1,236 @@
+import pytest
+from unittest.mock import MagicMock
+from pymongo.errors import WriteError
+
+from src.controllers.taskcontroller import TaskController
+from src.util.cache import MISS
+
+def taskdata(title: str, todos: list):
+    return {'userid': '64d0c1f0a1b2c3d4e5f60700', 'title': title, 'description': 'description', 'url': 'U_gANjtv28g', 'todos': todos}
+
+class TestTaskControllerCreate:
+    @pytest.fixture
+    def daos(self):
+        """
+        Fixture for the four mocked DAOs of a TaskController.
+
+        Returns: dict: mocked DAOs by the name of the respective constructor parameter.
+        """
+        return {'tasks_dao': MagicMock(), 'videos_dao': MagicMock(), 'todos_dao': MagicMock(), 'users_dao': MagicMock()}
+
+    @pytest.mark.unit
+    def test_create_many_bulk(self, daos):
+        """
+        Creating several tasks costs one bulk insert per collection and one bulk update of the users.
+        """
+        tc = TaskController(**daos)
+
+        ids = tc.create_many([taskdata('a', ['x', 'y']), taskdata('b', ['z'])])
+
+        assert len(ids) == 2
+        assert len(daos['videos_dao'].create_many.call_args.args[0]) == 2
+        assert len(daos['todos_dao'].create_many.call_args.args[0]) == 3
+        tasks = daos['tasks_dao'].create_many.call_args.args[0]
+        assert [str(task['_id']) for task in tasks] == ids
+        daos['users_dao'].bulk_update.assert_called_once()
+        daos['videos_dao'].create.assert_not_called()
+
+    @pytest.mark.unit
+    def test_create_many_owner(self, daos):
+        """
+        Each created task refers to its user as owner.
+        """
+        tc = TaskController(**daos)
+
+        tc.create_many([taskdata('a', [])])
+
+        task = daos['tasks_dao'].create_many.call_args.args[0][0]
+        assert str(task['owner']) == '64d0c1f0a1b2c3d4e5f60700'
+        assert 'userid' not in task
+
+    @pytest.mark.unit
+    def test_create_many_counters(self, daos):
+        """
+        Each created task counts its todos, none of which is done.
+        """
+        tc = TaskController(**daos)
+
+        tc.create_many([taskdata('a', ['x', 'y'])])
+
+        task = daos['tasks_dao'].create_many.call_args.args[0][0]
+        assert (task['total'], task['done']) == (2, 0)
+
+    @pytest.mark.unit
+    def test_create_many_missing_userid(self, daos):
+        """
+        A missing userid raises a KeyError before anything is written.
+        """
+        tc = TaskController(**daos)
+        data = taskdata('a', [])
+        del data['userid']
+
+        with pytest.raises(KeyError):
+            tc.create_many([taskdata('b', []), data])
+        daos['videos_dao'].create_many.assert_not_called()
+
+    @pytest.mark.unit
+    def test_create_many_write_error(self, daos):
+        """
+        If a todo of the second task violates the validator, the first task is still created and assigned to its user and the WriteError is raised.
+        """
+        daos['todos_dao'].create_many.side_effect = WriteError('invalid todo', code=121, details={'nInserted': 2})
+        tc = TaskController(**daos)
+
+        with pytest.raises(WriteError):
+            tc.create_many([taskdata('a', ['x', 'y']), taskdata('b', ['z']), taskdata('c', ['w'])])
+
+        tasks = daos['tasks_dao'].create_many.call_args.args[0]
+        assert [task['title'] for task in tasks] == ['a']
+        updates = daos['users_dao'].bulk_update.call_args.args[0]
+        assert len(updates[0][1]['$push']['tasks']['$each']) == 1
+
+    @pytest.mark.unit
+    def test_create_many_write_error_leftovers(self, daos):
+        """
+        If a todo of the second task violates the validator, the videos of the second and third task and the todo of the second task written before the failing one are removed again.
+        """
+        daos['todos_dao'].create_many.side_effect = WriteError('invalid todo', code=121, details={'nInserted': 3})
+        tc = TaskController(**daos)
+
+        with pytest.raises(WriteError):
+            tc.create_many([taskdata('a', ['x', 'y']), taskdata('b', ['z', 'v']), taskdata('c', ['w'])])
+
+        videos = daos['videos_dao'].create_many.call_args.args[0]
+        assert daos['videos_dao'].delete_many.call_args.args[0] == [video['_id'] for video in videos[1:]]
+        todos = daos['todos_dao'].create_many.call_args.args[0]
+        assert daos['todos_dao'].delete_many.call_args.args[0] == [todos[2]['_id']]
+        daos['tasks_dao'].delete_many.assert_not_called()
+
+    @pytest.mark.unit
+    def test_create_many_embedded(self, daos):
+        """
+        If the tasks embed their videos and todos, only the tasks are written.
+        """
+        tc = TaskController(**daos, embedded=True)
+
+        tc.create_many([taskdata('a', ['x', 'y'])])
+
+        daos['videos_dao'].create_many.assert_called_once_with([])
+        daos['todos_dao'].create_many.assert_called_once_with([])
+        task = daos['tasks_dao'].create_many.call_args.args[0][0]
+        assert task['video']['url'] == 'U_gANjtv28g'
+        assert [todo['description'] for todo in task['todos']] == ['x', 'y']
+
+class TestTaskControllerRead:
+    @pytest.mark.unit
+    def test_tasks_of_user_by_owner(self):
+        """
+        The tasks of a user are found via their owner on the task collection, without reading the user.
+        """
+        daos = {'tasks_dao': MagicMock(), 'videos_dao': MagicMock(), 'todos_dao': MagicMock(), 'users_dao': MagicMock()}
+        daos['tasks_dao'].aggregate.return_value = []
+        tc = TaskController(**daos)
+
+        assert tc.get_tasks_of_user('64d0c1f0a1b2c3d4e5f60799') == []
+
+        pipeline = daos['tasks_dao'].aggregate.call_args.args[0]
+        assert str(pipeline[0]['$match']['owner']) == '64d0c1f0a1b2c3d4e5f60799'
+        daos['users_dao'].aggregate.assert_not_called()
+        daos['users_dao'].findOne.assert_not_called()
+
+    @pytest.mark.unit
+    def test_tasks_of_user_summary(self):
+        """
+        The summaries of the tasks of a user are projected from the task documents without looking up videos and todos, and cached separately.
+        """
+        daos = {'tasks_dao': MagicMock(), 'videos_dao': MagicMock(), 'todos_dao': MagicMock(), 'users_dao': MagicMock()}
+        daos['tasks_dao'].aggregate.return_value = []
+        tc = TaskController(**daos)
+
+        tc.get_tasks_of_user('64d0c1f0a1b2c3d4e5f60799', summary=True)
+
+        pipeline = daos['tasks_dao'].aggregate.call_args.args[0]
+        assert not any('$lookup' in stage for stage in pipeline)
+        assert pipeline[-1]['$project']['title'] == 1
+        assert tc.tasks_of_user_key('64d0c1f0a1b2c3d4e5f60799', summary=True) != tc.tasks_of_user_key('64d0c1f0a1b2c3d4e5f60799')
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('expand, lookups', [(None, ['video', 'todo']), (('video',), ['video']), (('todos',), ['todo']), ((), [])])
+    def test_population_expand(self, expand, lookups):
+        """
+        Only the expanded references are looked up.
+        """
+        daos = {'tasks_dao': MagicMock(), 'videos_dao': MagicMock(), 'todos_dao': MagicMock(), 'users_dao': MagicMock()}
+        daos['videos_dao'].collection_name = 'video'
+        daos['todos_dao'].collection_name = 'todo'
+        tc = TaskController(**daos)
+
+        stages = tc.population_stages(expand)
+
+        assert [stage['$lookup']['from'] for stage in stages if '$lookup' in stage] == lookups
+
+class TestTaskControllerBatch:
+    @pytest.mark.unit
+    def test_get_many(self):
+        """
+        Several tasks are read and populated with one aggregation, cached tasks are not read again, and ids without a task are reported as missing.
+        """
+        ids = ['64d0c1f0a1b2c3d4e5f60700', '64d0c1f0a1b2c3d4e5f60701', '64d0c1f0a1b2c3d4e5f60702']
+        daos = {'tasks_dao': MagicMock(), 'videos_dao': MagicMock(), 'todos_dao': MagicMock(), 'users_dao': MagicMock()}
+        daos['tasks_dao'].collection_name = 'task'
+        daos['tasks_dao'].aggregate.return_value = [{'_id': {'$oid': ids[1]}, 'todos': []}]
+        cache = MagicMock()
+        cache.get.side_effect = lambda key: {'_id': {'$oid': ids[0]}} if key == ('task', ids[0]) else MISS
+        tc = TaskController(**daos, cache=cache)
+
+        result = tc.get_many(ids)
+
+        assert list(result['items']) == ids[:2]
+        assert result['missing'] == ids[2:]
+        daos['tasks_dao'].aggregate.assert_called_once()
+        match = daos['tasks_dao'].aggregate.call_args.args[0][0]['$match']
+        assert [str(id) for id in match['_id']['$in']] == ids[1:]
+        cache.set.assert_called_once()
+
+class TestTaskControllerDelete:
+    @pytest.mark.unit
+    def test_delete_of_user_chunks(self):
+        """
+        Deleting the tasks of a user deletes videos, todos and tasks with one bulk operation per collection and chunk, and reports the counts per collection.
+        """
+        ids = [f'64d0c1f0a1b2c3d4e5f607{i:02d}' for i in range(5)]
+        daos = {'tasks_dao': MagicMock(), 'videos_dao': MagicMock(), 'todos_dao': MagicMock(), 'users_dao': MagicMock()}
+        daos['tasks_dao'].find.side_effect = lambda filter, projection: [
+            {'_id': {'$oid': str(id)}, 'video': {'$oid': str(id)}, 'todos': [{'$oid': str(id)}]} for id in filter['_id']['$in']
+        ] if '_id' in filter else [{'_id': {'$oid': id}} for id in ids]
+        for dao in daos.values():
+            dao.delete_many.side_effect = len
+        tc = TaskController(**daos)
+        tc.DELETE_CHUNK_SIZE = 2
+
+        counts = tc.delete_of_user('64d0c1f0a1b2c3d4e5f60799')
+
+        assert counts == {'task': 5, 'video': 5, 'todo': 5}
+        assert daos['tasks_dao'].delete_many.call_count == 3
+        daos['tasks_dao'].delete.assert_not_called()
+        daos['users_dao'].findOne.assert_not_called()
+
+    @pytest.mark.unit
+    def test_delete_tasks_embedded(self):
+        """
+        Embedded videos and todos are deleted along with their tasks, while the todos are still invalidated.
+        """
+        daos = {'tasks_dao': MagicMock(), 'videos_dao': MagicMock(), 'todos_dao': MagicMock(), 'users_dao': MagicMock()}
+        daos['tasks_dao'].collection_name = 'task'
+        daos['todos_dao'].collection_name = 'todo'
+        daos['tasks_dao'].find.return_value = [{'_id': {'$oid': 't'}, 'video': {'_id': {'$oid': 'v'}, 'url': 'u'}, 'todos': [{'_id': {'$oid': 'x'}, 'description': 'x'}]}]
+        daos['tasks_dao'].delete_many.return_value = 1
+        cache = MagicMock()
+        tc = TaskController(**daos, cache=cache, embedded=True)
+
+        counts = tc.delete_tasks(['64d0c1f0a1b2c3d4e5f60700'])
+
+        assert counts == {'task': 1, 'video': 1, 'todo': 1}
+        daos['videos_dao'].delete_many.assert_not_called()
+        daos['todos_dao'].delete_many.assert_not_called()
+        assert ('todo', 'x') in cache.invalidate.call_args.args
@@ -0,0 +1,171 @@
+import pytest
+from unittest.mock import MagicMock
+
+from src.controllers.todocontroller import TodoController
+
+class TestTodoControllerCreate:
+    @pytest.fixture
+    def todo(self):
+        """
+        Fixture for the todo object which the mocked todo DAO returns upon creation.
+        """
+        return {'_id': {'$oid': '64d0c1f0a1b2c3d4e5f60718'}, 'description': 'Watch video', 'done': False}
+
+    @pytest.fixture
+    def mocked_todo_dao(self, todo):
+        mocked_dao = MagicMock()
+        mocked_dao.create.return_value = todo
+        return mocked_dao
+
+    @pytest.mark.unit
+    def test_create_associates_task(self, mocked_todo_dao, todo):
+        """
+        Creating a todo with a taskid pushes the new todo onto the task in one operation without reading the task first.
+        """
+        mocked_tasks_dao = MagicMock()
+        mocked_tasks_dao.findOneAndUpdate.return_value = {'_id': {'$oid': '64d0c1f0a1b2c3d4e5f60700'}}
+        tc = TodoController(todo_dao=mocked_todo_dao, tasks_dao=mocked_tasks_dao)
+
+        result = tc.create({'taskid': '64d0c1f0a1b2c3d4e5f60700', 'description': 'Watch video', 'done': 'false'})
+
+        assert result == todo
+        mocked_todo_dao.create.assert_called_once_with({'description': 'Watch video', 'done': False})
+        mocked_tasks_dao.findOne.assert_not_called()
+        assert mocked_tasks_dao.findOneAndUpdate.call_args.kwargs['id'] == '64d0c1f0a1b2c3d4e5f60700'
+        assert mocked_tasks_dao.findOneAndUpdate.call_args.kwargs['update_data']['$inc'] == {'total': 1, 'done': 0}
+
+    @pytest.mark.unit
+    def test_create_missing_task(self, mocked_todo_dao):
+        """
+        Creating a todo for a task that does not exist removes the todo again and raises a ValueError.
+        """
+        mocked_tasks_dao = MagicMock()
+        mocked_tasks_dao.findOneAndUpdate.return_value = None
+        tc = TodoController(todo_dao=mocked_todo_dao, tasks_dao=mocked_tasks_dao)
+
+        with pytest.raises(ValueError):
+            tc.create({'taskid': '64d0c1f0a1b2c3d4e5f60700', 'description': 'Watch video'})
+        mocked_todo_dao.delete.assert_called_once_with(id='64d0c1f0a1b2c3d4e5f60718')
+
+class TestTodoControllerEmbedded:
+    @pytest.fixture
+    def mocked_tasks_dao(self):
+        mocked_dao = MagicMock()
+        mocked_dao.collection_name = 'task'
+        mocked_dao.findOneAndUpdate.return_value = {'_id': {'$oid': '64d0c1f0a1b2c3d4e5f60700'}}
+        mocked_dao.findAndUpdate.return_value = {'_id': {'$oid': '64d0c1f0a1b2c3d4e5f60700'}}
+        return mocked_dao
+
+    @pytest.mark.unit
+    def test_create_pushes_todo(self, mocked_tasks_dao):
+        """
+        An embedded todo is pushed onto its task without writing the todo collection.
+        """
+        mocked_todo_dao = MagicMock()
+        tc = TodoController(todo_dao=mocked_todo_dao, tasks_dao=mocked_tasks_dao, embedded=True)
+
+        result = tc.create({'taskid': '64d0c1f0a1b2c3d4e5f60700', 'description': 'Watch video', 'done': 'true'})
+
+        mocked_todo_dao.create.assert_not_called()
+        pushed = mocked_tasks_dao.findOneAndUpdate.call_args.kwargs['update_data']['$push']['todos']
+        assert pushed['description'] == 'Watch video' and pushed['done'] is True
+        assert result == {'_id': {'$oid': str(pushed['_id'])}, 'description': 'Watch video', 'done': True}
+
+    @pytest.mark.unit
+    def test_create_requires_task(self, mocked_tasks_dao):
+        """
+        An embedded todo cannot be created without a task.
+        """
+        tc = TodoController(todo_dao=MagicMock(), tasks_dao=mocked_tasks_dao, embedded=True)
+
+        with pytest.raises(ValueError):
+            tc.create({'description': 'Watch video'})
+
+    @pytest.mark.unit
+    def test_update_positional(self, mocked_tasks_dao):
+        """
+        Updating an embedded todo updates the matching element of the todos of its task and invalidates the task.
+        """
+        cache = MagicMock()
+        tc = TodoController(todo_dao=MagicMock(), tasks_dao=mocked_tasks_dao, cache=cache, embedded=True)
+
+        tc.update('64d0c1f0a1b2c3d4e5f60718', {'$set': {'description': 'Read'}})
+
+        filter, update = mocked_tasks_dao.findAndUpdate.call_args.args
+        assert str(filter['todos._id']) == '64d0c1f0a1b2c3d4e5f60718'
+        assert update == {'$set': {'todos.$.description': 'Read'}}
+        assert ('task', '64d0c1f0a1b2c3d4e5f60700') in cache.invalidate.call_args.args
+
+    @pytest.mark.unit
+    def test_update_counts_done(self, mocked_tasks_dao):
+        """
+        Setting an embedded todo done increments the done counter of its task within the same update, conditioned on the todo not being done yet.
+        """
+        tc = TodoController(todo_dao=MagicMock(), tasks_dao=mocked_tasks_dao, embedded=True)
+
+        tc.update('64d0c1f0a1b2c3d4e5f60718', {'$set': {'done': True}})
+
+        filter, update = mocked_tasks_dao.findAndUpdate.call_args.args
+        assert filter['todos']['$elemMatch']['done'] == {'$ne': True}
+        assert update == {'$set': {'todos.$.done': True}, '$inc': {'done': 1}}
+
+    @pytest.mark.unit
+    def test_get_many(self, mocked_tasks_dao):
+        """
+        Several embedded todos are read with one query of their tasks, and only the requested todos are returned.
+        """
+        mocked_tasks_dao.find.return_value = [{'_id': {'$oid': 't'}, 'todos': [{'_id': {'$oid': '64d0c1f0a1b2c3d4e5f60718'}}, {'_id': {'$oid': 'other'}}]}]
+        tc = TodoController(todo_dao=MagicMock(), tasks_dao=mocked_tasks_dao, embedded=True)
+
+        result = tc.get_many(['64d0c1f0a1b2c3d4e5f60718', '64d0c1f0a1b2c3d4e5f60719'])
+
+        assert list(result['items']) == ['64d0c1f0a1b2c3d4e5f60718']
+        assert result['missing'] == ['64d0c1f0a1b2c3d4e5f60719']
+        mocked_tasks_dao.find.assert_called_once()
+
+class TestTodoControllerCounters:
+    @pytest.mark.unit
+    def test_update_unchanged_done(self):
+        """
+        Setting a todo done which is done already (the conditioned update matches nothing) leaves the counter of its task alone.
+        """
+        mocked_todo_dao, mocked_tasks_dao = MagicMock(), MagicMock()
+        mocked_todo_dao.findAndUpdate.side_effect = [None, {'_id': {'$oid': '64d0c1f0a1b2c3d4e5f60718'}, 'done': True}]
+        tc = TodoController(todo_dao=mocked_todo_dao, tasks_dao=mocked_tasks_dao)
+
+        todo = tc.update_and_get('64d0c1f0a1b2c3d4e5f60718', {'$set': {'done': True}})
+
+        assert todo['done'] is True
+        assert [call.args[0]['done'] for call in mocked_todo_dao.findAndUpdate.call_args_list] == [{'$ne': True}, True]
+        mocked_tasks_dao.findAndUpdate.assert_not_called()
+
+    @pytest.mark.unit
+    def test_update_missing_todo(self):
+        """
+        Setting a todo done which does not exist is given up after one attempt with each condition and one lookup.
+        """
+        mocked_todo_dao, mocked_tasks_dao = MagicMock(), MagicMock()
+        mocked_todo_dao.findAndUpdate.return_value = None
+        mocked_todo_dao.find.return_value = []
+        tc = TodoController(todo_dao=mocked_todo_dao, tasks_dao=mocked_tasks_dao)
+
+        assert tc.update_and_get('64d0c1f0a1b2c3d4e5f60718', {'$set': {'done': True}}) is None
+        assert mocked_todo_dao.findAndUpdate.call_count == 2
+        mocked_todo_dao.find.assert_called_once()
+        mocked_tasks_dao.findAndUpdate.assert_not_called()
+
+    @pytest.mark.unit
+    def test_delete_uncounts_todo(self):
+        """
+        Deleting a done todo removes it from its task and decrements both counters of the task.
+        """
+        mocked_todo_dao, mocked_tasks_dao = MagicMock(), MagicMock()
+        mocked_todo_dao.findOneAndDelete.return_value = {'_id': {'$oid': '64d0c1f0a1b2c3d4e5f60718'}, 'done': True}
+        mocked_tasks_dao.findAndUpdate.return_value = None
+        tc = TodoController(todo_dao=mocked_todo_dao, tasks_dao=mocked_tasks_dao)
+
+        assert tc.delete('64d0c1f0a1b2c3d4e5f60718') == True
+
+        filter, update = mocked_tasks_dao.findAndUpdate.call_args.args
+        assert str(filter['todos']) == '64d0c1f0a1b2c3d4e5f60718'
+        assert update['$inc'] == {'total': -1, 'done': -1}
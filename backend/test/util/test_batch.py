@@ -0,0 +1,33 @@
+import pytest
+
+from src.util.batch import getBatchIds
+
+IDS = ['64d0c1f0a1b2c3d4e5f60700', '64d0c1f0a1b2c3d4e5f60701', '64d0c1f0a1b2c3d4e5f60702']
+
+@pytest.mark.unit
+def test_batch_ids():
+    """
+    Ids may be repeated values or comma-separated, and each id is requested once in the given order.
+    """
+    assert getBatchIds([f'{IDS[1]}, {IDS[0]}', IDS[1], IDS[2]]) == [IDS[1], IDS[0], IDS[2]]
+
+@pytest.mark.unit
+@pytest.mark.parametrize('values', [[], [''], ['not an id'], [IDS[0], 7]])
+def test_batch_ids_invalid(values):
+    """
+    Missing or invalid ids raise a ValueError.
+    """
+    with pytest.raises(ValueError):
+        getBatchIds(values)
+
+@pytest.mark.unit
+def test_batch_ids_maximum(monkeypatch):
+    """
+    More ids than BATCH_MAX_IDS raise a ValueError.
+    """
+    monkeypatch.setenv('BATCH_MAX_IDS', '2')
+    monkeypatch.setattr('src.util.settings.settings', None)
+
+    assert getBatchIds(IDS[:2]) == IDS[:2]
+    with pytest.raises(ValueError):
+        getBatchIds(IDS)
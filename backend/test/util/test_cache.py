@@ -0,0 +1,157 @@
+import pytest
+from unittest.mock import patch, MagicMock
+
+from src.util.cache import LRUCache, MISS
+from src.controllers.controller import Controller
+
+class TestLRUCache:
+    @pytest.mark.unit
+    def test_lru_eviction(self):
+        """
+        Once the cache is full, the least recently used entry is evicted.
+        """
+        cache = LRUCache(maxsize=2)
+        cache.set(('user', 'a'), 1)
+        cache.set(('user', 'b'), 2)
+        cache.get(('user', 'a'))
+        cache.set(('user', 'c'), 3)
+
+        assert cache.get(('user', 'b')) is MISS
+        assert cache.get(('user', 'a')) == 1
+        assert cache.stats()['evictions'] == 1
+
+    @pytest.mark.unit
+    def test_ttl_per_namespace(self):
+        """
+        Entries expire after the time to live of their namespace.
+        """
+        cache = LRUCache(maxsize=10, ttls={'task': 5}, default_ttl=60)
+        with patch('src.util.cache.time.monotonic', return_value=100):
+            cache.set(('task', 'a'), 1)
+            cache.set(('user', 'a'), 2)
+        with patch('src.util.cache.time.monotonic', return_value=110):
+            assert cache.get(('task', 'a')) is MISS
+            assert cache.get(('user', 'a')) == 2
+
+    @pytest.mark.unit
+    def test_invalidate_dependents(self):
+        """
+        Invalidating a key also invalidates the entries depending on it, transitively.
+        """
+        cache = LRUCache(maxsize=10)
+        cache.set(('task', 't'), {'todos': []}, depends_on=[('todo', 'x')])
+        cache.set(('ofuser', 'u'), [], depends_on=[('task', 't')])
+        cache.set(('user', 'u'), {})
+
+        cache.invalidate(('todo', 'x'))
+
+        assert cache.get(('task', 't')) is MISS
+        assert cache.get(('ofuser', 'u')) is MISS
+        assert cache.get(('user', 'u')) == {}
+
+    @pytest.mark.unit
+    def test_values_are_copied(self):
+        """
+        Modifying a value obtained from the cache does not alter the cached value.
+        """
+        cache = LRUCache(maxsize=10)
+        cache.set(('task', 't'), {'todos': [1]})
+        cache.get(('task', 't'))['todos'].append(2)
+
+        assert cache.get(('task', 't')) == {'todos': [1]}
+
+    @pytest.mark.unit
+    def test_set_after_invalidation_discarded(self):
+        """
+        A value read before its key or one of its dependencies was invalidated is not cached, while a value read afterwards is.
+        """
+        cache = LRUCache(maxsize=10)
+        token = cache.token()
+        cache.invalidate(('todo', 'x'))
+        cache.set(('task', 't'), {'todos': []}, depends_on=[('todo', 'x')], token=token)
+        cache.set(('user', 'u'), {}, token=token)
+
+        assert cache.get(('task', 't')) is MISS
+        assert cache.get(('user', 'u')) == {}
+
+        cache.set(('task', 't'), {'todos': []}, depends_on=[('todo', 'x')], token=cache.token())
+        assert cache.get(('task', 't')) == {'todos': []}
+
+    @pytest.mark.unit
+    def test_set_after_forgotten_invalidation_discarded(self):
+        """
+        Once more than maxsize keys were invalidated since a token was taken, values read before are not cached, since the invalidations of the oldest keys are forgotten.
+        """
+        cache = LRUCache(maxsize=2)
+        token = cache.token()
+        cache.invalidate(('user', 'a'))
+        cache.invalidate(('user', 'b'), ('user', 'c'))
+        cache.set(('user', 'd'), {}, token=token)
+
+        assert cache.get(('user', 'd')) is MISS
+
+    @pytest.mark.unit
+    def test_version_mismatch(self):
+        """
+        A value cached with a version is only returned for that version.
+        """
+        cache = LRUCache(maxsize=10)
+        cache.set(('task', 't'), {'todos': []}, version=3)
+
+        assert cache.get(('task', 't'), version=3) == {'todos': []}
+        assert cache.get(('task', 't'), version=4) is MISS
+
+class TestControllerCache:
+    @pytest.mark.unit
+    def test_get_read_through(self):
+        """
+        A controller reads an object from the database only once and again after it was updated.
+        """
+        mocked_dao = MagicMock()
+        mocked_dao.collection_name = 'user'
+        mocked_dao.findOne.return_value = {'_id': {'$oid': 'a'}}
+        cache = LRUCache(maxsize=10)
+        controller = Controller(dao=mocked_dao, cache=cache)
+
+        controller.get('a')
+        controller.get('a')
+        controller.update('a', {'$set': {'firstName': 'Jane'}})
+        controller.get('a')
+
+        assert mocked_dao.findOne.call_count == 2
+        assert cache.stats()['hits'] == 1
+
+    @pytest.mark.unit
+    def test_get_concurrent_update(self):
+        """
+        An object which is updated while it is read is not cached in its outdated state.
+        """
+        mocked_dao = MagicMock()
+        mocked_dao.collection_name = 'user'
+        cache = LRUCache(maxsize=10)
+        controller = Controller(dao=mocked_dao, cache=cache)
+
+        def findOne(id):
+            # another thread updates the user after it was read
+            controller.update(id, {'$set': {'firstName': 'Jane'}})
+            return {'_id': {'$oid': id}, 'firstName': 'John'}
+        mocked_dao.findOne.side_effect = findOne
+
+        controller.get('a')
+        assert cache.get(('user', 'a')) is MISS
+
+    @pytest.mark.unit
+    def test_get_newer_version(self):
+        """
+        A controller reads an object from the database again once its version changed, e.g., by another process.
+        """
+        mocked_dao = MagicMock()
+        mocked_dao.collection_name = 'user'
+        mocked_dao.findOne.return_value = {'_id': {'$oid': 'a'}}
+        controller = Controller(dao=mocked_dao, cache=LRUCache(maxsize=10))
+
+        controller.get('a', version=1)
+        controller.get('a', version=1)
+        controller.get('a', version=2)
+
+        assert mocked_dao.findOne.call_count == 2
@@ -0,0 +1,62 @@
+import pytest
+import json
+import re
+from datetime import datetime, timezone, timedelta
+
+from bson import json_util
+from bson.objectid import ObjectId
+from bson.int64 import Int64
+from bson.decimal128 import Decimal128
+from bson.binary import Binary
+from bson.timestamp import Timestamp
+from bson.son import SON
+
+from src.util.converters import to_json, to_json_many
+
+def reference(data):
+    """The previous conversion via a json string, which the converter has to reproduce exactly."""
+    return json.loads(json_util.dumps(data))
+
+def task_document():
+    return {
+        '_id': ObjectId(),
+        'title': 'Improve Devtools',
+        'description': 'Upgrade the tools used for web development.',
+        'startdate': datetime(2023, 3, 14, 9, 26, 53, 589793),
+        'categories': ['web', 'tools'],
+        'todos': [ObjectId(), ObjectId()],
+        'video': ObjectId()
+    }
+
+@pytest.mark.unit
+@pytest.mark.parametrize('data', [
+    None,
+    task_document(),
+    [task_document(), task_document()],
+    {'nested': {'list': [1, 2.5, True, None, 'x', (1, 2)], 'son': SON([('b', 1), ('a', ObjectId())])}},
+    {'int64': Int64(2**40), 'decimal': Decimal128('1.10'), 'bytes': b'\x00\x01', 'binary': Binary(b'abc', 4)},
+    {'nan': float('nan'), 'inf': float('-inf'), 'regex': re.compile('^a.*', re.IGNORECASE), 'timestamp': Timestamp(1, 2)},
+    {'aware': datetime(2023, 1, 1, 12, tzinfo=timezone(timedelta(hours=2))), 'preepoch': datetime(1960, 5, 1), 'utc': datetime(2023, 1, 1, tzinfo=timezone.utc)},
+    {1: 'int key', 2.5: 'float key', None: 'none key', 'set': {3}}
+])
+def test_to_json_equals_round_trip(data):
+    """
+    The converter yields the same values, in the same key order, as a round trip through a json string.
+    """
+    assert json.dumps(to_json(data)) == json.dumps(reference(data))
+
+@pytest.mark.unit
+def test_to_json_native_types():
+    """
+    Subclasses of native json types are reduced to their base type.
+    """
+    result = to_json({'n': Int64(5)})
+    assert type(result['n']) is int
+
+@pytest.mark.unit
+def test_to_json_many():
+    """
+    The batch conversion converts every document of an iterable.
+    """
+    documents = [task_document() for _ in range(3)]
+    assert to_json_many(iter(documents)) == [reference(document) for document in documents]
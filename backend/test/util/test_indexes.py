@@ -0,0 +1,54 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from pymongo.errors import OperationFailure
+
+from src.util.indexes import getIndexModels, ensureIndexes
+
+@pytest.mark.unit
+def test_email_index_unique_case_insensitive():
+    """
+    The email of a user is indexed uniquely with a case-insensitive collation.
+    """
+    models = {model.document['name']: model.document for model in getIndexModels('user')}
+    assert models['email_unique']['unique'] == True
+    assert models['email_unique']['collation']['strength'] == 2
+
+@pytest.mark.unit
+def test_validator_fields_not_indexed():
+    """
+    Properties flagged with uniqueItems in the validator are not indexed unless a query needs them.
+    """
+    assert getIndexModels('todo') == []
+    assert 'title' not in [model.document['name'] for model in getIndexModels('task')]
+
+@pytest.mark.unit
+def test_ensure_indexes_drops_obsolete():
+    """
+    Existing indexes of fields which no query uses are dropped.
+    """
+    mockedcollection = MagicMock()
+    mockedcollection.index_information.return_value = {'_id_': {}, 'description': {}}
+    with patch('src.util.indexes.getDao') as mockedgetDao:
+        mockedgetDao.return_value.collection = mockedcollection
+        errors = ensureIndexes()
+
+    assert errors == {}
+    mockedcollection.drop_index.assert_called_once_with('description')
+
+@pytest.mark.unit
+def test_ensure_indexes_reports_errors():
+    """
+    An index that cannot be created is reported and does not prevent the creation of the other indexes.
+    """
+    def create_indexes(models):
+        if models[0].document['name'] == 'email_unique':
+            raise OperationFailure('E11000 duplicate key error')
+
+    mockedcollection = MagicMock()
+    mockedcollection.create_indexes.side_effect = create_indexes
+    with patch('src.util.indexes.getDao') as mockedgetDao:
+        mockedgetDao.return_value.collection = mockedcollection
+        errors = ensureIndexes()
+
+    assert list(errors.keys()) == ['user.email_unique']
+    assert mockedcollection.create_indexes.call_count > 1
@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+import pytest
+from unittest.mock import patch, MagicMock
+from pymongo.errors import OperationFailure, CollectionInvalid
+
+from src.util.initdb import initDatabase
+from src.util.dao import DAO
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.mark.unit
+def test_init_database():
+    """
+    Every collection is set up and its validator updated, and the errors of single steps are reported together with the index errors.
+    """
+    def command(command, name, validator):
+        if name == 'video':
+            raise OperationFailure('not authorized')
+        return {'ok': 1}
+    daos = {}
+    database = MagicMock()
+    database.command.side_effect = command
+
+    with patch('src.util.initdb.getDao', side_effect=lambda collection_name: daos.setdefault(collection_name, MagicMock())), \
+        patch('src.util.initdb.getDatabase', return_value=database), \
+        patch('src.util.initdb.ensureIndexes', return_value={'user.email_unique': 'duplicate key'}):
+        errors = initDatabase()
+
+    assert sorted(daos) == ['task', 'todo', 'user', 'version', 'video']
+    assert all(dao.ensure_collection.call_count == 1 for dao in daos.values())
+    assert database.command.call_count == 5
+    assert sorted(errors) == ['user.email_unique', 'video']
+
+@pytest.mark.unit
+@pytest.mark.parametrize('error', [CollectionInvalid('collection todo already exists'), OperationFailure('Collection already exists', code=48)])
+def test_ensure_collection_concurrent(error):
+    """
+    A collection created by a concurrent request after it was listed is set up without an error.
+    """
+    database = MagicMock()
+    database.list_collection_names.return_value = []
+    database.create_collection.side_effect = error
+
+    dao = DAO(collection_name='todo')
+    with patch('src.util.dao.getDatabase', return_value=database):
+        dao.ensure_collection()
+
+    assert dao.bootstrapped
+
+@pytest.mark.unit
+def test_import_main_without_database():
+    """
+    The server can be imported without a reachable database, since controllers and data access objects are created on first use.
+    """
+    env = dict(os.environ, MONGO_URL='mongodb://127.0.0.1:1', MONGO_SERVER_SELECTION_TIMEOUT_MS='200')
+    result = subprocess.run([sys.executable, '-c', 'import main'], cwd=BACKEND, env=env, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,120 @@
+import json
+import pytest
+from unittest.mock import MagicMock
+
+from src.util.metrics import Metrics, Histogram
+
+class TestMetrics:
+    @pytest.fixture
+    def metrics(self):
+        """
+        Fixture which provides fresh metrics.
+        """
+        return Metrics()
+
+    def command(self, metrics, name, command, request_id, duration_micros=2000, failed=False):
+        """
+        Simulate the events of one MongoDB command.
+        """
+        metrics.command_listener.started(MagicMock(command_name=name, command=command, request_id=request_id))
+        event = MagicMock(command_name=name, request_id=request_id, duration_micros=duration_micros)
+        if failed:
+            metrics.command_listener.failed(event)
+        else:
+            metrics.command_listener.succeeded(event)
+
+    @pytest.mark.unit
+    def test_histogram_cumulative_buckets(self):
+        """
+        The buckets of a histogram are rendered cumulatively, followed by the sum and the count.
+        """
+        histogram = Histogram('latency', 'Latency', ('endpoint',), buckets=[0.1, 1])
+        histogram.observe(0.05, '/a')
+        histogram.observe(0.5, '/a')
+        histogram.observe(5, '/a')
+
+        lines = histogram.render()
+
+        assert 'latency_bucket{endpoint="/a",le="0.1"} 1' in lines
+        assert 'latency_bucket{endpoint="/a",le="1"} 2' in lines
+        assert 'latency_bucket{endpoint="/a",le="+Inf"} 3' in lines
+        assert 'latency_sum{endpoint="/a"} 5.55' in lines
+        assert 'latency_count{endpoint="/a"} 3' in lines
+
+    @pytest.mark.unit
+    def test_recorded_before_scraped(self, metrics):
+        """
+        The requests are recorded before the metrics have been rendered for the first time.
+        """
+        metrics.start_request()
+        self.command(metrics, 'find', {'find': 'task'}, 1)
+        metrics.end_request('/tasks/<id>', 'GET', 200)
+
+        assert 'http_request_db_calls_sum{endpoint="/tasks/<id>"} 1' in metrics.render()
+
+    @pytest.mark.unit
+    def test_shared_across_processes(self, metrics, tmp_path):
+        """
+        Shared metrics are rendered as the sum of the snapshots of all processes, including the statistics of their caches.
+        """
+        cache = MagicMock()
+        cache.stats.return_value = {'hits': 1, 'misses': 1, 'size': 2, 'maxsize': 10, 'evictions': 0}
+        metrics.share(str(tmp_path), cache=lambda: cache)
+        self.command(metrics, 'find', {'find': 'task'}, 1)
+
+        # the snapshot of another worker
+        other = Metrics()
+        other.share(str(tmp_path / 'other'), cache=lambda: cache)
+        self.command(other, 'find', {'find': 'task'}, 2)
+        self.command(other, 'insert', {'insert': 'user'}, 3, failed=True)
+        (tmp_path / '1.json').write_text(json.dumps(other.snapshot()))
+
+        text = metrics.render()
+
+        assert 'mongo_command_duration_seconds_count{collection="task",command="find"} 2' in text
+        assert 'mongo_command_failures_total{collection="user",command="insert"} 1' in text
+        assert 'cache_hits_total 2' in text
+        assert 'cache_hit_ratio 0.5' in text
+
+    @pytest.mark.unit
+    def test_commands_per_collection(self, metrics):
+        """
+        Commands are measured per collection, where getMore names its collection separately.
+        """
+        self.command(metrics, 'find', {'find': 'task'}, 1)
+        self.command(metrics, 'getMore', {'getMore': 12345, 'collection': 'task'}, 2)
+        self.command(metrics, 'insert', {'insert': 'user'}, 3, failed=True)
+
+        text = metrics.render()
+
+        assert 'mongo_command_duration_seconds_count{collection="task",command="find"} 1' in text
+        assert 'mongo_command_duration_seconds_count{collection="task",command="getMore"} 1' in text
+        assert 'mongo_command_failures_total{collection="user",command="insert"} 1' in text
+
+    @pytest.mark.unit
+    def test_db_calls_per_request(self, metrics):
+        """
+        The commands sent while a request is served are counted for its endpoint.
+        """
+        metrics.start_request()
+        self.command(metrics, 'find', {'find': 'task'}, 1)
+        self.command(metrics, 'aggregate', {'aggregate': 'task'}, 2)
+        metrics.end_request('/tasks/byid/<id>', 'GET', 200)
+
+        text = metrics.render()
+
+        assert 'http_request_db_calls_sum{endpoint="/tasks/byid/<id>"} 2' in text
+        assert 'http_request_duration_seconds_count{endpoint="/tasks/byid/<id>",method="GET",status="200"} 1' in text
+
+    @pytest.mark.unit
+    def test_cache_stats(self, metrics):
+        """
+        The statistics of the cache are rendered as counters and gauges.
+        """
+        cache = MagicMock()
+        cache.stats.return_value = {'hits': 3, 'misses': 1, 'size': 2, 'maxsize': 10, 'evictions': 0}
+
+        text = metrics.render(cache)
+
+        assert 'cache_hits_total 3' in text
+        assert 'cache_hit_ratio 0.75' in text
@@ -0,0 +1,68 @@
+import pytest
+from unittest.mock import patch, MagicMock
+
+import src.util.mongo as mongo
+
+class TestGetClient:
+    """
+    A test suite for the shared client registry in src.util.mongo.
+    """
+
+    @pytest.fixture
+    def mockedclient(self):
+        """
+        Fixture which replaces pymongo.MongoClient by a mock that creates a new MagicMock per instantiation and
+        resets the registry before and after each test.
+
+        Returns: MagicMock: the mocked MongoClient class.
+        """
+        mongo.closeClients()
+        with patch('src.util.mongo.pymongo.MongoClient', side_effect=lambda *args, **kwargs: MagicMock()) as mockedclient:
+            yield mockedclient
+        mongo.closeClients()
+
+    @pytest.mark.unit
+    def test_shared_client(self, mockedclient):
+        """
+        Two requests for the same URL yield the same client, which is only created once.
+        """
+        assert mongo.getClient('mongodb://db:27017') is mongo.getClient('mongodb://db:27017')
+        assert mockedclient.call_count == 1
+
+    @pytest.mark.unit
+    def test_pool_options(self, mockedclient, monkeypatch):
+        """
+        Pool options configured in the environment are passed to the MongoClient.
+        """
+        monkeypatch.setenv('MONGO_MAX_POOL_SIZE', '7')
+        monkeypatch.setenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', '250')
+        monkeypatch.setattr('src.util.settings.settings', None)
+
+        mongo.getClient('mongodb://db:27017')
+
+        kwargs = mockedclient.call_args.kwargs
+        assert kwargs['maxPoolSize'] == 7
+        assert kwargs['waitQueueTimeoutMS'] == 250
+
+    @pytest.mark.unit
+    def test_close_clients(self, mockedclient):
+        """
+        Closing the clients closes each client once and a subsequent request creates a new client.
+        """
+        client = mongo.getClient('mongodb://db:27017')
+        mongo.closeClients()
+
+        client.close.assert_called_once()
+        assert mongo.getClient('mongodb://db:27017') is not client
+
+    @pytest.mark.unit
+    def test_forked_process(self, mockedclient):
+        """
+        A process with a different pid than the one that created the client obtains its own client and does not close the inherited one.
+        """
+        client = mongo.getClient('mongodb://db:27017')
+        with patch('src.util.mongo.os.getpid', return_value=-1):
+            forkedclient = mongo.getClient('mongodb://db:27017')
+
+        assert forkedclient is not client
+        client.close.assert_not_called()
@@ -0,0 +1,57 @@
+import pytest
+from unittest.mock import MagicMock
+from bson.objectid import ObjectId
+
+from src.util.pagination import encodeCursor, decodeCursor, getPageArgs, getProjection
+from src.controllers.controller import Controller
+
+@pytest.mark.unit
+def test_cursor_round_trip():
+    """
+    A token decodes to the id it was created from, given as ObjectId or in json form.
+    """
+    id = ObjectId()
+    assert decodeCursor(encodeCursor(id)) == id
+    assert decodeCursor(encodeCursor({'$oid': str(id)})) == id
+
+@pytest.mark.unit
+@pytest.mark.parametrize('token', ['zz', 'not a token!', ''])
+def test_cursor_invalid(token):
+    """
+    An invalid token raises a ValueError.
+    """
+    with pytest.raises(ValueError):
+        decodeCursor(token)
+
+@pytest.mark.unit
+@pytest.mark.parametrize('args, expected', [({}, (None, None)), ({'limit': '20', 'next': 'abc'}, (20, 'abc')), ({'limit': '5000'}, (1000, None))])
+def test_page_args(args, expected):
+    """
+    The limit is optional and bounded by PAGE_MAX_LIMIT.
+    """
+    assert getPageArgs(args) == expected
+
+@pytest.mark.unit
+@pytest.mark.parametrize('limit', ['0', 'ten'])
+def test_page_args_invalid(limit):
+    with pytest.raises(ValueError):
+        getPageArgs({'limit': limit})
+
+@pytest.mark.unit
+def test_projection():
+    assert getProjection({'fields': 'firstName, email'}) == {'firstName': 1, 'email': 1}
+    assert getProjection({}) is None
+
+@pytest.mark.unit
+def test_get_all_paginated():
+    """
+    With a limit, get_all returns one page with the token of the next page instead of the whole collection.
+    """
+    mocked_dao = MagicMock()
+    mocked_dao.find_page.return_value = ([{'_id': {'$oid': 'a'}}], 'token')
+    controller = Controller(dao=mocked_dao)
+
+    page = controller.get_all(limit=1, projection={'email': 1})
+
+    assert page == {'items': [{'_id': {'$oid': 'a'}}], 'next': 'token'}
+    mocked_dao.find.assert_not_called()
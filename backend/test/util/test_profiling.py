@@ -0,0 +1,81 @@
+import os
+import time
+import pytest
+from collections import Counter
+from flask import Flask, jsonify
+
+from src.util.profiling import Sampler, collapse, flamegraph, enableProfiling
+
+class TestProfiling:
+    @pytest.fixture
+    def app(self, tmp_path, monkeypatch):
+        """
+        Fixture which provides a Flask application that profiles requests carrying the token secret.
+        """
+        monkeypatch.setenv('PROFILE_DIR', str(tmp_path))
+        monkeypatch.setenv('PROFILE_TOKENS', 'other, secret')
+        monkeypatch.setattr('src.util.settings.settings', None)
+
+        app = Flask('profiled')
+        enableProfiling(app)
+
+        @app.route('/slow')
+        def slow():
+            end = time.perf_counter() + 0.05
+            while time.perf_counter() < end:
+                pass
+            return jsonify({})
+
+        return app
+
+    @pytest.mark.unit
+    def test_sampler(self):
+        """
+        The sampler records the stacks of the sampled thread, outermost function first.
+        """
+        import threading
+        sampler = Sampler(threading.get_ident(), 0.001)
+        sampler.start()
+        end = time.perf_counter() + 0.05
+        while time.perf_counter() < end:
+            pass
+        stacks = sampler.stop()
+
+        assert sum(stacks.values()) > 0
+        assert any(stack.split(';')[-1].startswith('test_sampler') for stack in stacks)
+
+    @pytest.mark.unit
+    def test_collapse_and_flamegraph(self):
+        """
+        Stacks are written one per line with their count, and every function appears in the flamegraph.
+        """
+        stacks = Counter({'a;b': 3, 'a;c<d>': 1})
+
+        assert collapse(stacks) == 'a;b 3\na;c<d> 1\n'
+        svg = flamegraph(stacks, 'GET /slow')
+        assert svg.startswith('<svg')
+        assert 'b (3 samples, 75.0%)' in svg
+        assert 'c&lt;d&gt;' in svg
+
+    @pytest.mark.unit
+    def test_profiled_request(self, app, tmp_path):
+        """
+        A request with an allowed token is profiled and the response names the flamegraph.
+        """
+        response = app.test_client().get('/slow', headers={'X-Profile': 'secret'})
+
+        name = response.headers['X-Profile']
+        assert os.path.exists(tmp_path / name)
+        with open(tmp_path / name.replace('.svg', '.collapsed')) as f:
+            assert 'slow (test_profiling.py' in f.read()
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('query, headers', [('', {}), ('', {'X-Profile': 'wrong'}), ('?profile=secret', {})])
+    def test_unprofiled_request(self, app, tmp_path, query, headers):
+        """
+        Requests without an allowed token in the header are not profiled, tokens in the query are ignored.
+        """
+        response = app.test_client().get(f'/slow{query}', headers=headers)
+
+        assert 'X-Profile' not in response.headers
+        assert os.listdir(tmp_path) == []
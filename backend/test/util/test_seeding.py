@@ -0,0 +1,69 @@
+import random
+
+import pytest
+
+from src.util.seeding import DataModel, generate, getSeedArgs
+
+MODEL = DataModel([
+    {'firstName': 'Jane', 'lastName': 'Doe', 'email': 'jane.doe@gmail.com', 'tasks': [
+        {'title': 'Task', 'description': 'Description', 'url': 'url', 'todos': ['a', 'b']},
+        {'title': 'Task', 'description': 'Description', 'url': 'url', 'todos': []}
+    ]}
+])
+
+@pytest.mark.unit
+def test_seed_args():
+    """
+    The means of tasks and todos default to those of the dummy data.
+    """
+    assert getSeedArgs({'users': '10', 'workers': '2'}, MODEL) == {'users': 10, 'tasks_per_user': 2, 'todos_per_task': 1, 'batch_size': 500, 'workers': 2}
+
+@pytest.mark.unit
+@pytest.mark.parametrize('values', [{'users': 'many'}, {'users': '0'}, {'users': '10', 'batchsize': '0'}, {'users': '10', 'tasks': 'nan'}, {'users': '10', 'todos': '-1'}, {'users': '10', 'workers': '0'}])
+def test_seed_args_invalid(values):
+    """
+    Parameters which are not numbers or out of range raise a ValueError.
+    """
+    with pytest.raises(ValueError):
+        getSeedArgs(values, MODEL)
+
+@pytest.mark.unit
+def test_seed_args_maximum(monkeypatch):
+    """
+    More users than SEED_MAX_USERS or more workers than SEED_MAX_WORKERS raise a ValueError.
+    """
+    monkeypatch.setenv('SEED_MAX_USERS', '5')
+    monkeypatch.setenv('SEED_MAX_WORKERS', '2')
+    monkeypatch.setattr('src.util.settings.settings', None)
+
+    assert getSeedArgs({'users': '5', 'workers': '2'}, MODEL)['users'] == 5
+    with pytest.raises(ValueError):
+        getSeedArgs({'users': '6'}, MODEL)
+    with pytest.raises(ValueError):
+        getSeedArgs({'users': '5', 'workers': '3'}, MODEL)
+
+@pytest.mark.unit
+def test_generate_referenced():
+    """
+    The tasks refer to their video and todos, which are separate documents.
+    """
+    documents = generate(MODEL, random.Random(1), 0, 2, 2)
+
+    assert len(documents['task']) > 0
+    assert [task['video'] for task in documents['task']] == [video['_id'] for video in documents['video']]
+    assert [todo for task in documents['task'] for todo in task['todos']] == [todo['_id'] for todo in documents['todo']]
+
+@pytest.mark.unit
+def test_generate_embedded():
+    """
+    In the embedded layout, the tasks contain their video and todos and there are no separate video and todo documents.
+    """
+    documents = generate(MODEL, random.Random(1), 0, 2, 2, embedded=True)
+
+    assert documents['video'] == [] and documents['todo'] == []
+    assert len(documents['task']) > 0
+    for task in documents['task']:
+        assert task['video']['url'] == 'url'
+        assert all(todo['description'] in ['a', 'b'] for todo in task['todos'])
+        assert task['total'] == len(task['todos'])
+        assert task['done'] == len([todo for todo in task['todos'] if todo['done']])
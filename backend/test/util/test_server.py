@@ -0,0 +1,113 @@
+import os
+import re
+import signal
+import socket
+import subprocess
+import sys
+import time
+import runpy
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from src.util.mongo import getMongoUrl
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.mark.unit
+def test_config(monkeypatch):
+    """
+    The production server is configured via the environment, with one single thread per worker switching to the sync worker class.
+    """
+    monkeypatch.setenv('SERVER_WORKERS', '3')
+    monkeypatch.setenv('SERVER_THREADS', '1')
+    monkeypatch.setenv('PORT', '5001')
+    monkeypatch.setattr('src.util.settings.settings', None)
+
+    config = runpy.run_path(os.path.join(BACKEND, 'gunicorn.conf.py'))
+
+    assert config['workers'] == 3
+    assert config['worker_class'] == 'sync'
+    assert config['bind'].endswith(':5001')
+
+@pytest.mark.unit
+def test_cache_disabled_with_several_workers(monkeypatch):
+    """
+    The workers do not use the cache of the controllers if there are several of them.
+    """
+    monkeypatch.setenv('CACHE_MAXSIZE', '100')
+    monkeypatch.setattr('src.util.settings.settings', None)
+    monkeypatch.setattr('src.util.cache.cache', None)
+    monkeypatch.setattr('src.util.mongo.getClient', lambda: None)
+    config = runpy.run_path(os.path.join(BACKEND, 'gunicorn.conf.py'))
+
+    from src.util import cache
+    server = MagicMock()
+    server.cfg.workers = 2
+    config['post_fork'](server, None)
+    assert isinstance(cache.getCache(), cache.NullCache)
+
+    monkeypatch.setattr('src.util.cache.cache', None)
+    server.cfg.workers = 1
+    config['post_fork'](server, None)
+    assert isinstance(cache.getCache(), cache.LRUCache)
+
+def get(port: int):
+    with urllib.request.urlopen(f'http://127.0.0.1:{port}/', timeout=10) as response:
+        return response.status
+
+@pytest.fixture
+def server():
+    """
+    Fixture which starts main.py with the production server and three workers on a free port.
+
+    Returns: tuple: the server process and its port.
+    """
+    pytest.importorskip('gunicorn')
+    try:
+        MongoClient(getMongoUrl(), serverSelectionTimeoutMS=1000).admin.command('ping')
+    except PyMongoError:
+        pytest.skip('MongoDB is not available')
+
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    env = dict(os.environ, SERVER='production', SERVER_WORKERS='3', SERVER_THREADS='2', FLASK_BIND_IP='127.0.0.1', PORT=str(port))
+    process = subprocess.Popen([sys.executable, 'main.py'], cwd=BACKEND, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+
+    deadline = time.time() + 30
+    while True:
+        try:
+            get(port)
+            break
+        except OSError:
+            if time.time() > deadline or process.poll() is not None:
+                process.kill()
+                pytest.fail(f'the server did not start: {process.communicate()[0]}')
+            time.sleep(0.2)
+
+    yield process, port
+
+    if process.poll() is None:
+        process.kill()
+        process.communicate()
+
+@pytest.mark.integration
+def test_production_server(server):
+    """
+    The production server answers concurrent requests with several workers and shuts down gracefully upon SIGTERM.
+    """
+    process, port = server
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        statuses = list(pool.map(lambda _: get(port), range(32)))
+    process.send_signal(signal.SIGTERM)
+    output = process.communicate(timeout=60)[0]
+
+    assert statuses == [200] * 32
+    assert process.returncode == 0
+    assert len(re.findall(r'Booting worker', output)) == 3
@@ -0,0 +1,45 @@
+import pytest
+
+from src.util.settings import loadSettings
+
+@pytest.fixture
+def dotenv(tmp_path):
+    """
+    Fixture for a .env file.
+
+    Returns: str: the path of the file.
+    """
+    path = tmp_path / '.env'
+    path.write_text('VERSION=v2\nMONGO_URL=mongodb://dotenv:27017\nCACHE_TTL=12.5\n')
+    return str(path)
+
+@pytest.mark.unit
+def test_types_and_defaults(dotenv):
+    """
+    Values are converted to the types of the fields, and unset or empty variables leave the defaults.
+    """
+    settings = loadSettings(environ={'MONGO_MAX_POOL_SIZE': '7', 'SERVER_PRELOAD': 'false', 'MONGO_MIN_POOL_SIZE': ''}, dotenv=dotenv)
+
+    assert settings.version == 'v2'
+    assert settings.cache_ttl == 12.5
+    assert settings.mongo_max_pool_size == 7
+    assert settings.server_preload == False
+    assert settings.mongo_min_pool_size is None
+    assert settings.mongo_database == 'edutask'
+
+@pytest.mark.unit
+def test_environment_precedence(dotenv):
+    """
+    The environment takes precedence over the .env file.
+    """
+    settings = loadSettings(environ={'MONGO_URL': 'mongodb://env:27017'}, dotenv=dotenv)
+    assert settings.mongo_url == 'mongodb://env:27017'
+
+@pytest.mark.unit
+@pytest.mark.parametrize('environ', [{'PORT': 'http'}, {'SERVER_PRELOAD': 'maybe'}])
+def test_invalid_value(environ, dotenv):
+    """
+    A value which cannot be converted raises a ValueError naming the variable.
+    """
+    with pytest.raises(ValueError, match=list(environ)[0]):
+        loadSettings(environ=environ, dotenv=dotenv)
@@ -0,0 +1,90 @@
+import json
+import pytest
+from flask import Flask
+
+import src.util.streaming as streaming
+from src.util.streaming import encode, getStreamArgs, streamResponse
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    with app.app_context():
+        yield app
+
+@pytest.mark.unit
+def test_encode_json(app):
+    """
+    A json array of all objects is produced.
+    """
+    objects = [{'_id': {'$oid': str(i)}, 'n': i} for i in range(5)]
+    assert json.loads(''.join(encode(iter(objects), 'json'))) == objects
+
+@pytest.mark.unit
+def test_encode_json_empty(app):
+    """
+    An empty iterable yields an empty json array.
+    """
+    assert ''.join(encode(iter([]), 'json')) == '[]'
+
+@pytest.mark.unit
+def test_encode_ndjson(app):
+    """
+    Every object is encoded on one line of its own.
+    """
+    objects = [{'n': i} for i in range(3)]
+    lines = ''.join(encode(iter(objects), 'ndjson')).splitlines()
+    assert [json.loads(line) for line in lines] == objects
+
+@pytest.mark.unit
+def test_encode_chunks(app, monkeypatch):
+    """
+    Encoded objects are sent in chunks of at least CHUNK_SIZE characters.
+    """
+    monkeypatch.setattr(streaming, 'CHUNK_SIZE', 10)
+    chunks = list(encode(iter([{'n': 'x' * 10}] * 3), 'json'))
+    # the opening bracket first, then one chunk per object (each exceeds the chunk size) and the closing bracket
+    assert chunks[0] == '['
+    assert len(chunks) == 5
+
+@pytest.mark.unit
+def test_encode_lazy(app):
+    """
+    The first chunk is produced before any object is read.
+    """
+    def objects():
+        yield {'n': 1}
+        raise RuntimeError('must not be read before the first chunk is sent')
+    assert next(encode(objects(), 'json')) == '['
+
+@pytest.mark.unit
+def test_stream_response(app):
+    """
+    The response is streamed with the mimetype of the format.
+    """
+    with app.test_request_context():
+        response = streamResponse(iter([{'n': 1}]), 'ndjson')
+        assert response.mimetype == 'application/x-ndjson'
+        assert response.is_streamed
+
+@pytest.mark.unit
+@pytest.mark.parametrize('args, expected', [
+    ({}, (None, 500)),
+    ({'stream': 'ndjson'}, ('ndjson', 500)),
+    ({'stream': 'json', 'batch_size': '20'}, ('json', 20))
+])
+def test_get_stream_args(args, expected, monkeypatch):
+    """
+    The format is optional and the batch size defaults to STREAM_BATCH_SIZE.
+    """
+    monkeypatch.delenv('STREAM_BATCH_SIZE', raising=False)
+    monkeypatch.setattr('src.util.settings.settings', None)
+    assert getStreamArgs(args) == expected
+
+@pytest.mark.unit
+@pytest.mark.parametrize('args', [{'stream': 'xml'}, {'batch_size': 'x'}, {'batch_size': '0'}])
+def test_get_stream_args_invalid(args):
+    """
+    An unknown format or a batch size which is not a positive integer raises a ValueError.
+    """
+    with pytest.raises(ValueError):
+        getStreamArgs(args)
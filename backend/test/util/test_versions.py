@@ -0,0 +1,65 @@
+import pytest
+from unittest.mock import MagicMock
+from flask import Flask, jsonify
+
+from src.util.versions import VersionStore, conditionalResponse
+from src.controllers.todocontroller import TodoController
+
+@pytest.fixture
+def store():
+    """
+    Fixture for a VersionStore whose mocked collection stores version 3 for every key.
+    """
+    mocked_dao = MagicMock()
+    mocked_dao.collection.find_one.return_value = {'_id': 'task:a', 'v': 3}
+    return VersionStore(dao=mocked_dao)
+
+@pytest.mark.unit
+def test_etag(store):
+    """
+    The ETag is derived from the key, its version and the variant of the representation.
+    """
+    assert store.etag(('task', 'a')) == 'task:a:3'
+    assert store.etag(('task', 'a'), variant='summary') == 'task:a:3:summary'
+    assert store.tag(('task', 'a'), 4, variant='summary') == 'task:a:4:summary'
+
+@pytest.mark.unit
+def test_bump_single_operation(store):
+    """
+    Incrementing several versions costs one bulk write.
+    """
+    store.bump(('task', 'a'), ('user', 'b'), ('task', 'a'))
+    store.dao.collection.bulk_write.assert_called_once()
+    assert len(store.dao.collection.bulk_write.call_args.args[0]) == 2
+
+@pytest.mark.unit
+@pytest.mark.parametrize('if_none_match, status, produced', [('"task:a:3"', 304, False), ('"task:a:2"', 200, True), (None, 200, True)])
+def test_conditional_response(if_none_match, status, produced):
+    """
+    A matching If-None-Match header yields 304 without producing the representation.
+    """
+    app = Flask('test')
+    make_response = MagicMock(side_effect=lambda: jsonify({'title': 'a'}))
+    headers = {'If-None-Match': if_none_match} if if_none_match else {}
+    with app.test_request_context('/', headers=headers):
+        response = conditionalResponse('task:a:3', make_response)
+
+    assert response.status_code == status
+    assert response.get_etag() == ('task:a:3', False)
+    assert make_response.called == produced
+
+@pytest.mark.unit
+def test_todo_update_bumps_parents():
+    """
+    Updating a todo increments the versions of the todo, its task and the owner of the task at once.
+    """
+    daos = {name: MagicMock() for name in ['todo', 'task', 'user']}
+    for name, dao in daos.items():
+        dao.collection_name = name
+    daos['task'].aggregate.return_value = [{'_id': {'$oid': 't'}, 'owner': {'$oid': 'u'}}]
+    versions = MagicMock()
+    tc = TodoController(todo_dao=daos['todo'], tasks_dao=daos['task'], versions=versions, users_dao=daos['user'])
+
+    tc.update('64d0c1f0a1b2c3d4e5f60718', {'$set': {'done': True}})
+
+    versions.bump.assert_called_once_with(('todo', '64d0c1f0a1b2c3d4e5f60718'), ('task', 't'), ('user', 'u'))
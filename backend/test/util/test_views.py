@@ -0,0 +1,29 @@
+import pytest
+
+from src.util.views import getViewArg, getExpandArg, tasksVariant
+
+@pytest.mark.unit
+@pytest.mark.parametrize('args, expected', [({}, None), ({'expand': ''}, ()), ({'expand': 'todos,video'}, ('video', 'todos')), ({'expand': ' todos '}, ('todos',))])
+def test_expand_args(args, expected):
+    """
+    The expanded references are optional and returned in their canonical order.
+    """
+    assert getExpandArg(args) == expected
+
+@pytest.mark.unit
+@pytest.mark.parametrize('read, args', [(getExpandArg, {'expand': 'owner'}), (getExpandArg, {'expand': 'video,owner'}), (getViewArg, {'view': 'compact'})])
+def test_invalid_args(read, args):
+    """
+    Unknown references or views raise a ValueError.
+    """
+    with pytest.raises(ValueError):
+        read(args)
+
+@pytest.mark.unit
+def test_tasks_variant():
+    """
+    The variants of the ETag of the tasks of a user differ by expansion, view and page, while expanding all references equals the default.
+    """
+    variants = [tasksVariant(), tasksVariant(expand=()), tasksVariant(summary=True), tasksVariant(limit=10, expand=('video',))]
+    assert len(set(variants)) == len(variants)
+    assert tasksVariant(expand=('video', 'todos')) == tasksVariant()